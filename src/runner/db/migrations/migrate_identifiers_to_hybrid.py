@@ -14,16 +14,18 @@ Target Schema (hybridgraph):
   :Content -[:HAS_IDENTIFIER]-> :Identifier
 
 Usage:
-  python migrate_identifiers_to_hybrid.py [--dry-run] [--kind email]
+  python migrate_identifiers_to_hybrid.py [--dry-run] [--kind email] [--verify | --no-verify]
 """
 
 import argparse
 import os
 import sys
+from collections import Counter
 from datetime import datetime, timezone
 
 try:
     from neo4j import GraphDatabase
+    from neo4j.exceptions import ClientError
 except ImportError:
     print("Error: neo4j driver not installed. Run: pip install neo4j")
     sys.exit(1)
@@ -39,57 +41,58 @@ def get_config():
     }
 
 
-def setup_schema(driver, target_db: str):
+def setup_schema(session):
     """Create constraints and indexes for Identifier nodes."""
     print("Setting up Identifier schema...")
 
-    with driver.session(database=target_db) as session:
-        # Create constraint for unique identifiers
-        session.run("""
-            CREATE CONSTRAINT identifier_unique IF NOT EXISTS
-            FOR (i:Identifier) REQUIRE (i.kind, i.value) IS UNIQUE
-        """)
-
-        # Create indexes
-        session.run("""
-            CREATE INDEX identifier_kind IF NOT EXISTS
-            FOR (i:Identifier) ON (i.kind)
-        """)
-        session.run("""
-            CREATE INDEX identifier_value IF NOT EXISTS
-            FOR (i:Identifier) ON (i.value)
-        """)
+    # Create constraint for unique identifiers
+    session.run("""
+        CREATE CONSTRAINT identifier_unique IF NOT EXISTS
+        FOR (i:Identifier) REQUIRE (i.kind, i.value) IS UNIQUE
+    """).consume()
+
+    # Create indexes
+    session.run("""
+        CREATE INDEX identifier_kind IF NOT EXISTS
+        FOR (i:Identifier) ON (i.kind)
+    """).consume()
+    session.run("""
+        CREATE INDEX identifier_value IF NOT EXISTS
+        FOR (i:Identifier) ON (i.value)
+    """).consume()
 
     print("  Schema setup complete")
 
 
-def get_identifiers(driver, source_db: str, kind: str = None) -> list:
+def _read_identifiers(tx, kind: str = None) -> list:
+    if kind:
+        result = tx.run("""
+            MATCH (i:Identifier {kind: $kind})
+            RETURN i.kind AS kind, i.value AS value, i.vtype AS vtype,
+                   i.object_count AS object_count, i.sample_raw AS sample_raw
+            ORDER BY i.object_count DESC
+        """, kind=kind)
+    else:
+        result = tx.run("""
+            MATCH (i:Identifier)
+            RETURN i.kind AS kind, i.value AS value, i.vtype AS vtype,
+                   i.object_count AS object_count, i.sample_raw AS sample_raw
+            ORDER BY i.object_count DESC
+        """)
+    return [dict(r) for r in result]
+
+
+def get_identifiers(session, kind: str = None) -> list:
     """Load all identifiers from jsongraph."""
-    print(f"\nLoading identifiers from {source_db}...")
-
-    with driver.session(database=source_db) as session:
-        if kind:
-            result = session.run("""
-                MATCH (i:Identifier {kind: $kind})
-                RETURN i.kind AS kind, i.value AS value, i.vtype AS vtype,
-                       i.object_count AS object_count, i.sample_raw AS sample_raw
-                ORDER BY i.object_count DESC
-            """, kind=kind)
-        else:
-            result = session.run("""
-                MATCH (i:Identifier)
-                RETURN i.kind AS kind, i.value AS value, i.vtype AS vtype,
-                       i.object_count AS object_count, i.sample_raw AS sample_raw
-                ORDER BY i.object_count DESC
-            """)
-
-        identifiers = [dict(r) for r in result]
+    print("\nLoading identifiers...")
+
+    identifiers = session.execute_read(_read_identifiers, kind)
 
     print(f"  Found {len(identifiers):,} identifiers")
     return identifiers
 
 
-def migrate_identifiers(driver, target_db: str, identifiers: list, dry_run: bool = False):
+def migrate_identifiers(session, identifiers: list, dry_run: bool = False):
     """Create Identifier nodes in hybridgraph."""
     print(f"\nMigrating {len(identifiers):,} identifiers...")
 
@@ -98,80 +101,101 @@ def migrate_identifiers(driver, target_db: str, identifiers: list, dry_run: bool
         return
 
     now = datetime.now(timezone.utc).isoformat()
-    batch_size = 500
-
-    with driver.session(database=target_db) as session:
-        for i in range(0, len(identifiers), batch_size):
-            batch = identifiers[i:i+batch_size]
-
-            # Add timestamp to each identifier
-            for ident in batch:
-                ident["created_at"] = now
-
-            session.run("""
-                UNWIND $batch AS ident
-                MERGE (i:Identifier {kind: ident.kind, value: ident.value})
-                ON CREATE SET
-                    i.vtype = ident.vtype,
-                    i.original_object_count = ident.object_count,
-                    i.sample_raw = ident.sample_raw,
-                    i.created_at = ident.created_at,
-                    i.ref_count = 0
-            """, batch=batch)
-
-            if (i + batch_size) % 1000 == 0 or i + batch_size >= len(identifiers):
-                print(f"    Created {min(i + batch_size, len(identifiers)):,}/{len(identifiers):,} Identifier nodes")
-
-
-def link_to_content(driver, target_db: str, identifiers: list, dry_run: bool = False):
+    for ident in identifiers:
+        ident["created_at"] = now
+
+    # Ship the whole list in one round trip and let the server commit in
+    # chunks. CALL { ... } IN TRANSACTIONS requires an implicit (auto-commit)
+    # transaction, so this must go through session.run, not execute_write.
+    session.run("""
+        UNWIND $batch AS ident
+        CALL {
+            WITH ident
+            MERGE (i:Identifier {kind: ident.kind, value: ident.value})
+            ON CREATE SET
+                i.vtype = ident.vtype,
+                i.original_object_count = ident.object_count,
+                i.sample_raw = ident.sample_raw,
+                i.created_at = ident.created_at,
+                i.ref_count = 0
+        } IN TRANSACTIONS OF 1000 ROWS
+    """, batch=identifiers).consume()
+
+    print(f"    Created {len(identifiers):,}/{len(identifiers):,} Identifier nodes")
+
+
+def _count_potential_links(tx, values: list) -> int:
+    result = tx.run("""
+        UNWIND $values AS val
+        MATCH (c:Content)
+        WHERE c.value_str = val OR c.value_str CONTAINS val
+        RETURN count(c) AS matches
+    """, values=values)
+    return result.single()["matches"]
+
+
+def _link_exact_batch(tx, values: list) -> int:
+    # Link identifiers to content nodes with exact value match
+    result = tx.run("""
+        UNWIND $values AS pair
+        WITH pair[0] AS kind, pair[1] AS value
+        MATCH (i:Identifier {kind: kind, value: value})
+        MATCH (c:Content)
+        WHERE c.value_str = value
+        MERGE (c)-[:HAS_IDENTIFIER]->(i)
+        WITH i, count(c) AS linked
+        SET i.ref_count = linked
+        RETURN sum(linked) AS total_linked
+    """, values=values)
+    record = result.single()
+    return record["total_linked"] if record else 0
+
+
+def link_to_content(session, identifiers: list, dry_run: bool = False):
     """Link Identifier nodes to Content nodes with matching values."""
     print(f"\nLinking identifiers to Content nodes...")
 
     if dry_run:
         # Just count potential matches
-        with driver.session(database=target_db) as session:
-            result = session.run("""
-                UNWIND $values AS val
-                MATCH (c:Content)
-                WHERE c.value_str = val OR c.value_str CONTAINS val
-                RETURN count(c) AS matches
-            """, values=[i["value"] for i in identifiers[:100]])
-            count = result.single()["matches"]
-            print(f"  DRY RUN - estimated ~{count * len(identifiers) // 100:,} potential links")
+        count = session.execute_read(
+            _count_potential_links, [i["value"] for i in identifiers[:100]]
+        )
+        print(f"  DRY RUN - estimated ~{count * len(identifiers) // 100:,} potential links")
         return 0
 
     total_links = 0
     batch_size = 100
 
-    with driver.session(database=target_db) as session:
-        for i in range(0, len(identifiers), batch_size):
-            batch = identifiers[i:i+batch_size]
-            values = [(ident["kind"], ident["value"]) for ident in batch]
-
-            # Link identifiers to content nodes with exact value match
-            result = session.run("""
-                UNWIND $values AS pair
-                WITH pair[0] AS kind, pair[1] AS value
-                MATCH (i:Identifier {kind: kind, value: value})
-                MATCH (c:Content)
-                WHERE c.value_str = value
-                MERGE (c)-[:HAS_IDENTIFIER]->(i)
-                WITH i, count(c) AS linked
-                SET i.ref_count = linked
-                RETURN sum(linked) AS total_linked
-            """, values=values)
-
-            record = result.single()
-            if record:
-                total_links += record["total_linked"]
-
-            if (i + batch_size) % 500 == 0 or i + batch_size >= len(identifiers):
-                print(f"    Processed {min(i + batch_size, len(identifiers)):,}/{len(identifiers):,} identifiers, {total_links:,} links created")
+    for i in range(0, len(identifiers), batch_size):
+        batch = identifiers[i:i+batch_size]
+        values = [(ident["kind"], ident["value"]) for ident in batch]
+
+        total_links += session.execute_write(_link_exact_batch, values) or 0
+
+        if (i + batch_size) % 500 == 0 or i + batch_size >= len(identifiers):
+            print(f"    Processed {min(i + batch_size, len(identifiers)):,}/{len(identifiers):,} identifiers, {total_links:,} links created")
 
     return total_links
 
 
-def link_partial_matches(driver, target_db: str, dry_run: bool = False):
+def _link_partial(tx) -> int:
+    # Find emails within strings like "Name <email@domain.com>"
+    result = tx.run("""
+        MATCH (i:Identifier {kind: 'email'})
+        MATCH (c:Content)
+        WHERE c.value_str CONTAINS i.value
+          AND c.value_str <> i.value
+          AND NOT (c)-[:HAS_IDENTIFIER]->(i)
+        MERGE (c)-[:HAS_IDENTIFIER]->(i)
+        WITH i, count(c) AS new_links
+        SET i.ref_count = i.ref_count + new_links
+        RETURN sum(new_links) AS total
+    """)
+    record = result.single()
+    return record["total"] if record else 0
+
+
+def link_partial_matches(session, dry_run: bool = False):
     """Link identifiers found within larger strings (e.g., email in 'Name <email>')."""
     print(f"\nLinking partial matches (emails in formatted strings)...")
 
@@ -179,66 +203,70 @@ def link_partial_matches(driver, target_db: str, dry_run: bool = False):
         print("  DRY RUN - skipping partial matches")
         return 0
 
-    with driver.session(database=target_db) as session:
-        # Find emails within strings like "Name <email@domain.com>"
-        result = session.run("""
-            MATCH (i:Identifier {kind: 'email'})
-            MATCH (c:Content)
-            WHERE c.value_str CONTAINS i.value
-              AND c.value_str <> i.value
-              AND NOT (c)-[:HAS_IDENTIFIER]->(i)
-            MERGE (c)-[:HAS_IDENTIFIER]->(i)
-            WITH i, count(c) AS new_links
-            SET i.ref_count = i.ref_count + new_links
-            RETURN sum(new_links) AS total
-        """)
+    total = session.execute_write(_link_partial) or 0
+    print(f"    Created {total:,} partial match links")
+    return total
+
+
+def _read_meta_counts(tx) -> tuple:
+    # Constant-time read from the count store (requires APOC)
+    record = tx.run("""
+        CALL apoc.meta.stats() YIELD labels, relTypesCount
+        RETURN labels, relTypesCount
+    """).single()
+    return (
+        record["labels"].get("Identifier", 0),
+        record["relTypesCount"].get("HAS_IDENTIFIER", 0),
+    )
+
 
-        record = result.single()
-        total = record["total"] if record else 0
-        print(f"    Created {total:,} partial match links")
-        return total
+def _read_scan_counts(tx) -> tuple:
+    ident_count = tx.run("MATCH (i:Identifier) RETURN count(i) AS count").single()["count"]
+    rel_count = tx.run("""
+        MATCH ()-[r:HAS_IDENTIFIER]->()
+        RETURN count(r) AS rel_count
+    """).single()["rel_count"]
+    return ident_count, rel_count
 
 
-def verify_migration(driver, target_db: str):
-    """Verify the migration results."""
+def has_identifiers(session) -> bool:
+    """Check whether the target already holds Identifier nodes (i.e. this is a re-run)."""
+    record = session.run("MATCH (:Identifier) RETURN 1 AS found LIMIT 1").single()
+    return record is not None
+
+
+def verify_migration(session, identifiers: list):
+    """
+    Verify the migration results.
+
+    The per-kind breakdown comes from the identifiers that were just
+    migrated; only the graph-wide totals are read back from Neo4j.
+    """
     print("\nVerifying migration...")
 
-    with driver.session(database=target_db) as session:
-        # Count identifiers by kind
-        result = session.run("""
-            MATCH (i:Identifier)
-            RETURN i.kind AS kind, count(i) AS count, sum(i.ref_count) AS total_refs
-            ORDER BY count DESC
-        """)
+    try:
+        ident_count, rel_count = session.execute_read(_read_meta_counts)
+    except ClientError:
+        # APOC not installed - fall back to full scans
+        ident_count, rel_count = session.execute_read(_read_scan_counts)
 
-        print("\n" + "=" * 60)
-        print("IDENTIFIER MIGRATION SUMMARY")
-        print("=" * 60)
-        print(f"\n{'Kind':<15} {'Count':>10} {'References':>12}")
-        print("-" * 40)
-
-        total_idents = 0
-        total_refs = 0
-        for record in result:
-            kind = record["kind"]
-            count = record["count"]
-            refs = record["total_refs"] or 0
-            print(f"{kind:<15} {count:>10,} {refs:>12,}")
-            total_idents += count
-            total_refs += refs
-
-        print("-" * 40)
-        print(f"{'TOTAL':<15} {total_idents:>10,} {total_refs:>12,}")
-
-        # Count relationships
-        result = session.run("""
-            MATCH ()-[r:HAS_IDENTIFIER]->()
-            RETURN count(r) AS rel_count
-        """)
-        rel_count = result.single()["rel_count"]
+    by_kind = Counter(ident["kind"] for ident in identifiers)
+
+    print("\n" + "=" * 60)
+    print("IDENTIFIER MIGRATION SUMMARY")
+    print("=" * 60)
+    print(f"\n{'Kind':<15} {'Migrated':>10}")
+    print("-" * 40)
+
+    for kind, count in by_kind.most_common():
+        print(f"{kind:<15} {count:>10,}")
+
+    print("-" * 40)
+    print(f"{'TOTAL':<15} {len(identifiers):>10,}")
 
-        print(f"\nHAS_IDENTIFIER relationships: {rel_count:,}")
-        print("=" * 60)
+    print(f"\nIdentifier nodes in graph: {ident_count:,}")
+    print(f"HAS_IDENTIFIER relationships: {rel_count:,}")
+    print("=" * 60)
 
 
 def main():
@@ -257,6 +285,10 @@ def main():
         "--skip-partial", action="store_true",
         help="Skip partial match linking (faster)"
     )
+    parser.add_argument(
+        "--verify", action=argparse.BooleanOptionalAction, default=None,
+        help="Print verification counts (default: only on the initial migration)"
+    )
     args = parser.parse_args()
 
     config = get_config()
@@ -274,32 +306,41 @@ def main():
 
     driver = GraphDatabase.driver(config["uri"], auth=(config["user"], config["password"]))
 
+    # One session per database for the whole run; every step reuses them
+    # instead of paying a session open (and bookmark exchange) per step.
     try:
-        # Step 1: Setup schema
-        if not args.dry_run:
-            setup_schema(driver, config["target_db"])
-
-        # Step 2: Load identifiers
-        identifiers = get_identifiers(driver, config["source_db"], args.kind)
-
-        if not identifiers:
-            print("No identifiers found to migrate")
-            return
-
-        # Step 3: Create Identifier nodes
-        migrate_identifiers(driver, config["target_db"], identifiers, args.dry_run)
-
-        # Step 4: Link to Content nodes
-        exact_links = link_to_content(driver, config["target_db"], identifiers, args.dry_run)
-
-        # Step 5: Link partial matches (optional)
-        partial_links = 0
-        if not args.skip_partial and not args.dry_run:
-            partial_links = link_partial_matches(driver, config["target_db"], args.dry_run)
-
-        # Step 6: Verify
-        if not args.dry_run:
-            verify_migration(driver, config["target_db"])
+        with driver.session(database=config["source_db"]) as source_session, \
+                driver.session(database=config["target_db"]) as target_session:
+            # Verification is only on by default for the initial migration
+            verify = args.verify
+            if verify is None:
+                verify = not has_identifiers(target_session)
+
+            # Step 1: Setup schema
+            if not args.dry_run:
+                setup_schema(target_session)
+
+            # Step 2: Load identifiers
+            identifiers = get_identifiers(source_session, args.kind)
+
+            if not identifiers:
+                print("No identifiers found to migrate")
+                return
+
+            # Step 3: Create Identifier nodes
+            migrate_identifiers(target_session, identifiers, args.dry_run)
+
+            # Step 4: Link to Content nodes
+            exact_links = link_to_content(target_session, identifiers, args.dry_run)
+
+            # Step 5: Link partial matches (optional)
+            partial_links = 0
+            if not args.skip_partial and not args.dry_run:
+                partial_links = link_partial_matches(target_session, args.dry_run)
+
+            # Step 6: Verify
+            if verify and not args.dry_run:
+                verify_migration(target_session, identifiers)
 
         print("\nMigration complete!")
         if not args.dry_run:
@@ -388,6 +388,7 @@ def migrate_document(driver, target_db: str, doc_meta: dict, data: dict, hashes:
                     content.ref_count = 1
                 ON MATCH SET
                     content.ref_count = content.ref_count + 1
+                REMOVE content:Garbage
             """, nodes=content_nodes)
 
         # Create/update Structure nodes
@@ -403,6 +404,7 @@ def migrate_document(driver, target_db: str, doc_meta: dict, data: dict, hashes:
                     structure.ref_count = 1
                 ON MATCH SET
                     structure.ref_count = structure.ref_count + 1
+                REMOVE structure:Garbage
             """, nodes=structure_nodes)
 
         # Create CONTAINS relationships
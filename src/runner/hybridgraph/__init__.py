@@ -9,16 +9,38 @@ This module provides the deduplicated graph storage layer:
 - health: Health monitoring and integrity checks
 - delete: Source deletion with ref_count management
 - gc: Garbage collection for orphaned nodes
+- schema: Constraints and indexes the queries rely on
+
+Re-exported names are resolved lazily (PEP 562) so importing the package
+does not load the Neo4j-backed submodules until they are first used.
 """
 
+import importlib
+import os
+
+DEFAULT_MAX_TRAVERSAL_DEPTH = 100
+
+
+def _max_depth_from_env() -> int:
+    """Read HYBRIDGRAPH_MAX_DEPTH, falling back to the default if unusable."""
+    try:
+        depth = int(os.environ.get("HYBRIDGRAPH_MAX_DEPTH", DEFAULT_MAX_TRAVERSAL_DEPTH))
+    except ValueError:
+        return DEFAULT_MAX_TRAVERSAL_DEPTH
+    return depth if depth >= 1 else DEFAULT_MAX_TRAVERSAL_DEPTH
+
+
 # Maximum depth for traversing nested JSON structures
-# This limits CONTAINS* path traversals to prevent runaway queries
-MAX_TRAVERSAL_DEPTH = 100
+# This limits CONTAINS* path traversals to prevent runaway queries;
+# override with HYBRIDGRAPH_MAX_DEPTH
+MAX_TRAVERSAL_DEPTH = _max_depth_from_env()
 
-# Import key classes for convenient access
-from runner.hybridgraph.queries import HybridGraphQuery
-from runner.hybridgraph.sync import run_sync
-from runner.hybridgraph.health import run_health_check
+# name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "HybridGraphQuery": "runner.hybridgraph.queries",
+    "run_sync": "runner.hybridgraph.sync",
+    "run_health_check": "runner.hybridgraph.health",
+}
 
 __all__ = [
     "MAX_TRAVERSAL_DEPTH",
@@ -26,3 +48,16 @@ __all__ = [
     "run_sync",
     "run_health_check",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
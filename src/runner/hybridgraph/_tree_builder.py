@@ -0,0 +1,119 @@
+"""
+Document reconstruction from the column lists of the get_document query.
+
+Kept apart from queries.py, free of Neo4j imports and fully annotated, so
+this hot loop can be compiled ahead of time with mypyc
+(``mypyc src/runner/hybridgraph/_tree_builder.py``). The compiled extension
+shadows this file on import; without it the pure-Python version runs.
+"""
+
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+__all__ = ["build_tree"]
+
+# Unfilled slot marker for array reconstruction (None is a valid item)
+_EMPTY = object()
+
+
+def _group_rows(parents: Sequence[str]) -> Dict[str, List[int]]:
+    """Map each parent merkle to the row indices it owns, in row order."""
+    groups: Dict[str, List[int]] = {}
+    for i, parent in enumerate(parents):
+        rows = groups.get(parent)
+        if rows is None:
+            groups[parent] = [i]
+        else:
+            rows.append(i)
+    return groups
+
+
+def _assemble_array(rels: Sequence[int], built: List[Any], contents: Sequence[int],
+                    rel_key: Sequence[str], content_key: Sequence[str],
+                    content_value: Sequence[Any]) -> List[Any]:
+    # Keys are normally the dense indices 0..n-1, so items are placed
+    # straight into their slots; sparse or duplicate keys fall back to
+    # sorting on the index
+    n = len(rels) + len(contents)
+    items: List[Any] = [_EMPTY] * n
+    indexed: List[Any] = []
+    for i, value in zip(rels, built):
+        indexed.append((int(rel_key[i]), value))
+    for i in contents:
+        indexed.append((int(content_key[i]), content_value[i]))
+    for index, value in indexed:
+        if not 0 <= index < n or items[index] is not _EMPTY:
+            indexed.sort(key=itemgetter(0))
+            return [value for _, value in indexed]
+        items[index] = value
+    return items
+
+
+def build_tree(columns: Mapping[str, Any]) -> Any:
+    """
+    Build a document tree from the column lists of the get_document query.
+
+    Rows are addressed by index into the columns; children are grouped
+    per parent merkle as lists of row indices. A subtree that occurs more
+    than once (same merkle) is rebuilt at each occurrence, so no two parts
+    of the result share an object.
+
+    Returns:
+        The reconstructed object or array, or None if the root is not a
+        container
+    """
+    content_key: Sequence[str] = columns["content_key"]
+    content_value: Sequence[Any] = columns["content_value"]
+    rel_child: Sequence[str] = columns["rel_child"]
+    rel_key: Sequence[str] = columns["rel_key"]
+
+    # parent merkle -> row indices into the content / rel columns
+    content_rows = _group_rows(columns["content_parent"])
+    rel_rows = _group_rows(columns["rel_parent"])
+
+    # Container merkle -> (kind, rel rows, content rows), resolved once so
+    # the walk does a single lookup per child instead of one per map
+    no_rows: List[int] = []
+    nodes: Dict[str, Tuple[str, List[int], List[int]]] = {}
+    for merkle, kind in zip(columns["struct_merkle"], columns["struct_kind"]):
+        if kind == "object" or kind == "array":
+            nodes[merkle] = (kind, rel_rows.get(merkle, no_rows), content_rows.get(merkle, no_rows))
+
+    # Iterative post-order walk: a frame is [node, next rel position,
+    # built children]. A frame is assembled once all its child structures
+    # have been built, so deep documents cannot hit the recursion limit.
+    root_merkle: str = columns["root_merkle"]
+    root = nodes.get(root_merkle)
+    if root is None:
+        return None
+
+    stack: List[List[Any]] = [[root, 0, []]]
+    while True:
+        frame = stack[-1]
+        node, pos, built = frame
+        kind, rels, contents = node
+        if pos < len(rels):
+            frame[1] = pos + 1
+            child = nodes.get(rel_child[rels[pos]])
+            if child is not None:
+                stack.append([child, 0, []])
+            else:
+                built.append(None)
+            continue
+
+        stack.pop()
+        value: Any
+        if kind == "object":
+            obj: Dict[str, Any] = {}
+            # Child structures first, then content values
+            for i, child_value in zip(rels, built):
+                obj[rel_key[i]] = child_value
+            for i in contents:
+                obj[content_key[i]] = content_value[i]
+            value = obj
+        else:
+            value = _assemble_array(rels, built, contents, rel_key, content_key, content_value)
+
+        if not stack:
+            return value
+        stack[-1][2].append(value)
@@ -4,7 +4,7 @@ Delete source from hybridgraph with proper ref_count management.
 
 This task:
 1. Finds all Structure/Content nodes reachable from the Source
-2. Decrements their ref_counts
+2. Decrements their ref_counts, tagging nodes that reach 0 as :Garbage
 3. Optionally runs garbage collection for ref_count=0 nodes
 4. Deletes the Source node
 
@@ -19,19 +19,65 @@ Parameters:
 """
 
 import argparse
-import json
+import functools
+import logging
+import logging.handlers
 import os
 import sys
 from datetime import datetime, timezone
-from typing import Dict, List, Set
+from typing import Dict, Optional, Sequence
 
 try:
-    from neo4j import GraphDatabase
+    # Availability check only; connections come from get_shared_driver
+    import neo4j  # noqa: F401
 except ImportError:
     print("Error: neo4j driver not installed")
     sys.exit(1)
 
+try:
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph.schema import ensure_schema, schema_enabled
+    from runner.utils.fastjson import dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+except ImportError:
+    # Fallback for direct execution
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph.schema import ensure_schema, schema_enabled
+    from runner.utils.fastjson import dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+
+
+# Rows per UNWIND when decrementing ref_counts; keeps each statement's
+# match set bounded for sources with very large subgraphs
+DECREMENT_CHUNK_SIZE = 10_000
+
+
+# Progress output is buffered and written in batches instead of one
+# blocking stdout write per line; _flush_log() drains it before the
+# stack-runner result is emitted.
+log = logging.getLogger(__name__)
+if not log.handlers:
+    _stream_handler = logging.StreamHandler(sys.stdout)
+    _stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(logging.handlers.MemoryHandler(
+        capacity=100, flushLevel=logging.ERROR, target=_stream_handler
+    ))
+    log.setLevel(logging.INFO)
+    log.propagate = False
 
+
+def _flush_log():
+    for handler in log.handlers:
+        handler.flush()
+
+
+# Stack-runner parameters, read once at import; None when run from the CLI
+TASK_PARAMS = os.environ.get("TASK_PARAMS")
+
+
+@functools.lru_cache(maxsize=1)
 def get_config():
     return {
         "uri": os.environ.get("NEO4J_URI", "bolt://localhost:7687"),
@@ -41,141 +87,307 @@ def get_config():
     }
 
 
-def get_source_nodes(driver, database: str, source_id: str) -> Dict:
-    """Get all nodes reachable from a source."""
-    with driver.session(database=database) as session:
-        # Get source and root
-        result = session.run("""
+def _get_source_nodes_tx(tx, source_id: str) -> Dict:
+    # Root lookup, structure and content collection in a single traversal.
+    # subgraphNodes visits each Structure once (NODE_GLOBAL) rather than
+    # enumerating every path; maxLevel (MAX_TRAVERSAL_DEPTH) still bounds
+    # runaway nesting.
+    result = tx.run("""
+        MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+        CALL apoc.path.subgraphNodes(root, {
+            relationshipFilter: 'CONTAINS>',
+            labelFilter: '+Structure',
+            bfs: true,
+            uniqueness: 'NODE_GLOBAL',
+            maxLevel: $max_depth
+        }) YIELD node
+        WITH src, root, collect(node) AS all_structs
+        UNWIND all_structs AS struct
+        OPTIONAL MATCH (struct)-[:HAS_VALUE]->(c:Content)
+        RETURN src.source_id AS source_id,
+               root.merkle AS root_merkle,
+               [x IN all_structs | x.merkle] AS structures,
+               collect(DISTINCT c.hash) AS contents
+    """, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH)
+
+    record = result.single()
+    if not record:
+        # Either the source is missing or it has no root
+        result = tx.run("""
             MATCH (src:Source {source_id: $source_id})
-            OPTIONAL MATCH (src)-[:HAS_ROOT]->(root:Structure)
-            RETURN src.source_id AS source_id, root.merkle AS root_merkle
+            RETURN count(src) > 0 AS exists
         """, source_id=source_id)
-
-        record = result.single()
-        if not record or not record["source_id"]:
+        if not result.single()["exists"]:
             return {"error": f"Source '{source_id}' not found"}
 
-        root_merkle = record["root_merkle"]
-        if not root_merkle:
-            return {
-                "source_id": source_id,
-                "structures": [],
-                "contents": [],
-            }
-
-        # Get all reachable structures
-        # Depth limit (100) prevents runaway queries on deeply nested structures
-        result = session.run("""
-            MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-            OPTIONAL MATCH (root)-[:CONTAINS*0..100]->(s:Structure)
-            WITH collect(DISTINCT s.merkle) + [root.merkle] AS merkles
-            UNWIND merkles AS m
-            RETURN DISTINCT m AS merkle
-        """, source_id=source_id)
+        return {
+            "source_id": source_id,
+            "structures": (),
+            "contents": (),
+        }
 
-        structures = [r["merkle"] for r in result if r["merkle"]]
-
-        # Get all reachable content
-        # Depth limit (100) prevents runaway queries on deeply nested structures
-        result = session.run("""
-            MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-            OPTIONAL MATCH (root)-[:CONTAINS*0..100]->(s:Structure)
-            WITH [root] + collect(DISTINCT s) AS all_structs
-            UNWIND all_structs AS struct
-            MATCH (struct)-[:HAS_VALUE]->(c:Content)
-            RETURN DISTINCT c.hash AS hash
-        """, source_id=source_id)
+    return {
+        "source_id": source_id,
+        "structures": tuple({m for m in record["structures"] if m}),
+        "contents": tuple({h for h in record["contents"] if h}),
+    }
 
-        contents = [r["hash"] for r in result if r["hash"]]
 
-        return {
-            "source_id": source_id,
-            "structures": structures,
-            "contents": contents,
+def _count_source_nodes_tx(tx, source_id: str) -> Dict:
+    result = tx.run("""
+        MATCH (src:Source {source_id: $source_id})
+        CALL {
+            WITH src
+            MATCH (src)-[:HAS_ROOT]->(root:Structure)
+            CALL apoc.path.subgraphNodes(root, {
+                relationshipFilter: 'CONTAINS>',
+                labelFilter: '+Structure',
+                bfs: true,
+                uniqueness: 'NODE_GLOBAL',
+                maxLevel: $max_depth
+            }) YIELD node
+            OPTIONAL MATCH (node)-[:HAS_VALUE]->(c:Content)
+            RETURN count(DISTINCT node) AS structures,
+                   count(DISTINCT c) AS contents
         }
+        RETURN structures, contents
+    """, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH)
 
+    record = result.single()
+    if not record:
+        return {"error": f"Source '{source_id}' not found"}
+
+    return {
+        "source_id": source_id,
+        "structures": record["structures"],
+        "contents": record["contents"],
+        "depth_truncated": _depth_truncated(tx, source_id),
+    }
+
+
+def _depth_truncated(tx, source_id: str) -> bool:
+    """Whether the source nests Structures deeper than MAX_TRAVERSAL_DEPTH."""
+    # subgraphNodes only accepts minLevel 0 or 1, so the probe uses
+    # expandConfig; NODE_GLOBAL with bfs reaches each node at its shortest
+    # depth, matching what the maxLevel-bounded traversals visit
+    result = tx.run("""
+        MATCH (:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+        CALL apoc.path.expandConfig(root, {
+            relationshipFilter: 'CONTAINS>',
+            labelFilter: '+Structure',
+            bfs: true,
+            uniqueness: 'NODE_GLOBAL',
+            minLevel: $depth,
+            maxLevel: $depth,
+            limit: 1
+        }) YIELD path
+        RETURN count(path) > 0 AS truncated
+    """, source_id=source_id, depth=MAX_TRAVERSAL_DEPTH + 1)
+
+    record = result.single()
+    return bool(record and record["truncated"])
 
-def decrement_ref_counts(driver, database: str, structures: List[str], contents: List[str]) -> Dict:
-    """Decrement ref_counts for the given nodes."""
-    stats = {"structures_updated": 0, "contents_updated": 0}
 
+def get_source_nodes(driver, database: str, source_id: str) -> Dict:
+    """Get all nodes reachable from a source."""
     with driver.session(database=database) as session:
-        # Decrement structure ref_counts
-        if structures:
-            result = session.run("""
-                UNWIND $merkles AS merkle
-                MATCH (s:Structure {merkle: merkle})
-                SET s.ref_count = CASE
-                    WHEN s.ref_count IS NULL THEN 0
-                    WHEN s.ref_count <= 1 THEN 0
-                    ELSE s.ref_count - 1
-                END
-                RETURN count(*) AS updated
-            """, merkles=structures)
-            stats["structures_updated"] = result.single()["updated"]
-
-        # Decrement content ref_counts
-        if contents:
-            result = session.run("""
-                UNWIND $hashes AS hash
-                MATCH (c:Content {hash: hash})
+        return session.execute_read(_get_source_nodes_tx, source_id)
+
+
+def count_source_nodes(driver, database: str, source_id: str) -> Dict:
+    """Count the nodes reachable from a source without returning their hashes."""
+    with driver.session(database=database) as session:
+        return session.execute_read(_count_source_nodes_tx, source_id)
+
+
+def _probe_source_tx(tx, source_id: str) -> Optional[bool]:
+    """Return whether the source has a root, or None if it does not exist."""
+    result = tx.run("""
+        MATCH (src:Source {source_id: $source_id})
+        OPTIONAL MATCH (src)-[:HAS_ROOT]->(root:Structure)
+        RETURN root IS NOT NULL AS has_root
+        LIMIT 1
+    """, source_id=source_id)
+
+    record = result.single()
+    if not record:
+        return None
+    return record["has_root"]
+
+
+def _release_source_tx(tx, source_id: str) -> Optional[Dict]:
+    """
+    Decrement ref_counts for every node reachable from the source, then
+    delete the Source node itself.
+
+    The traversal feeds the SET clauses directly, so merkles and hashes
+    never leave the server. Returns None if the source does not exist.
+    """
+    result = tx.run("""
+        MATCH (src:Source {source_id: $source_id})
+        CALL {
+            WITH src
+            MATCH (src)-[:HAS_ROOT]->(root:Structure)
+            CALL apoc.path.subgraphNodes(root, {
+                relationshipFilter: 'CONTAINS>',
+                labelFilter: '+Structure',
+                bfs: true,
+                uniqueness: 'NODE_GLOBAL',
+                maxLevel: $max_depth
+            }) YIELD node AS s
+            SET s.ref_count = CASE
+                WHEN s.ref_count <= 1 THEN 0
+                ELSE s.ref_count - 1
+            END
+            FOREACH (_ IN CASE WHEN s.ref_count = 0 THEN [1] ELSE [] END | SET s:Garbage)
+            WITH collect(s) AS structs
+            CALL {
+                WITH structs
+                UNWIND structs AS s
+                MATCH (s)-[:HAS_VALUE]->(c:Content)
+                WITH DISTINCT c
                 SET c.ref_count = CASE
-                    WHEN c.ref_count IS NULL THEN 0
                     WHEN c.ref_count <= 1 THEN 0
                     ELSE c.ref_count - 1
                 END
-                RETURN count(*) AS updated
-            """, hashes=contents)
-            stats["contents_updated"] = result.single()["updated"]
+                FOREACH (_ IN CASE WHEN c.ref_count = 0 THEN [1] ELSE [] END | SET c:Garbage)
+                RETURN count(c) AS contents_updated
+            }
+            RETURN size(structs) AS structures_updated, contents_updated
+        }
+        DETACH DELETE src
+        RETURN structures_updated, contents_updated
+    """, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH)
+
+    record = result.single()
+    if not record:
+        return None
+    return {
+        "structures_updated": record["structures_updated"],
+        "contents_updated": record["contents_updated"],
+        "source_deleted": True,
+    }
+
+
+def _decrement_ref_counts_tx(tx, structures: Sequence[str], contents: Sequence[str]) -> Dict:
+    # No RETURN: the statements stream nothing back, and the per-chunk
+    # count comes from the summary (one ref_count set per matched node)
+    stats = {"structures_updated": 0, "contents_updated": 0}
+
+    # Decrement structure ref_counts
+    for i in range(0, len(structures), DECREMENT_CHUNK_SIZE):
+        result = tx.run("""
+            UNWIND $merkles AS merkle
+            MATCH (s:Structure {merkle: merkle})
+            SET s.ref_count = CASE
+                WHEN s.ref_count <= 1 THEN 0
+                ELSE s.ref_count - 1
+            END
+            FOREACH (_ IN CASE WHEN s.ref_count = 0 THEN [1] ELSE [] END | SET s:Garbage)
+        """, merkles=structures[i:i + DECREMENT_CHUNK_SIZE])
+        stats["structures_updated"] += result.consume().counters.properties_set
+
+    # Decrement content ref_counts
+    for i in range(0, len(contents), DECREMENT_CHUNK_SIZE):
+        result = tx.run("""
+            UNWIND $hashes AS hash
+            MATCH (c:Content {hash: hash})
+            SET c.ref_count = CASE
+                WHEN c.ref_count <= 1 THEN 0
+                ELSE c.ref_count - 1
+            END
+            FOREACH (_ IN CASE WHEN c.ref_count = 0 THEN [1] ELSE [] END | SET c:Garbage)
+        """, hashes=contents[i:i + DECREMENT_CHUNK_SIZE])
+        stats["contents_updated"] += result.consume().counters.properties_set
 
     return stats
 
 
+def _delete_source_tx(tx, source_id: str) -> bool:
+    result = tx.run("""
+        MATCH (src:Source {source_id: $source_id})
+        DETACH DELETE src
+        RETURN count(*) AS deleted
+    """, source_id=source_id)
+
+    return result.single()["deleted"] > 0
+
+
+def _garbage_collect_tx(tx) -> Dict:
+    stats = {"structures_deleted": 0, "contents_deleted": 0}
+
+    # Delete orphaned structures with ref_count=0
+    result = tx.run("""
+        MATCH (s:Structure:Garbage)
+        WHERE apoc.node.degree.in(s, 'HAS_ROOT') = 0
+          AND apoc.node.degree.in(s, 'CONTAINS') = 0
+        DETACH DELETE s
+        RETURN count(*) AS deleted
+    """)
+    stats["structures_deleted"] = result.single()["deleted"]
+
+    # Delete orphaned content with ref_count=0
+    result = tx.run("""
+        MATCH (c:Content:Garbage)
+        WHERE apoc.node.degree.in(c, 'HAS_VALUE') = 0
+        DELETE c
+        RETURN count(*) AS deleted
+    """)
+    stats["contents_deleted"] = result.single()["deleted"]
+
+    return stats
+
+
+def _delete_source_full_tx(tx, source_id: str, run_gc: bool) -> Optional[Dict]:
+    """Decrement, delete the Source and optionally GC, all in one transaction."""
+    has_root = _probe_source_tx(tx, source_id)
+    if has_root is None:
+        return None
+
+    if has_root:
+        # Decrements and deletes the Source in one statement, so the GC
+        # sweep below sees the now-unrooted root Structure
+        stats = _release_source_tx(tx, source_id)
+    else:
+        # Nothing reachable; skip the traversal entirely
+        stats = {
+            "structures_updated": 0,
+            "contents_updated": 0,
+            "source_deleted": _delete_source_tx(tx, source_id),
+        }
+
+    if run_gc:
+        stats.update(_garbage_collect_tx(tx))
+    return stats
+
+
+def decrement_ref_counts(driver, database: str, structures: Sequence[str], contents: Sequence[str]) -> Dict:
+    """Decrement ref_counts for the given nodes (each merkle/hash at most once)."""
+    structures = tuple(set(structures))
+    contents = tuple(set(contents))
+    if not structures and not contents:
+        return {"structures_updated": 0, "contents_updated": 0}
+
+    with driver.session(database=database) as session:
+        return session.execute_write(_decrement_ref_counts_tx, structures, contents)
+
+
 def delete_source(driver, database: str, source_id: str) -> bool:
     """Delete the Source node and its HAS_ROOT relationship."""
     with driver.session(database=database) as session:
-        result = session.run("""
-            MATCH (src:Source {source_id: $source_id})
-            DETACH DELETE src
-            RETURN count(*) AS deleted
-        """, source_id=source_id)
-
-        return result.single()["deleted"] > 0
+        return session.execute_write(_delete_source_tx, source_id)
 
 
 def garbage_collect(driver, database: str) -> Dict:
     """
-    Remove nodes with ref_count=0 that have no incoming relationships.
+    Remove :Garbage (ref_count=0) nodes that have no incoming relationships.
 
     This is safe because:
     - Content nodes with ref_count=0 and no HAS_VALUE relationships are unused
     - Structure nodes with ref_count=0 and no HAS_ROOT/CONTAINS relationships are unused
     """
-    stats = {"structures_deleted": 0, "contents_deleted": 0}
-
     with driver.session(database=database) as session:
-        # Delete orphaned structures with ref_count=0
-        result = session.run("""
-            MATCH (s:Structure)
-            WHERE (s.ref_count IS NULL OR s.ref_count = 0)
-              AND NOT ()-[:HAS_ROOT]->(s)
-              AND NOT ()-[:CONTAINS]->(s)
-            DETACH DELETE s
-            RETURN count(*) AS deleted
-        """)
-        stats["structures_deleted"] = result.single()["deleted"]
-
-        # Delete orphaned content with ref_count=0
-        result = session.run("""
-            MATCH (c:Content)
-            WHERE (c.ref_count IS NULL OR c.ref_count = 0)
-              AND NOT ()-[:HAS_VALUE]->(c)
-            DELETE c
-            RETURN count(*) AS deleted
-        """)
-        stats["contents_deleted"] = result.single()["deleted"]
-
-    return stats
+        return session.execute_write(_garbage_collect_tx)
 
 
 def delete_source_full(source_id: str, run_gc: bool = True, dry_run: bool = False, verbose: bool = True) -> Dict:
@@ -183,7 +395,7 @@ def delete_source_full(source_id: str, run_gc: bool = True, dry_run: bool = Fals
     Full source deletion with ref_count management and optional GC.
     """
     config = get_config()
-    driver = GraphDatabase.driver(config["uri"], auth=(config["user"], config["password"]))
+    driver = get_shared_driver(config["uri"], config["user"], config["password"])
 
     results = {
         "source_id": source_id,
@@ -195,54 +407,61 @@ def delete_source_full(source_id: str, run_gc: bool = True, dry_run: bool = Fals
         "gc_contents": 0,
     }
 
-    try:
-        # Get nodes associated with this source
-        nodes = get_source_nodes(driver, config["database"], source_id)
+    if schema_enabled():
+        ensure_schema(driver, config["database"])
 
+    if dry_run:
+        # Counts only; nothing is changed
+        nodes = count_source_nodes(driver, config["database"], source_id)
         if "error" in nodes:
             results["error"] = nodes["error"]
             return results
 
-        results["structures_affected"] = len(nodes["structures"])
-        results["contents_affected"] = len(nodes["contents"])
+        results["structures_affected"] = nodes["structures"]
+        results["contents_affected"] = nodes["contents"]
+
+        if nodes["depth_truncated"]:
+            results["depth_truncated"] = True
+            log.warning(
+                f"  Source nests deeper than HYBRIDGRAPH_MAX_DEPTH={MAX_TRAVERSAL_DEPTH}; "
+                "nodes below that depth would not be released"
+            )
 
         if verbose:
-            print(f"Source: {source_id}")
-            print(f"  Structures to update: {len(nodes['structures'])}")
-            print(f"  Content nodes to update: {len(nodes['contents'])}")
+            log.info(f"Source: {source_id}")
+            log.info(f"  Structures to update: {nodes['structures']}")
+            log.info(f"  Content nodes to update: {nodes['contents']}")
+            log.info("  [DRY RUN] No changes made")
+        return results
 
-        if dry_run:
-            if verbose:
-                print("  [DRY RUN] No changes made")
-            return results
+    # Decrement ref_counts, delete the source and GC in one transaction;
+    # the traversal runs server-side, so only counts come back
+    with driver.session(database=config["database"]) as session:
+        tx_stats = session.execute_write(_delete_source_full_tx, source_id, run_gc)
 
-        # Decrement ref_counts
-        dec_stats = decrement_ref_counts(
-            driver, config["database"],
-            nodes["structures"], nodes["contents"]
-        )
+    if tx_stats is None:
+        results["error"] = f"Source '{source_id}' not found"
+        return results
 
-        if verbose:
-            print(f"  Decremented {dec_stats['structures_updated']} structure ref_counts")
-            print(f"  Decremented {dec_stats['contents_updated']} content ref_counts")
+    results["structures_affected"] = tx_stats["structures_updated"]
+    results["contents_affected"] = tx_stats["contents_updated"]
 
-        # Delete source
-        results["source_deleted"] = delete_source(driver, config["database"], source_id)
+    if verbose:
+        log.info(f"Source: {source_id}")
 
-        if verbose:
-            print(f"  Source deleted: {results['source_deleted']}")
+    results["source_deleted"] = tx_stats["source_deleted"]
 
-        # Run garbage collection
-        if run_gc:
-            gc_stats = garbage_collect(driver, config["database"])
-            results["gc_structures"] = gc_stats["structures_deleted"]
-            results["gc_contents"] = gc_stats["contents_deleted"]
+    if verbose:
+        log.info(f"  Decremented {tx_stats['structures_updated']} structure ref_counts")
+        log.info(f"  Decremented {tx_stats['contents_updated']} content ref_counts")
+        log.info(f"  Source deleted: {results['source_deleted']}")
 
-            if verbose:
-                print(f"  GC: removed {gc_stats['structures_deleted']} structures, {gc_stats['contents_deleted']} content")
+    if run_gc:
+        results["gc_structures"] = tx_stats["structures_deleted"]
+        results["gc_contents"] = tx_stats["contents_deleted"]
 
-    finally:
-        driver.close()
+        if verbose:
+            log.info(f"  GC: removed {tx_stats['structures_deleted']} structures, {tx_stats['contents_deleted']} content")
 
     return results
 
@@ -256,8 +475,8 @@ def main():
     args = parser.parse_args()
 
     # Check for task params (stack runner mode)
-    if os.environ.get("TASK_PARAMS"):
-        params = json.loads(os.environ.get("TASK_PARAMS", "{}"))
+    if TASK_PARAMS:
+        params = loads(TASK_PARAMS)
         source_id = params.get("source_id", args.source_id)
         run_gc = params.get("gc", True)
         dry_run = params.get("dry_run", False)
@@ -266,9 +485,9 @@ def main():
         run_gc = not args.no_gc
         dry_run = args.dry_run
 
-    print("=" * 60)
-    print(f"DELETE SOURCE: {source_id}")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info(f"DELETE SOURCE: {source_id}")
+    log.info("=" * 60)
 
     results = delete_source_full(
         source_id,
@@ -277,22 +496,22 @@ def main():
         verbose=not args.quiet
     )
 
-    print("\n" + "=" * 60)
-    print("RESULTS")
-    print("=" * 60)
+    log.info("\n" + "=" * 60)
+    log.info("RESULTS")
+    log.info("=" * 60)
 
     if "error" in results:
-        print(f"Error: {results['error']}")
+        log.info(f"Error: {results['error']}")
     else:
-        print(f"Structures affected: {results['structures_affected']}")
-        print(f"Content nodes affected: {results['contents_affected']}")
-        print(f"Source deleted: {results['source_deleted']}")
+        log.info(f"Structures affected: {results['structures_affected']}")
+        log.info(f"Content nodes affected: {results['contents_affected']}")
+        log.info(f"Source deleted: {results['source_deleted']}")
         if run_gc:
-            print(f"GC structures: {results['gc_structures']}")
-            print(f"GC content: {results['gc_contents']}")
+            log.info(f"GC structures: {results['gc_structures']}")
+            log.info(f"GC content: {results['gc_contents']}")
 
     # Output for stack runner
-    if os.environ.get("TASK_PARAMS"):
+    if TASK_PARAMS:
         task_result = {
             "__task_result__": True,
             "output": results,
@@ -303,7 +522,9 @@ def main():
                 f"Deleted source: {source_id}" if results.get("source_deleted") else f"Failed to delete: {source_id}",
             ],
         }
-        print(json.dumps(task_result))
+        _flush_log()
+        sys.stdout.write(dumps(task_result) + "\n")
+        sys.stdout.flush()
 
 
 if __name__ == "__main__":
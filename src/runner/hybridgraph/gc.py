@@ -6,24 +6,68 @@ Removes unreferenced nodes:
 - Content nodes with ref_count=0 and no HAS_VALUE relationships
 - Structure nodes with ref_count=0 and no HAS_ROOT/CONTAINS relationships
 
+Decrements that drive a ref_count to 0 tag the node :Garbage, and GC only
+visits :Garbage nodes. Use --fix-counts once to backfill missing ref_counts
+and (re)tag nodes written before the label was maintained.
+
 Usage:
   python garbage_collect_task.py [--dry-run] [--verbose]
   Via stack runner: as 'garbage_collect' task
 """
 
 import argparse
-import json
+import functools
+import logging
+import logging.handlers
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 try:
-    from neo4j import GraphDatabase
+    # Availability check only; connections come from get_shared_driver
+    import neo4j  # noqa: F401
 except ImportError:
     print("Error: neo4j driver not installed")
     sys.exit(1)
 
+try:
+    from runner.hybridgraph.schema import ensure_schema, schema_enabled
+    from runner.utils.fastjson import dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+except ImportError:
+    # Fallback for direct execution
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from runner.hybridgraph.schema import ensure_schema, schema_enabled
+    from runner.utils.fastjson import dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+
+
+# Progress output is buffered and written in batches instead of one
+# blocking stdout write per line; _flush_log() drains it before the
+# stack-runner result is emitted.
+log = logging.getLogger(__name__)
+if not log.handlers:
+    _stream_handler = logging.StreamHandler(sys.stdout)
+    _stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(logging.handlers.MemoryHandler(
+        capacity=100, flushLevel=logging.ERROR, target=_stream_handler
+    ))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
 
+def _flush_log():
+    for handler in log.handlers:
+        handler.flush()
+
+
+# Stack-runner parameters, read once at import; None when run from the CLI
+TASK_PARAMS = os.environ.get("TASK_PARAMS")
+
+
+@functools.lru_cache(maxsize=1)
 def get_config():
     return {
         "uri": os.environ.get("NEO4J_URI", "bolt://localhost:7687"),
@@ -33,86 +77,207 @@ def get_config():
     }
 
 
+def _analyze_garbage_tx(tx) -> dict:
+    # Orphaned (collectable) and inconsistent (ref_count=0 but still
+    # referenced) counts from a single pass per label
+    result = tx.run("""
+        MATCH (s:Structure)
+        WITH s, s.ref_count = 0 AS unreferenced,
+             apoc.node.degree.in(s, 'HAS_ROOT') > 0
+               OR apoc.node.degree.in(s, 'CONTAINS') > 0 AS referenced
+        RETURN sum(CASE WHEN s:Garbage AND NOT referenced THEN 1 ELSE 0 END) AS orphaned,
+               sum(CASE WHEN unreferenced AND referenced THEN 1 ELSE 0 END) AS inconsistent
+    """)
+    record = result.single()
+    orphaned_structures = record["orphaned"]
+    inconsistent_structures = record["inconsistent"]
+
+    result = tx.run("""
+        MATCH (c:Content)
+        WITH c, c.ref_count = 0 AS unreferenced,
+             apoc.node.degree.in(c, 'HAS_VALUE') > 0 AS referenced
+        RETURN sum(CASE WHEN c:Garbage AND NOT referenced THEN 1 ELSE 0 END) AS orphaned,
+               sum(CASE WHEN unreferenced AND referenced THEN 1 ELSE 0 END) AS inconsistent
+    """)
+    record = result.single()
+    orphaned_content = record["orphaned"]
+    inconsistent_content = record["inconsistent"]
+
+    return {
+        "orphaned_structures": orphaned_structures,
+        "orphaned_content": orphaned_content,
+        "inconsistent_structures": inconsistent_structures,
+        "inconsistent_content": inconsistent_content,
+    }
+
+
 def analyze_garbage(driver, database: str) -> dict:
     """Analyze nodes that would be garbage collected."""
     with driver.session(database=database) as session:
-        # Count orphaned structures
-        result = session.run("""
-            MATCH (s:Structure)
-            WHERE (s.ref_count IS NULL OR s.ref_count = 0)
-              AND NOT ()-[:HAS_ROOT]->(s)
-              AND NOT ()-[:CONTAINS]->(s)
-            RETURN count(s) AS count
-        """)
-        orphaned_structures = result.single()["count"]
-
-        # Count orphaned content
-        result = session.run("""
-            MATCH (c:Content)
-            WHERE (c.ref_count IS NULL OR c.ref_count = 0)
-              AND NOT ()-[:HAS_VALUE]->(c)
-            RETURN count(c) AS count
-        """)
-        orphaned_content = result.single()["count"]
-
-        # Count structures with ref_count=0 but still referenced
-        result = session.run("""
-            MATCH (s:Structure)
-            WHERE (s.ref_count IS NULL OR s.ref_count = 0)
-              AND (()-[:HAS_ROOT]->(s) OR ()-[:CONTAINS]->(s))
-            RETURN count(s) AS count
-        """)
-        inconsistent_structures = result.single()["count"]
-
-        # Count content with ref_count=0 but still referenced
-        result = session.run("""
-            MATCH (c:Content)
-            WHERE (c.ref_count IS NULL OR c.ref_count = 0)
-              AND ()-[:HAS_VALUE]->(c)
-            RETURN count(c) AS count
-        """)
-        inconsistent_content = result.single()["count"]
-
-        return {
-            "orphaned_structures": orphaned_structures,
-            "orphaned_content": orphaned_content,
-            "inconsistent_structures": inconsistent_structures,
-            "inconsistent_content": inconsistent_content,
+        return session.execute_read(_analyze_garbage_tx)
+
+
+def _backfill_ref_counts_tx(tx) -> int:
+    # One branch per label, so each is a label scan rather than a scan of
+    # every node in the store
+    result = tx.run("""
+        CALL {
+            MATCH (n:Structure)
+            WHERE n.ref_count IS NULL
+            RETURN n
+            UNION ALL
+            MATCH (n:Content)
+            WHERE n.ref_count IS NULL
+            RETURN n
+        }
+        SET n.ref_count = 0, n:Garbage
+        RETURN count(*) AS backfilled
+    """)
+    return result.single()["backfilled"]
+
+
+def backfill_ref_counts(driver, database: str) -> int:
+    """
+    Set missing ref_counts to 0 (and tag those nodes :Garbage).
+
+    The GC and delete queries compare ref_count directly, without an
+    IS NULL branch, so they can use the ref_count indexes. Nodes written
+    without a ref_count need this one-off backfill to be seen by them.
+    """
+    with driver.session(database=database) as session:
+        return session.execute_write(_backfill_ref_counts_tx)
+
+
+def _fix_ref_counts_tx(tx) -> dict:
+    stats = {"structures_fixed": 0, "contents_fixed": 0}
+
+    # Fix Structure ref_counts based on actual incoming relationships,
+    # counting from the HAS_ROOT side instead of joining every Structure
+    # against every Source
+    result = tx.run("""
+        MATCH (src:Source)-[:HAS_ROOT]->(s:Structure)
+        WITH s, count(DISTINCT src) AS actual_refs
+        WHERE s.ref_count <> actual_refs
+        SET s.ref_count = actual_refs
+        RETURN count(*) AS fixed
+    """)
+    stats["structures_fixed"] = result.single()["fixed"]
+
+    # Structures no Source points at
+    result = tx.run("""
+        MATCH (s:Structure)
+        WHERE apoc.node.degree.in(s, 'HAS_ROOT') = 0 AND s.ref_count <> 0
+        SET s.ref_count = 0
+        RETURN count(*) AS fixed
+    """)
+    stats["structures_fixed"] += result.single()["fixed"]
+
+    # Note: Content ref_counts are trickier because they depend on
+    # structure ref_counts. For now, just ensure they're not negative
+    result = tx.run("""
+        MATCH (c:Content)
+        WHERE c.ref_count < 0
+        SET c.ref_count = 0
+        RETURN count(*) AS fixed
+    """)
+    stats["contents_fixed"] = result.single()["fixed"]
+
+    # Keep the :Garbage label in step with the corrected ref_counts (one
+    # branch per label, avoiding a scan of every node in the store)
+    tx.run("""
+        CALL {
+            MATCH (n:Structure)
+            WHERE n.ref_count = 0 AND NOT n:Garbage
+            RETURN n
+            UNION ALL
+            MATCH (n:Content)
+            WHERE n.ref_count = 0 AND NOT n:Garbage
+            RETURN n
         }
+        SET n:Garbage
+    """).consume()
+    tx.run("""
+        MATCH (n:Garbage)
+        WHERE n.ref_count > 0
+        REMOVE n:Garbage
+    """).consume()
+
+    return stats
 
 
 def fix_ref_counts(driver, database: str) -> dict:
     """Fix ref_count values that don't match actual references."""
-    stats = {"structures_fixed": 0, "contents_fixed": 0}
+    nulls_backfilled = backfill_ref_counts(driver, database)
 
     with driver.session(database=database) as session:
-        # Fix Structure ref_counts based on actual incoming relationships
-        result = session.run("""
-            MATCH (s:Structure)
-            OPTIONAL MATCH (src:Source)-[:HAS_ROOT]->(s)
-            WITH s, count(DISTINCT src) AS actual_refs
-            WHERE s.ref_count <> actual_refs
-            SET s.ref_count = actual_refs
-            RETURN count(*) AS fixed
-        """)
-        stats["structures_fixed"] = result.single()["fixed"]
-
-        # Note: Content ref_counts are trickier because they depend on
-        # structure ref_counts. For now, just ensure they're not negative
-        result = session.run("""
-            MATCH (c:Content)
-            WHERE c.ref_count IS NULL OR c.ref_count < 0
-            SET c.ref_count = 0
-            RETURN count(*) AS fixed
-        """)
-        stats["contents_fixed"] = result.single()["fixed"]
+        stats = session.execute_write(_fix_ref_counts_tx)
 
+    stats["nulls_backfilled"] = nulls_backfilled
     return stats
 
 
+def _count_orphaned_structures_tx(tx) -> int:
+    result = tx.run("""
+        MATCH (s:Structure:Garbage)
+        WHERE apoc.node.degree.in(s, 'HAS_ROOT') = 0
+          AND apoc.node.degree.in(s, 'CONTAINS') = 0
+        RETURN count(s) AS count
+    """)
+    return result.single()["count"]
+
+
+def _delete_orphaned_structures_tx(tx) -> int:
+    result = tx.run("""
+        MATCH (s:Structure:Garbage)
+        WHERE apoc.node.degree.in(s, 'HAS_ROOT') = 0
+          AND apoc.node.degree.in(s, 'CONTAINS') = 0
+        DETACH DELETE s
+        RETURN count(*) AS deleted
+    """)
+    return result.single()["deleted"]
+
+
+def _count_orphaned_contents_tx(tx) -> int:
+    result = tx.run("""
+        MATCH (c:Content:Garbage)
+        WHERE apoc.node.degree.in(c, 'HAS_VALUE') = 0
+        RETURN count(c) AS count
+    """)
+    return result.single()["count"]
+
+
+def _delete_orphaned_contents_tx(tx) -> int:
+    result = tx.run("""
+        MATCH (c:Content:Garbage)
+        WHERE apoc.node.degree.in(c, 'HAS_VALUE') = 0
+        DELETE c
+        RETURN count(*) AS deleted
+    """)
+    return result.single()["deleted"]
+
+
+def _collect_structures(driver, database: str, dry_run: bool) -> int:
+    """Delete (or count) orphaned :Garbage structures on its own session."""
+    with driver.session(database=database) as session:
+        if dry_run:
+            return session.execute_read(_count_orphaned_structures_tx)
+        return session.execute_write(_delete_orphaned_structures_tx)
+
+
+def _collect_contents(driver, database: str, dry_run: bool) -> int:
+    """Delete (or count) orphaned :Garbage content on its own session."""
+    with driver.session(database=database) as session:
+        if dry_run:
+            return session.execute_read(_count_orphaned_contents_tx)
+        return session.execute_write(_delete_orphaned_contents_tx)
+
+
 def garbage_collect(driver, database: str, dry_run: bool = False) -> dict:
     """
-    Remove nodes with ref_count=0 that have no incoming relationships.
+    Remove :Garbage nodes that have no incoming relationships.
+
+    The Structure and Content sweeps touch disjoint labels, so they run
+    concurrently on separate sessions of the (thread-safe) driver.
     """
     stats = {
         "structures_deleted": 0,
@@ -120,45 +285,15 @@ def garbage_collect(driver, database: str, dry_run: bool = False) -> dict:
         "dry_run": dry_run,
     }
 
-    with driver.session(database=database) as session:
-        if dry_run:
-            # Just count what would be deleted
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE (s.ref_count IS NULL OR s.ref_count = 0)
-                  AND NOT ()-[:HAS_ROOT]->(s)
-                  AND NOT ()-[:CONTAINS]->(s)
-                RETURN count(s) AS count
-            """)
-            stats["structures_deleted"] = result.single()["count"]
-
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE (c.ref_count IS NULL OR c.ref_count = 0)
-                  AND NOT ()-[:HAS_VALUE]->(c)
-                RETURN count(c) AS count
-            """)
-            stats["contents_deleted"] = result.single()["count"]
-        else:
-            # Actually delete
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE (s.ref_count IS NULL OR s.ref_count = 0)
-                  AND NOT ()-[:HAS_ROOT]->(s)
-                  AND NOT ()-[:CONTAINS]->(s)
-                DETACH DELETE s
-                RETURN count(*) AS deleted
-            """)
-            stats["structures_deleted"] = result.single()["deleted"]
-
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE (c.ref_count IS NULL OR c.ref_count = 0)
-                  AND NOT ()-[:HAS_VALUE]->(c)
-                DELETE c
-                RETURN count(*) AS deleted
-            """)
-            stats["contents_deleted"] = result.single()["deleted"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        structures = pool.submit(_collect_structures, driver, database, dry_run)
+        contents = pool.submit(_collect_contents, driver, database, dry_run)
+        stats["structures_deleted"] = structures.result()
+        stats["contents_deleted"] = contents.result()
+
+    if not dry_run and stats["structures_deleted"]:
+        # Pick up content whose last HAS_VALUE went with the structures above
+        stats["contents_deleted"] += _collect_contents(driver, database, dry_run)
 
     return stats
 
@@ -166,7 +301,7 @@ def garbage_collect(driver, database: str, dry_run: bool = False) -> dict:
 def run_gc(dry_run: bool = False, fix_counts: bool = False, verbose: bool = True) -> dict:
     """Run full garbage collection with optional ref_count fixing."""
     config = get_config()
-    driver = GraphDatabase.driver(config["uri"], auth=(config["user"], config["password"]))
+    driver = get_shared_driver(config["uri"], config["user"], config["password"])
 
     results = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -176,36 +311,36 @@ def run_gc(dry_run: bool = False, fix_counts: bool = False, verbose: bool = True
         "fix_counts": {},
     }
 
-    try:
-        # Analyze current state
-        results["analysis"] = analyze_garbage(driver, config["database"])
+    if schema_enabled():
+        ensure_schema(driver, config["database"])
 
-        if verbose:
-            print("Analysis:")
-            print(f"  Orphaned structures: {results['analysis']['orphaned_structures']}")
-            print(f"  Orphaned content: {results['analysis']['orphaned_content']}")
-            print(f"  Inconsistent structures: {results['analysis']['inconsistent_structures']}")
-            print(f"  Inconsistent content: {results['analysis']['inconsistent_content']}")
-
-        # Fix ref_counts if requested
-        if fix_counts and not dry_run:
-            results["fix_counts"] = fix_ref_counts(driver, config["database"])
-            if verbose:
-                print(f"\nFixed ref_counts:")
-                print(f"  Structures: {results['fix_counts']['structures_fixed']}")
-                print(f"  Contents: {results['fix_counts']['contents_fixed']}")
-
-        # Run garbage collection
-        results["gc"] = garbage_collect(driver, config["database"], dry_run)
+    # Analyze current state
+    results["analysis"] = analyze_garbage(driver, config["database"])
 
+    if verbose:
+        log.info("Analysis:")
+        log.info(f"  Orphaned structures: {results['analysis']['orphaned_structures']}")
+        log.info(f"  Orphaned content: {results['analysis']['orphaned_content']}")
+        log.info(f"  Inconsistent structures: {results['analysis']['inconsistent_structures']}")
+        log.info(f"  Inconsistent content: {results['analysis']['inconsistent_content']}")
+
+    # Fix ref_counts if requested
+    if fix_counts and not dry_run:
+        results["fix_counts"] = fix_ref_counts(driver, config["database"])
         if verbose:
-            action = "Would delete" if dry_run else "Deleted"
-            print(f"\nGarbage Collection:")
-            print(f"  {action} structures: {results['gc']['structures_deleted']}")
-            print(f"  {action} content: {results['gc']['contents_deleted']}")
+            log.info(f"\nFixed ref_counts:")
+            log.info(f"  Structures: {results['fix_counts']['structures_fixed']}")
+            log.info(f"  Contents: {results['fix_counts']['contents_fixed']}")
+            log.info(f"  Missing ref_counts backfilled: {results['fix_counts']['nulls_backfilled']}")
+
+    # Run garbage collection
+    results["gc"] = garbage_collect(driver, config["database"], dry_run)
 
-    finally:
-        driver.close()
+    if verbose:
+        action = "Would delete" if dry_run else "Deleted"
+        log.info(f"\nGarbage Collection:")
+        log.info(f"  {action} structures: {results['gc']['structures_deleted']}")
+        log.info(f"  {action} content: {results['gc']['contents_deleted']}")
 
     return results
 
@@ -218,17 +353,17 @@ def main():
     args = parser.parse_args()
 
     # Check for task params (stack runner mode)
-    if os.environ.get("TASK_PARAMS"):
-        params = json.loads(os.environ.get("TASK_PARAMS", "{}"))
+    if TASK_PARAMS:
+        params = loads(TASK_PARAMS)
         dry_run = params.get("dry_run", False)
         fix_counts = params.get("fix_counts", False)
     else:
         dry_run = args.dry_run
         fix_counts = args.fix_counts
 
-    print("=" * 60)
-    print("HYBRIDGRAPH GARBAGE COLLECTION")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info("HYBRIDGRAPH GARBAGE COLLECTION")
+    log.info("=" * 60)
 
     results = run_gc(
         dry_run=dry_run,
@@ -236,16 +371,16 @@ def main():
         verbose=not args.quiet
     )
 
-    print("\n" + "=" * 60)
-    print("SUMMARY")
-    print("=" * 60)
+    log.info("\n" + "=" * 60)
+    log.info("SUMMARY")
+    log.info("=" * 60)
 
     total_deleted = results["gc"]["structures_deleted"] + results["gc"]["contents_deleted"]
     action = "would be deleted" if dry_run else "deleted"
-    print(f"Total nodes {action}: {total_deleted}")
+    log.info(f"Total nodes {action}: {total_deleted}")
 
     # Output for stack runner
-    if os.environ.get("TASK_PARAMS"):
+    if TASK_PARAMS:
         task_result = {
             "__task_result__": True,
             "output": results,
@@ -257,7 +392,9 @@ def main():
                 f"GC: {results['gc']['structures_deleted']} structures, {results['gc']['contents_deleted']} content",
             ],
         }
-        print(json.dumps(task_result))
+        _flush_log()
+        sys.stdout.write(dumps(task_result) + "\n")
+        sys.stdout.flush()
 
 
 if __name__ == "__main__":
@@ -9,23 +9,304 @@ Checks for:
 - Integrity issues (missing relationships)
 
 Usage:
-  python hybridgraph_health_task.py [--fix] [--verbose]
+  python hybridgraph_health_task.py [--fix] [--verbose] [--full-audit]
   Via stack runner: as 'hybridgraph_health' task
 """
 
 import argparse
-import json
+import functools
+import hashlib
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 try:
-    from neo4j import GraphDatabase
+    from neo4j import READ_ACCESS
 except ImportError:
     print("Error: neo4j driver not installed")
     sys.exit(1)
 
+try:
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph.schema import ensure_schema, explain_full_scans, schema_enabled
+    from runner.utils.fastjson import dump, dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+except ImportError:
+    # Fallback for direct execution
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph.schema import ensure_schema, explain_full_scans, schema_enabled
+    from runner.utils.fastjson import dump, dumps, loads
+    from runner.utils.neo4j import get_shared_driver
+
+
+# Rows kept in each issue/warning sample
+SAMPLE_LIMIT = 20
+
+# Nodes per label re-counted by the default (sampled) ref_count audit
+AUDIT_SAMPLE_SIZE = 500
+
+# Records pulled per round trip: sample queries need at most SAMPLE_LIMIT
+# rows, full listings are streamed in larger batches
+SAMPLE_FETCH_SIZE = SAMPLE_LIMIT
+LIST_FETCH_SIZE = 1000
+
+# Rows per inner transaction for fix_issues deletes/updates
+FIX_BATCH_SIZE = 10000
+
+
+def _cache_ttl_from_env() -> int:
+    """Read HYBRIDGRAPH_HEALTH_CACHE_TTL; unusable or negative values give 0."""
+    try:
+        ttl = int(os.environ.get("HYBRIDGRAPH_HEALTH_CACHE_TTL", "0"))
+    except ValueError:
+        return 0
+    return max(ttl, 0)
+
+
+# Seconds a report is reused while the graph's counts are unchanged;
+# 0 (the default) disables the report cache
+REPORT_CACHE_TTL = _cache_ttl_from_env()
+
+# Query text is kept constant across runs (limits and depth bounds are
+# parameters) so the server's plan cache is hit instead of replanning.
+# Count-store probes need literal labels, so they are built once per label.
+_Q_COUNT_NODES = {
+    label: f"MATCH (:{label}) RETURN count(*) AS count"
+    for label in ("Structure", "Content")
+}
+
+_Q_ORPHAN_STRUCT = """
+    MATCH (s:Structure)
+    WHERE apoc.node.degree.in(s, 'HAS_ROOT') = 0
+      AND apoc.node.degree.in(s, 'CONTAINS') = 0
+    RETURN apoc.agg.slice({merkle: s.merkle, kind: s.kind, key: s.key}, 0, $limit) AS sample,
+           count(s) AS count
+"""
+
+_Q_ORPHAN_CONTENT = """
+    MATCH (c:Content)
+    WHERE apoc.node.degree.in(c, 'HAS_VALUE') = 0
+    RETURN apoc.agg.slice({hash: c.hash, kind: c.kind, key: c.key}, 0, $limit) AS sample,
+           count(c) AS count
+"""
+
+_Q_SOURCES_WITHOUT_ROOT = """
+    MATCH (src:Source)
+    WHERE NOT (src)-[:HAS_ROOT]->()
+    RETURN src.source_id AS source_id
+"""
+
+# Full audit: every node is compared, so orphans, nodes under orphaned
+# parents and nodes deeper than MAX_TRAVERSAL_DEPTH get actual_refs 0.
+# Each Source tree is walked once (subgraphNodes, NODE_GLOBAL) into an
+# elementId -> source count map that the label scan then looks up.
+_Q_REF_COUNT_STRUCT = """
+    CALL {
+        MATCH (src:Source)-[:HAS_ROOT]->(root:Structure)
+        CALL apoc.path.subgraphNodes(root, {
+            relationshipFilter: 'CONTAINS>',
+            labelFilter: '+Structure',
+            bfs: true,
+            uniqueness: 'NODE_GLOBAL',
+            maxLevel: $max_depth
+        }) YIELD node
+        WITH node, count(DISTINCT src) AS refs
+        RETURN apoc.map.fromPairs(collect([elementId(node), refs])) AS reached
+    }
+    MATCH (s:Structure)
+    WITH s, coalesce(reached[elementId(s)], 0) AS actual_refs
+    WHERE s.ref_count IS NULL OR s.ref_count <> actual_refs
+    RETURN apoc.agg.slice({merkle: s.merkle, stored: s.ref_count, actual: actual_refs}, 0, $limit) AS sample,
+           count(*) AS count
+"""
+
+_Q_REF_COUNT_CONTENT = """
+    CALL {
+        MATCH (src:Source)-[:HAS_ROOT]->(root:Structure)
+        CALL apoc.path.subgraphNodes(root, {
+            relationshipFilter: 'CONTAINS>',
+            labelFilter: '+Structure',
+            bfs: true,
+            uniqueness: 'NODE_GLOBAL',
+            maxLevel: $max_depth
+        }) YIELD node
+        MATCH (node)-[:HAS_VALUE]->(c:Content)
+        WITH c, count(DISTINCT src) AS refs
+        RETURN apoc.map.fromPairs(collect([elementId(c), refs])) AS reached
+    }
+    MATCH (c:Content)
+    WITH c, coalesce(reached[elementId(c)], 0) AS actual_refs
+    WHERE c.ref_count IS NULL OR c.ref_count <> actual_refs
+    RETURN apoc.agg.slice({hash: c.hash, stored: c.ref_count, actual: actual_refs}, 0, $limit) AS sample,
+           count(*) AS count
+"""
+
+# Sampled audit: walk up from a random sample of nodes to the Sources
+# that reach them, instead of walking down every Source tree
+_Q_REF_COUNT_STRUCT_SAMPLED = """
+    MATCH (s:Structure)
+    WITH s ORDER BY rand() LIMIT $sample_size
+    CALL {
+        WITH s
+        CALL apoc.path.subgraphNodes(s, {
+            relationshipFilter: '<CONTAINS|<HAS_ROOT',
+            labelFilter: '>Source',
+            uniqueness: 'NODE_GLOBAL',
+            maxLevel: $max_depth + 1
+        }) YIELD node
+        RETURN count(node) AS actual_refs
+    }
+    WITH count(*) AS sampled,
+         [x IN collect({merkle: s.merkle, stored: s.ref_count, actual: actual_refs})
+          WHERE x.stored IS NULL OR x.stored <> x.actual] AS mismatches
+    RETURN sampled, mismatches[..$limit] AS sample, size(mismatches) AS count
+"""
+
+_Q_REF_COUNT_CONTENT_SAMPLED = """
+    MATCH (c:Content)
+    WITH c ORDER BY rand() LIMIT $sample_size
+    CALL {
+        WITH c
+        CALL apoc.path.subgraphNodes(c, {
+            relationshipFilter: '<HAS_VALUE|<CONTAINS|<HAS_ROOT',
+            labelFilter: '>Source',
+            uniqueness: 'NODE_GLOBAL',
+            maxLevel: $max_depth + 2
+        }) YIELD node
+        RETURN count(node) AS actual_refs
+    }
+    WITH count(*) AS sampled,
+         [x IN collect({hash: c.hash, stored: c.ref_count, actual: actual_refs})
+          WHERE x.stored IS NULL OR x.stored <> x.actual] AS mismatches
+    RETURN sampled, mismatches[..$limit] AS sample, size(mismatches) AS count
+"""
+
+# One branch per label: "MATCH (n) WHERE n:A OR n:B" plans as AllNodesScan
+_Q_INVALID_REF_COUNT = """
+    CALL {
+        MATCH (s:Structure)
+        WHERE s.ref_count IS NULL OR s.ref_count < 0
+        RETURN 'Structure' AS label, count(*) AS count
+        UNION ALL
+        MATCH (c:Content)
+        WHERE c.ref_count IS NULL OR c.ref_count < 0
+        RETURN 'Content' AS label, count(*) AS count
+    }
+    RETURN label, count
+"""
+
+_Q_HASH_CONSTRAINED = """
+    SHOW CONSTRAINTS
+    YIELD type, labelsOrTypes, properties
+    WHERE type IN ['UNIQUENESS', 'NODE_KEY']
+      AND labelsOrTypes = ['Content'] AND properties = ['hash']
+    RETURN count(*) > 0 AS constrained
+"""
+
+_Q_DUPLICATE_HASHES = """
+    MATCH (c:Content)
+    WITH c.hash AS hash, count(*) AS count
+    WHERE count > 1
+    RETURN apoc.agg.slice({hash: hash, count: count}, 0, $limit) AS sample,
+           count(*) AS total
+"""
+
+_Q_OVERALL_STATS = """
+    CALL { MATCH (:Source) RETURN count(*) AS sources }
+    CALL { MATCH (:Structure) RETURN count(*) AS structures }
+    CALL { MATCH (:Content) RETURN count(*) AS contents }
+    CALL { MATCH ()-[:HAS_ROOT]->() RETURN count(*) AS has_root }
+    CALL { MATCH ()-[:CONTAINS]->() RETURN count(*) AS contains }
+    CALL { MATCH ()-[:HAS_VALUE]->() RETURN count(*) AS has_value }
+    RETURN sources, structures, contents, has_root, contains, has_value
+"""
+
+# Both labels in one round trip. Node totals come from the count store;
+# sum/max read the ref_count range indexes (IS NOT NULL makes them usable)
+# instead of scanning the node store. Ratios are percentages, null when
+# nothing is referenced.
+_Q_DEDUP_STATS = """
+    CALL { MATCH (:Content) RETURN count(*) AS content_unique }
+    CALL {
+        MATCH (c:Content) WHERE c.ref_count IS NOT NULL
+        RETURN coalesce(sum(c.ref_count), 0) AS content_total, coalesce(max(c.ref_count), 0) AS content_max
+    }
+    CALL { MATCH (:Structure) RETURN count(*) AS structure_unique }
+    CALL {
+        MATCH (s:Structure) WHERE s.ref_count IS NOT NULL
+        RETURN coalesce(sum(s.ref_count), 0) AS structure_total, coalesce(max(s.ref_count), 0) AS structure_max
+    }
+    RETURN content_unique, content_total, content_max,
+           CASE WHEN content_total > 0
+                THEN 100.0 * (content_total - content_unique) / content_total END AS content_ratio,
+           structure_unique, structure_total, structure_max,
+           CASE WHEN structure_total > 0
+                THEN 100.0 * (structure_total - structure_unique) / structure_total END AS structure_ratio
+"""
+
+# Fixes commit every FIX_BATCH_SIZE rows (CALL { } IN TRANSACTIONS), so
+# they must run as auto-commit queries via session.run
+_Q_FIX_ORPHAN_STRUCT = """
+    MATCH (s:Structure)
+    WHERE NOT ()-[:HAS_ROOT]->(s) AND NOT ()-[:CONTAINS]->(s)
+    CALL {
+        WITH s
+        DETACH DELETE s
+    } IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+_Q_FIX_ORPHAN_CONTENT = """
+    MATCH (c:Content)
+    WHERE NOT ()-[:HAS_VALUE]->(c)
+    CALL {
+        WITH c
+        DELETE c
+    } IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+_Q_FIX_REF_COUNT = """
+    CALL {
+        MATCH (s:Structure)
+        WHERE s.ref_count IS NULL OR s.ref_count < 0
+        RETURN s AS n
+        UNION ALL
+        MATCH (c:Content)
+        WHERE c.ref_count IS NULL OR c.ref_count < 0
+        RETURN c AS n
+    }
+    CALL {
+        WITH n
+        SET n.ref_count = 0, n:Garbage
+    } IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+
+# Read queries EXPLAINed by verify_query_plans (SHOW commands cannot be
+# EXPLAINed); the per-label count-store probes are trivially label-bound
+_PLAN_CHECKED_QUERIES = {
+    "_Q_ORPHAN_STRUCT": _Q_ORPHAN_STRUCT,
+    "_Q_ORPHAN_CONTENT": _Q_ORPHAN_CONTENT,
+    "_Q_SOURCES_WITHOUT_ROOT": _Q_SOURCES_WITHOUT_ROOT,
+    "_Q_REF_COUNT_STRUCT": _Q_REF_COUNT_STRUCT,
+    "_Q_REF_COUNT_CONTENT": _Q_REF_COUNT_CONTENT,
+    "_Q_REF_COUNT_STRUCT_SAMPLED": _Q_REF_COUNT_STRUCT_SAMPLED,
+    "_Q_REF_COUNT_CONTENT_SAMPLED": _Q_REF_COUNT_CONTENT_SAMPLED,
+    "_Q_INVALID_REF_COUNT": _Q_INVALID_REF_COUNT,
+    "_Q_DUPLICATE_HASHES": _Q_DUPLICATE_HASHES,
+    "_Q_OVERALL_STATS": _Q_OVERALL_STATS,
+    "_Q_DEDUP_STATS": _Q_DEDUP_STATS,
+}
+
+
+# Stack-runner parameters, read once at import; None when run from the CLI
+TASK_PARAMS = os.environ.get("TASK_PARAMS")
+
 
 def get_config():
     return {
@@ -37,48 +318,59 @@ def get_config():
 
 
 class HealthChecker:
-    """Health checker for hybridgraph database."""
+    """
+    Health checker for hybridgraph database.
+
+    Every check is read-only, so sessions are opened in READ_ACCESS mode
+    and can be routed to followers/read replicas in a cluster.
+    """
 
-    def __init__(self, driver, database: str):
+    def __init__(self, driver, database: str, audit_sample: Optional[int] = AUDIT_SAMPLE_SIZE):
         self.driver = driver
         self.database = database
+        # Nodes per label re-counted by check_ref_count_accuracy; None
+        # audits every node
+        self.audit_sample = audit_sample
         self.issues = []
         self.warnings = []
         self.stats = {}
+        # Checks run on worker threads; guards issues/warnings
+        self._lock = threading.Lock()
 
     def add_issue(self, category: str, message: str, count: int = 0, details: List = None):
-        self.issues.append({
-            "category": category,
-            "message": message,
-            "count": count,
-            "details": details or [],
-        })
+        with self._lock:
+            self.issues.append({
+                "category": category,
+                "message": message,
+                "count": count,
+                "details": details or [],
+            })
 
     def add_warning(self, category: str, message: str, count: int = 0):
-        self.warnings.append({
-            "category": category,
-            "message": message,
-            "count": count,
-        })
+        with self._lock:
+            self.warnings.append({
+                "category": category,
+                "message": message,
+                "count": count,
+            })
+
+    def _has_nodes(self, session, label: str) -> bool:
+        """Whether any `label` node exists, read from the count store."""
+        result = session.run(_Q_COUNT_NODES[label])
+        return result.single()["count"] > 0
 
     def check_orphaned_structures(self) -> int:
         """Check for Structure nodes with no incoming relationships."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE NOT ()-[:HAS_ROOT]->(s) AND NOT ()-[:CONTAINS]->(s)
-                RETURN s.merkle AS merkle, s.kind AS kind, s.key AS key
-                LIMIT 20
-            """)
-
-            orphans = [dict(r) for r in result]
-
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE NOT ()-[:HAS_ROOT]->(s) AND NOT ()-[:CONTAINS]->(s)
-                RETURN count(s) AS count
-            """)
-            total = result.single()["count"]
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                 fetch_size=SAMPLE_FETCH_SIZE) as session:
+            if not self._has_nodes(session, "Structure"):
+                orphans, total = [], 0
+            else:
+                # Sample and total from one scan; apoc.agg.slice keeps only
+                # the first SAMPLE_LIMIT rows instead of collecting every orphan
+                result = session.run(_Q_ORPHAN_STRUCT, limit=SAMPLE_LIMIT)
+                record = result.single()
+                orphans, total = record["sample"], record["count"]
 
             if total > 0:
                 self.add_issue(
@@ -93,22 +385,14 @@ class HealthChecker:
 
     def check_orphaned_content(self) -> int:
         """Check for Content nodes with no incoming relationships."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE NOT ()-[:HAS_VALUE]->(c)
-                RETURN c.hash AS hash, c.kind AS kind, c.key AS key
-                LIMIT 20
-            """)
-
-            orphans = [dict(r) for r in result]
-
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE NOT ()-[:HAS_VALUE]->(c)
-                RETURN count(c) AS count
-            """)
-            total = result.single()["count"]
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                 fetch_size=SAMPLE_FETCH_SIZE) as session:
+            if not self._has_nodes(session, "Content"):
+                orphans, total = [], 0
+            else:
+                result = session.run(_Q_ORPHAN_CONTENT, limit=SAMPLE_LIMIT)
+                record = result.single()
+                orphans, total = record["sample"], record["count"]
 
             if total > 0:
                 self.add_issue(
@@ -123,14 +407,11 @@ class HealthChecker:
 
     def check_sources_without_roots(self) -> int:
         """Check for Source nodes without HAS_ROOT relationships."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (src:Source)
-                WHERE NOT (src)-[:HAS_ROOT]->()
-                RETURN src.source_id AS source_id
-            """)
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                 fetch_size=LIST_FETCH_SIZE) as session:
+            result = session.run(_Q_SOURCES_WITHOUT_ROOT)
 
-            sources = [r["source_id"] for r in result]
+            sources = result.value("source_id")
 
             if sources:
                 self.add_issue(
@@ -144,87 +425,60 @@ class HealthChecker:
             return len(sources)
 
     def check_ref_count_accuracy(self) -> Dict:
-        """Check if ref_counts match actual references (comprehensive)."""
-        with self.driver.session(database=self.database) as session:
-            # Check Structure ref_counts - count sources whose tree includes each structure
-            result = session.run("""
-                MATCH (s:Structure)
-                OPTIONAL MATCH (src:Source)-[:HAS_ROOT]->(:Structure)-[:CONTAINS*0..100]->(s)
-                WITH s, count(DISTINCT src) AS tree_refs
-
-                // Also count direct HAS_ROOT references
-                OPTIONAL MATCH (src2:Source)-[:HAS_ROOT]->(s)
-                WITH s, tree_refs + count(DISTINCT src2) AS actual_refs
-
-                WHERE s.ref_count IS NULL OR s.ref_count <> actual_refs
-                RETURN s.merkle AS merkle, s.ref_count AS stored, actual_refs AS actual
-                LIMIT 20
-            """)
-
-            structure_mismatches = [dict(r) for r in result]
-
-            # Count total structure mismatches
-            result = session.run("""
-                MATCH (s:Structure)
-                OPTIONAL MATCH (src:Source)-[:HAS_ROOT]->(:Structure)-[:CONTAINS*0..100]->(s)
-                WITH s, count(DISTINCT src) AS tree_refs
-                OPTIONAL MATCH (src2:Source)-[:HAS_ROOT]->(s)
-                WITH s, tree_refs + count(DISTINCT src2) AS actual_refs
-                WHERE s.ref_count IS NULL OR s.ref_count <> actual_refs
-                RETURN count(*) AS count
-            """)
-            structure_mismatch_count = result.single()["count"]
+        """
+        Check if ref_counts match actual references.
+
+        ref_count is maintained on every write, so by default only a random
+        sample of each label is re-counted; the comprehensive check walks
+        every Source tree and is opt-in.
+        """
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            if self.audit_sample is None:
+                # Check Structure ref_counts - count sources whose tree includes
+                # each structure. Each source tree is walked once with
+                # subgraphNodes (NODE_GLOBAL) instead of enumerating
+                # CONTAINS*0..100 paths; structures no tree reaches have 0.
+                result = session.run(_Q_REF_COUNT_STRUCT, max_depth=MAX_TRAVERSAL_DEPTH, limit=SAMPLE_LIMIT)
+                structure = result.single()
+                # Check Content ref_counts - one more hop from the same traversal
+                result = session.run(_Q_REF_COUNT_CONTENT, max_depth=MAX_TRAVERSAL_DEPTH, limit=SAMPLE_LIMIT)
+                content = result.single()
+                scope = "comprehensive check"
+            else:
+                params = {
+                    "sample_size": self.audit_sample,
+                    "max_depth": MAX_TRAVERSAL_DEPTH,
+                    "limit": SAMPLE_LIMIT,
+                }
+                structure = session.run(_Q_REF_COUNT_STRUCT_SAMPLED, params).single()
+                content = session.run(_Q_REF_COUNT_CONTENT_SAMPLED, params).single()
+                self.stats["ref_count_audit_sampled"] = {
+                    "structures": structure["sampled"],
+                    "contents": content["sampled"],
+                }
+                scope = f"sample of {self.audit_sample}"
+
+            structure_mismatches = structure["sample"]
+            structure_mismatch_count = structure["count"]
+            content_mismatches = content["sample"]
+            content_mismatch_count = content["count"]
 
             if structure_mismatch_count > 0:
                 self.add_warning(
                     "ref_count_mismatch",
-                    f"{structure_mismatch_count} Structure nodes have incorrect ref_count (comprehensive check)",
+                    f"{structure_mismatch_count} Structure nodes have incorrect ref_count ({scope})",
                     count=structure_mismatch_count
                 )
 
-            # Check Content ref_counts
-            result = session.run("""
-                MATCH (c:Content)
-                OPTIONAL MATCH (src:Source)-[:HAS_ROOT]->(:Structure)-[:CONTAINS*0..100]->(:Structure)-[:HAS_VALUE]->(c)
-                WITH c, count(DISTINCT src) AS tree_refs
-
-                // Also count direct references from root structures
-                OPTIONAL MATCH (src2:Source)-[:HAS_ROOT]->(:Structure)-[:HAS_VALUE]->(c)
-                WITH c, tree_refs + count(DISTINCT src2) AS actual_refs
-
-                WHERE c.ref_count IS NULL OR c.ref_count <> actual_refs
-                RETURN c.hash AS hash, c.ref_count AS stored, actual_refs AS actual
-                LIMIT 20
-            """)
-
-            content_mismatches = [dict(r) for r in result]
-
-            # Count total content mismatches
-            result = session.run("""
-                MATCH (c:Content)
-                OPTIONAL MATCH (src:Source)-[:HAS_ROOT]->(:Structure)-[:CONTAINS*0..100]->(:Structure)-[:HAS_VALUE]->(c)
-                WITH c, count(DISTINCT src) AS tree_refs
-                OPTIONAL MATCH (src2:Source)-[:HAS_ROOT]->(:Structure)-[:HAS_VALUE]->(c)
-                WITH c, tree_refs + count(DISTINCT src2) AS actual_refs
-                WHERE c.ref_count IS NULL OR c.ref_count <> actual_refs
-                RETURN count(*) AS count
-            """)
-            content_mismatch_count = result.single()["count"]
-
             if content_mismatch_count > 0:
                 self.add_warning(
                     "content_ref_count_mismatch",
-                    f"{content_mismatch_count} Content nodes have incorrect ref_count",
+                    f"{content_mismatch_count} Content nodes have incorrect ref_count ({scope})",
                     count=content_mismatch_count
                 )
 
             # Check for null or negative ref_counts
-            result = session.run("""
-                MATCH (n)
-                WHERE (n:Structure OR n:Content)
-                  AND (n.ref_count IS NULL OR n.ref_count < 0)
-                RETURN labels(n)[0] AS label, count(*) AS count
-            """)
+            result = session.run(_Q_INVALID_REF_COUNT)
 
             for r in result:
                 if r["count"] > 0:
@@ -245,50 +499,38 @@ class HealthChecker:
 
     def check_duplicate_hashes(self) -> int:
         """Check for duplicate hashes (should not happen with constraints)."""
-        with self.driver.session(database=self.database) as session:
-            # This should return 0 if constraints are working
-            result = session.run("""
-                MATCH (c:Content)
-                WITH c.hash AS hash, collect(c) AS nodes
-                WHERE size(nodes) > 1
-                RETURN hash, size(nodes) AS count
-            """)
-
-            duplicates = [dict(r) for r in result]
-
-            if duplicates:
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            # A uniqueness constraint on Content.hash makes duplicates
+            # impossible, so the scan can be skipped entirely
+            result = session.run(_Q_HASH_CONSTRAINED)
+            if result.single()["constrained"]:
+                self.stats["duplicate_hashes"] = 0
+                return 0
+
+            # Group by hash value only; collecting the nodes themselves
+            # would pull every Content node into memory
+            result = session.run(_Q_DUPLICATE_HASHES, limit=SAMPLE_LIMIT)
+            record = result.single()
+            duplicates = record["sample"]
+            total = record["total"]
+
+            if total > 0:
                 self.add_issue(
                     "duplicate_hashes",
-                    f"{len(duplicates)} duplicate Content hashes found",
-                    count=len(duplicates),
+                    f"{total} duplicate Content hashes found",
+                    count=total,
                     details=duplicates[:10]
                 )
 
-            self.stats["duplicate_hashes"] = len(duplicates)
-            return len(duplicates)
+            self.stats["duplicate_hashes"] = total
+            return total
 
     def get_overall_stats(self) -> Dict:
         """Get overall database statistics."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (src:Source)
-                WITH count(src) AS sources
-
-                OPTIONAL MATCH (s:Structure)
-                WITH sources, count(s) AS structures
-
-                OPTIONAL MATCH (c:Content)
-                WITH sources, structures, count(c) AS contents
-
-                OPTIONAL MATCH ()-[r:HAS_ROOT]->()
-                WITH sources, structures, contents, count(r) AS has_root
-
-                OPTIONAL MATCH ()-[r:CONTAINS]->()
-                WITH sources, structures, contents, has_root, count(r) AS contains
-
-                OPTIONAL MATCH ()-[r:HAS_VALUE]->()
-                RETURN sources, structures, contents, has_root, contains, count(r) AS has_value
-            """)
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            # Each subquery is a bare label/type count, which the planner
+            # answers from the count store instead of scanning
+            result = session.run(_Q_OVERALL_STATS)
 
             record = result.single()
             return {
@@ -304,61 +546,42 @@ class HealthChecker:
 
     def get_deduplication_stats(self) -> Dict:
         """Get deduplication effectiveness statistics."""
-        with self.driver.session(database=self.database) as session:
-            # Content deduplication
-            result = session.run("""
-                MATCH (c:Content)
-                WITH sum(c.ref_count) AS total_refs,
-                     count(c) AS unique_count,
-                     max(c.ref_count) AS max_refs
-                RETURN total_refs, unique_count, max_refs
-            """)
-            content = result.single()
-
-            # Structure deduplication
-            result = session.run("""
-                MATCH (s:Structure)
-                WITH sum(s.ref_count) AS total_refs,
-                     count(s) AS unique_count,
-                     max(s.ref_count) AS max_refs
-                RETURN total_refs, unique_count, max_refs
-            """)
-            structure = result.single()
-
-            content_total = content["total_refs"] or 0
-            content_unique = content["unique_count"] or 0
-            structure_total = structure["total_refs"] or 0
-            structure_unique = structure["unique_count"] or 0
-
-            return {
-                "content": {
-                    "unique": content_unique,
-                    "total_refs": content_total,
-                    "max_refs": content["max_refs"] or 0,
-                    "dedup_ratio": f"{(content_total - content_unique) / content_total * 100:.1f}%" if content_total > 0 else "N/A",
-                },
-                "structure": {
-                    "unique": structure_unique,
-                    "total_refs": structure_total,
-                    "max_refs": structure["max_refs"] or 0,
-                    "dedup_ratio": f"{(structure_total - structure_unique) / structure_total * 100:.1f}%" if structure_total > 0 else "N/A",
-                },
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            record = session.run(_Q_DEDUP_STATS).single()
+
+        stats = {}
+        for label in ("content", "structure"):
+            ratio = record[f"{label}_ratio"]
+            stats[label] = {
+                "unique": record[f"{label}_unique"],
+                "total_refs": record[f"{label}_total"],
+                "max_refs": record[f"{label}_max"],
+                "dedup_ratio": f"{ratio:.1f}%" if ratio is not None else "N/A",
             }
+        return stats
 
     def run_all_checks(self) -> Dict:
         """Run all health checks."""
         self.stats["timestamp"] = datetime.now(timezone.utc).isoformat()
 
-        # Run checks
-        self.check_orphaned_structures()
-        self.check_orphaned_content()
-        self.check_sources_without_roots()
-        self.check_ref_count_accuracy()
-        self.check_duplicate_hashes()
-
-        # Get stats
-        self.stats["overall"] = self.get_overall_stats()
-        self.stats["deduplication"] = self.get_deduplication_stats()
+        # The checks are independent and each opens its own session, so
+        # run them concurrently; wall time is the slowest check, not the sum
+        checks = [
+            self.check_orphaned_structures,
+            self.check_orphaned_content,
+            self.check_sources_without_roots,
+            self.check_ref_count_accuracy,
+            self.check_duplicate_hashes,
+        ]
+        with ThreadPoolExecutor(max_workers=len(checks) + 2) as pool:
+            futures = [pool.submit(check) for check in checks]
+            overall = pool.submit(self.get_overall_stats)
+            deduplication = pool.submit(self.get_deduplication_stats)
+
+            for future in futures:
+                future.result()
+            self.stats["overall"] = overall.result()
+            self.stats["deduplication"] = deduplication.result()
 
         # Determine health status
         if self.issues:
@@ -387,116 +610,223 @@ def fix_issues(driver, database: str, verbose: bool = True) -> Dict:
 
     with driver.session(database=database) as session:
         # Delete orphaned structures
-        result = session.run("""
-            MATCH (s:Structure)
-            WHERE NOT ()-[:HAS_ROOT]->(s) AND NOT ()-[:CONTAINS]->(s)
-            DETACH DELETE s
-            RETURN count(*) AS deleted
-        """)
-        fixes["orphaned_structures_deleted"] = result.single()["deleted"]
+        summary = session.run(_Q_FIX_ORPHAN_STRUCT, batch_size=FIX_BATCH_SIZE).consume()
+        fixes["orphaned_structures_deleted"] = summary.counters.nodes_deleted
 
         # Delete orphaned content
-        result = session.run("""
-            MATCH (c:Content)
-            WHERE NOT ()-[:HAS_VALUE]->(c)
-            DELETE c
-            RETURN count(*) AS deleted
-        """)
-        fixes["orphaned_content_deleted"] = result.single()["deleted"]
+        summary = session.run(_Q_FIX_ORPHAN_CONTENT, batch_size=FIX_BATCH_SIZE).consume()
+        fixes["orphaned_content_deleted"] = summary.counters.nodes_deleted
 
         # Fix null/negative ref_counts
-        result = session.run("""
-            MATCH (n)
-            WHERE (n:Structure OR n:Content)
-              AND (n.ref_count IS NULL OR n.ref_count < 0)
-            SET n.ref_count = 0
-            RETURN count(*) AS fixed
-        """)
-        fixes["ref_counts_fixed"] = result.single()["fixed"]
+        summary = session.run(_Q_FIX_REF_COUNT, batch_size=FIX_BATCH_SIZE).consume()
+        fixes["ref_counts_fixed"] = summary.counters.properties_set
 
         if verbose:
-            print(f"Fixed issues:")
-            print(f"  Orphaned structures deleted: {fixes['orphaned_structures_deleted']}")
-            print(f"  Orphaned content deleted: {fixes['orphaned_content_deleted']}")
-            print(f"  Ref counts fixed: {fixes['ref_counts_fixed']}")
+            sys.stdout.write(
+                "Fixed issues:\n"
+                f"  Orphaned structures deleted: {fixes['orphaned_structures_deleted']}\n"
+                f"  Orphaned content deleted: {fixes['orphaned_content_deleted']}\n"
+                f"  Ref counts fixed: {fixes['ref_counts_fixed']}\n"
+            )
 
     return fixes
 
 
-def run_health_check(fix: bool = False, verbose: bool = True) -> Dict:
-    """Run health check with optional fixing."""
-    config = get_config()
-    driver = GraphDatabase.driver(config["uri"], auth=(config["user"], config["password"]))
+def plan_check_enabled() -> bool:
+    """Whether HYBRIDGRAPH_EXPLAIN_CHECK asks for the query plan check."""
+    return os.environ.get("HYBRIDGRAPH_EXPLAIN_CHECK", "").lower() in ("1", "true", "yes")
+
 
+def verify_query_plans(driver, database: str) -> None:
+    """
+    EXPLAIN every health query and fail if any plan scans all nodes.
+
+    Development check, enabled with HYBRIDGRAPH_EXPLAIN_CHECK=1.
+
+    Raises:
+        RuntimeError: If a query plans an AllNodesScan
+    """
+    params = {"limit": SAMPLE_LIMIT, "sample_size": AUDIT_SAMPLE_SIZE, "max_depth": MAX_TRAVERSAL_DEPTH}
+    failures = []
+    with driver.session(database=database, default_access_mode=READ_ACCESS) as session:
+        for name, query in _PLAN_CHECKED_QUERIES.items():
+            scans = explain_full_scans(session, query, params)
+            if scans:
+                failures.append(f"{name}: {', '.join(scans)}")
+    if failures:
+        raise RuntimeError("Health queries scan all nodes: " + "; ".join(failures))
+
+
+def _report_cache_dir() -> str:
+    """Per-user cache directory ($XDG_CACHE_HOME/runner, else ~/.cache/runner)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "runner")
+
+
+def _report_cache_path(uri: str, database: str) -> str:
+    """Cache file for one server and database, inside the per-user cache directory."""
+    key = hashlib.sha256(f"{uri}\0{database}".encode()).hexdigest()[:32]
+    return os.path.join(_report_cache_dir(), f"hybridgraph_health_{key}.json")
+
+
+def _graph_fingerprint(driver, database: str) -> List[int]:
+    """Node and relationship counts from the count store; changes on any create/delete."""
+    with driver.session(database=database, default_access_mode=READ_ACCESS) as session:
+        record = session.run(_Q_OVERALL_STATS).single()
+    return [record[key] for key in ("sources", "structures", "contents", "has_root", "contains", "has_value")]
+
+
+def _load_cached_report(path: str, fingerprint: List[int], full_audit: bool,
+                        ttl: int = REPORT_CACHE_TTL, now: Optional[float] = None) -> Optional[Dict]:
+    """
+    Return the cached report if it is younger than ttl and was taken at
+    the same fingerprint, else None.
+
+    A sampled-audit report does not satisfy a full-audit request.
+    """
     try:
-        checker = HealthChecker(driver, config["database"])
-        report = checker.run_all_checks()
+        with open(path) as f:
+            entry = loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if now is None:
+        now = time.time()
+    if now - entry.get("ts", 0) >= ttl:
+        return None
+    if entry.get("fingerprint") != fingerprint:
+        return None
+    if full_audit and not entry.get("full_audit"):
+        return None
+    return entry.get("report")
+
+
+def _store_cached_report(path: str, fingerprint: List[int], full_audit: bool, report: Dict,
+                         now: Optional[float] = None) -> None:
+    """Write the report cache atomically; failures are ignored (the cache is best-effort)."""
+    entry = {
+        "fingerprint": fingerprint,
+        "full_audit": full_audit,
+        "ts": time.time() if now is None else now,
+        "report": report,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        # Private to the user, so nobody else can plant or read a report
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            f.write(dumps(entry))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
 
-        if verbose:
-            print(f"\nHealth Status: {report['status'].upper()}")
-            print(f"Timestamp: {report['timestamp']}")
-
-            print(f"\nOverall Statistics:")
-            stats = report["stats"]["overall"]
-            print(f"  Sources: {stats['sources']}")
-            print(f"  Structures: {stats['structures']}")
-            print(f"  Contents: {stats['contents']}")
-            print(f"  Relationships: {sum(stats['relationships'].values())}")
-
-            print(f"\nDeduplication:")
-            dedup = report["stats"]["deduplication"]
-            print(f"  Content: {dedup['content']['unique']} unique, {dedup['content']['dedup_ratio']} deduplicated")
-            print(f"  Structure: {dedup['structure']['unique']} unique, {dedup['structure']['dedup_ratio']} deduplicated")
-
-            if report["issues"]:
-                print(f"\nIssues ({len(report['issues'])}):")
-                for issue in report["issues"]:
-                    print(f"  [{issue['category']}] {issue['message']}")
-
-            if report["warnings"]:
-                print(f"\nWarnings ({len(report['warnings'])}):")
-                for warning in report["warnings"]:
-                    print(f"  [{warning['category']}] {warning['message']}")
-
-        if fix and (report["issues"] or report["warnings"]):
-            print("\nAttempting fixes...")
-            fixes = fix_issues(driver, config["database"], verbose)
-            report["fixes"] = fixes
-
-    finally:
-        driver.close()
+
+def run_health_check(fix: bool = False, verbose: bool = True, full_audit: bool = False) -> Dict:
+    """Run health check with optional fixing."""
+    config = get_config()
+    driver = get_shared_driver(config["uri"], config["user"], config["password"])
+    if schema_enabled():
+        ensure_schema(driver, config["database"])
+    if plan_check_enabled():
+        verify_query_plans(driver, config["database"])
+
+    # Reuse a recent report while nothing has been created or deleted;
+    # --fix always needs a fresh one
+    report = None
+    fingerprint = None
+    if REPORT_CACHE_TTL > 0 and not fix:
+        cache_path = _report_cache_path(config["uri"], config["database"])
+        fingerprint = _graph_fingerprint(driver, config["database"])
+        report = _load_cached_report(cache_path, fingerprint, full_audit)
+
+    if report is None:
+        checker = HealthChecker(driver, config["database"],
+                                audit_sample=None if full_audit else AUDIT_SAMPLE_SIZE)
+        report = checker.run_all_checks()
+        if fingerprint is not None:
+            _store_cached_report(cache_path, fingerprint, full_audit, report)
+
+    needs_fix = fix and (report["issues"] or report["warnings"])
+
+    if verbose:
+        # Build the whole summary and write it once
+        stats = report["stats"]["overall"]
+        dedup = report["stats"]["deduplication"]
+        relationship_total = sum(stats["relationships"].values())
+        lines = [
+            f"\nHealth Status: {report['status'].upper()}",
+            f"Timestamp: {report['timestamp']}",
+            "\nOverall Statistics:",
+            f"  Sources: {stats['sources']}",
+            f"  Structures: {stats['structures']}",
+            f"  Contents: {stats['contents']}",
+            f"  Relationships: {relationship_total}",
+            "\nDeduplication:",
+            f"  Content: {dedup['content']['unique']} unique, {dedup['content']['dedup_ratio']} deduplicated",
+            f"  Structure: {dedup['structure']['unique']} unique, {dedup['structure']['dedup_ratio']} deduplicated",
+        ]
+
+        if report["issues"]:
+            lines.append(f"\nIssues ({len(report['issues'])}):")
+            lines.extend(f"  [{issue['category']}] {issue['message']}" for issue in report["issues"])
+
+        if report["warnings"]:
+            lines.append(f"\nWarnings ({len(report['warnings'])}):")
+            lines.extend(f"  [{warning['category']}] {warning['message']}" for warning in report["warnings"])
+
+        if needs_fix:
+            lines.append("\nAttempting fixes...")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    if needs_fix:
+        fixes = fix_issues(driver, config["database"], verbose)
+        report["fixes"] = fixes
 
     return report
 
 
+_PARSER = argparse.ArgumentParser(description="Health check for hybridgraph")
+_PARSER.add_argument("--fix", action="store_true", help="Attempt to fix issues")
+_PARSER.add_argument("--quiet", action="store_true", help="Suppress output")
+_PARSER.add_argument("--json", action="store_true", help="Output as JSON")
+_PARSER.add_argument("--full-audit", action="store_true",
+                     help="Re-count every ref_count instead of a random sample")
+
+
+@functools.lru_cache(maxsize=1)
+def _task_params() -> Dict:
+    """TASK_PARAMS decoded once per process; empty when run from the CLI."""
+    return loads(TASK_PARAMS) if TASK_PARAMS else {}
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Health check for hybridgraph")
-    parser.add_argument("--fix", action="store_true", help="Attempt to fix issues")
-    parser.add_argument("--quiet", action="store_true", help="Suppress output")
-    parser.add_argument("--json", action="store_true", help="Output as JSON")
-    args = parser.parse_args()
+    args = _PARSER.parse_args()
 
     # Check for task params (stack runner mode)
-    if os.environ.get("TASK_PARAMS"):
-        params = json.loads(os.environ.get("TASK_PARAMS", "{}"))
+    if TASK_PARAMS:
+        params = _task_params()
         fix = params.get("fix", False)
         as_json = params.get("json", False)
+        full_audit = params.get("full_audit", False)
     else:
         fix = args.fix
         as_json = args.json
+        full_audit = args.full_audit
 
     if not args.quiet and not as_json:
-        print("=" * 60)
-        print("HYBRIDGRAPH HEALTH CHECK")
-        print("=" * 60)
+        rule = "=" * 60
+        sys.stdout.write(f"{rule}\nHYBRIDGRAPH HEALTH CHECK\n{rule}\n")
 
-    report = run_health_check(fix=fix, verbose=not args.quiet and not as_json)
+    report = run_health_check(fix=fix, verbose=not args.quiet and not as_json, full_audit=full_audit)
 
     if as_json:
-        print(json.dumps(report, indent=2, default=str))
+        # Encode straight onto stdout rather than building the whole
+        # document as one string first
+        dump(report, sys.stdout, indent=True)
 
     # Output for stack runner
-    if os.environ.get("TASK_PARAMS"):
+    if TASK_PARAMS:
         task_result = {
             "__task_result__": True,
             "output": report,
@@ -510,7 +840,7 @@ def main():
                 f"Issues: {len(report['issues'])}, Warnings: {len(report['warnings'])}",
             ],
         }
-        print(json.dumps(task_result))
+        sys.stdout.write(dumps(task_result) + "\n")
 
     # Exit with appropriate code
     if report["status"] == "unhealthy":
@@ -14,7 +14,10 @@ Usage:
 import argparse
 import os
 import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
 
 try:
     from neo4j import GraphDatabase
@@ -23,12 +26,16 @@ except ImportError:
     sys.exit(1)
 
 try:
-    from runner.utils.hashing import compute_content_hash, compute_merkle_hash, encode_value_for_hash
+    from runner.utils.hashing import (
+        compute_content_hashes, compute_merkle_hash, compute_merkle_hashes, encode_value_for_hash,
+    )
 except ImportError:
     # Fallback for direct execution
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-    from runner.utils.hashing import compute_content_hash, compute_merkle_hash, encode_value_for_hash
+    from runner.utils.hashing import (
+        compute_content_hashes, compute_merkle_hash, compute_merkle_hashes, encode_value_for_hash,
+    )
 
 
 def get_config():
@@ -64,9 +71,13 @@ def create_database(driver, db_name: str):
             print(f"Database {db_name} already exists")
 
 
-def setup_schema(driver, db_name: str):
-    """Create constraints and indexes for the hybrid schema."""
-    print("\nSetting up schema...")
+def setup_constraints(driver, db_name: str):
+    """
+    Create the uniqueness constraints for the hybrid schema.
+
+    Run before the bulk load: the node MERGEs rely on them.
+    """
+    print("\nSetting up constraints...")
 
     with driver.session(database=db_name) as session:
         # Drop existing constraints/indexes if they exist (for idempotency)
@@ -88,11 +99,27 @@ def setup_schema(driver, db_name: str):
             print(f"  Creating constraint: {name}")
             session.run(query)
 
-        # Create indexes
+    print("Constraint setup complete")
+
+
+def setup_indexes(driver, db_name: str):
+    """
+    Create the secondary (lookup) indexes for the hybrid schema.
+
+    Run after the bulk load, so each index is built once from the loaded
+    nodes instead of being updated on every inserted row.
+    """
+    print("\nSetting up indexes...")
+
+    with driver.session(database=db_name) as session:
         indexes = [
             ("content_lookup", "CREATE INDEX content_lookup IF NOT EXISTS FOR (c:Content) ON (c.kind, c.key)"),
             ("content_value_str", "CREATE INDEX content_value_str IF NOT EXISTS FOR (c:Content) ON (c.value_str)"),
+            ("content_key", "CREATE INDEX content_key IF NOT EXISTS FOR (c:Content) ON (c.key)"),
+            ("content_key_value", "CREATE INDEX content_key_value IF NOT EXISTS FOR (c:Content) ON (c.key, c.value_str)"),
             ("content_value_num", "CREATE INDEX content_value_num IF NOT EXISTS FOR (c:Content) ON (c.value_num)"),
+            ("structure_ref_count", "CREATE INDEX structure_ref_count IF NOT EXISTS FOR (s:Structure) ON (s.ref_count)"),
+            ("content_ref_count", "CREATE INDEX content_ref_count IF NOT EXISTS FOR (c:Content) ON (c.ref_count)"),
             ("structure_kind", "CREATE INDEX structure_kind IF NOT EXISTS FOR (s:Structure) ON (s.kind, s.key)"),
             ("source_type", "CREATE INDEX source_type IF NOT EXISTS FOR (s:Source) ON (s.source_type)"),
         ]
@@ -101,298 +128,469 @@ def setup_schema(driver, db_name: str):
             print(f"  Creating index: {name}")
             session.run(query)
 
-    print("Schema setup complete")
+    print("Index setup complete")
 
 
-def load_source_data(driver, source_db: str) -> dict:
-    """Load all data from source database into memory for processing."""
-    print(f"\nLoading data from {source_db}...")
+# :Data node kinds hashed as Content (leaves) and Structure (containers)
+LEAF_KINDS = frozenset({"string", "number", "boolean", "null"})
+CONTAINER_KINDS = frozenset({"object", "array"})
 
-    data = {
-        "nodes": {},      # path -> node data
-        "by_doc": {},     # doc_id -> list of paths
-        "children": {},   # parent_path -> list of child_paths
-    }
 
-    with driver.session(database=source_db) as session:
-        # Load all nodes
-        result = session.run("""
-            MATCH (d:Data)
-            RETURN d.doc_id AS doc_id, d.path AS path, d.kind AS kind, d.key AS key,
-                   d.value_str AS value_str, d.value_num AS value_num, d.value_bool AS value_bool
-        """)
-
-        for record in result:
-            doc_id = record["doc_id"]
-            path = record["path"]
-            full_path = f"{doc_id}:{path}"
-
-            data["nodes"][full_path] = {
-                "doc_id": doc_id,
-                "path": path,
-                "kind": record["kind"],
-                "key": record["key"],
-                "value_str": record["value_str"],
-                "value_num": record["value_num"],
-                "value_bool": record["value_bool"],
-            }
-
-            if doc_id not in data["by_doc"]:
-                data["by_doc"][doc_id] = []
-            data["by_doc"][doc_id].append(path)
-
-        # Load relationships
-        result = session.run("""
-            MATCH (parent:Data)-[:CONTAINS]->(child:Data)
-            RETURN parent.doc_id AS doc_id, parent.path AS parent_path, child.path AS child_path
-        """)
-
-        for record in result:
-            doc_id = record["doc_id"]
-            parent_key = f"{doc_id}:{record['parent_path']}"
-            child_key = f"{doc_id}:{record['child_path']}"
-
-            if parent_key not in data["children"]:
-                data["children"][parent_key] = []
-            data["children"][parent_key].append(child_key)
+class SourceNode(NamedTuple):
+    """One jsongraph :Data node, in the column order of _Q_SOURCE_DATA."""
+    doc_id: str
+    path: str
+    kind: str
+    key: Optional[str]
+    value_str: Optional[str]
+    value_num: Optional[float]
+    value_bool: Optional[bool]
 
-    print(f"  Loaded {len(data['nodes']):,} nodes from {len(data['by_doc'])} documents")
-    return data
 
+# One scan of :Data with each node's child paths attached, instead of a
+# node scan plus a separate CONTAINS scan. Leaves come back with [].
+_Q_SOURCE_DATA = """
+    MATCH (d:Data)
+    OPTIONAL MATCH (d)-[:CONTAINS]->(child:Data)
+    WITH d, collect(child.path) AS child_paths
+    RETURN d.doc_id AS doc_id, d.path AS path, d.kind AS kind, d.key AS key,
+           d.value_str AS value_str, d.value_num AS value_num, d.value_bool AS value_bool,
+           child_paths
+"""
 
-def compute_hashes(data: dict) -> dict:
-    """Compute content hashes (leaves) and Merkle hashes (containers) bottom-up."""
-    print("\nComputing hashes...")
+# Records pulled per round trip while streaming the source graph
+SOURCE_FETCH_SIZE = 10000
+
+
+def index_source_data(rows: Iterable) -> Dict[str, Any]:
+    """
+    Index (doc_id, path, kind, key, value_str, value_num, value_bool,
+    child_paths) rows.
+
+    Every node gets a dense int id (its position in "nodes"); the later
+    stages key everything by that id instead of a "doc_id:path" string.
+    Child paths are resolved to ids once all rows are in; paths without a
+    loaded node are skipped.
+
+    Children are stored CSR-style: the children of node i are
+    child_idx[indptr[i]:indptr[i + 1]], so a childless node costs one
+    int compare rather than a dict miss.
+
+    Returns:
+        Source data with "nodes" (id -> SourceNode), "by_doc" (doc_id -> ids),
+        "roots" (doc_id -> id of /root), "indptr" and "child_idx"
+    """
+    nodes = []
+    ids = {}      # (doc_id, path) -> id
+    by_doc = {}
+    roots = {}
+    pending = []  # id -> child paths
+
+    for row in rows:
+        # One unpack per row: slicing or key lookups on a driver Record
+        # build a new Record / search its keys every time
+        doc_id, path, kind, key, value_str, value_num, value_bool, child_paths = row
+        node_id = len(nodes)
+        nodes.append(SourceNode(doc_id, path, kind, key, value_str, value_num, value_bool))
+        ids[(doc_id, path)] = node_id
+        doc_ids = by_doc.get(doc_id)
+        if doc_ids is None:
+            by_doc[doc_id] = [node_id]
+        else:
+            doc_ids.append(node_id)
+        if path == "/root":
+            roots[doc_id] = node_id
+        pending.append(child_paths)
+
+    indptr = array("q", [0])
+    child_idx = array("q")
+    for node, child_paths in zip(nodes, pending):
+        if child_paths:
+            doc_id = node.doc_id
+            child_idx.extend(ids[(doc_id, cp)] for cp in child_paths if (doc_id, cp) in ids)
+        indptr.append(len(child_idx))
 
-    hashes = {}  # full_path -> hash
+    return {
+        "nodes": nodes,         # id -> SourceNode
+        "by_doc": by_doc,       # doc_id -> list of ids
+        "roots": roots,         # doc_id -> id of the document root
+        "indptr": indptr,       # id -> start of its children in child_idx (len(nodes) + 1 entries)
+        "child_idx": child_idx, # child ids, grouped by parent
+    }
 
-    # First pass: hash all leaf nodes
-    leaf_count = 0
-    for full_path, node in data["nodes"].items():
-        if node["kind"] in ["string", "number", "boolean", "null"]:
-            value = encode_value_for_hash(
-                node["kind"], node["value_str"], node["value_num"], node["value_bool"]
-            )
-            hashes[full_path] = compute_content_hash(node["kind"], node["key"], value)
-            leaf_count += 1
 
-    print(f"  Hashed {leaf_count:,} leaf nodes")
+def load_source_data(driver, source_db: str) -> dict:
+    """Load all data from source database into memory for processing."""
+    print(f"\nLoading data from {source_db}...")
 
-    # Second pass: compute Merkle hashes bottom-up
-    # We need to process nodes in order of depth (deepest first)
-    def get_depth(path):
-        return path.count("/")
+    with driver.session(database=source_db, fetch_size=SOURCE_FETCH_SIZE) as session:
+        data = index_source_data(session.run(_Q_SOURCE_DATA))
 
-    container_paths = [fp for fp, n in data["nodes"].items() if n["kind"] in ["object", "array"]]
-    container_paths.sort(key=lambda fp: -get_depth(data["nodes"][fp]["path"]))
+    print(f"  Loaded {len(data['nodes']):,} nodes from {len(data['by_doc'])} documents")
+    return data
 
-    for full_path in container_paths:
-        node = data["nodes"][full_path]
-        child_paths = data["children"].get(full_path, [])
-        child_hashes = [hashes[cp] for cp in child_paths if cp in hashes]
 
-        if child_hashes:
-            hashes[full_path] = compute_merkle_hash(node["kind"], node["key"], child_hashes)
-        else:
-            # Empty container
-            hashes[full_path] = compute_merkle_hash(node["kind"], node["key"], [])
+# Content and Structure nodes are content-addressed, so an existing node
+# already holds the right properties; a re-run only refreshes ref_count
+_Q_WRITE_CONTENT = """
+    UNWIND $batch AS c
+    MERGE (content:Content {hash: c.hash})
+    ON CREATE SET content.kind = c.kind,
+        content.key = c.key,
+        content.value_str = c.value_str,
+        content.value_num = c.value_num,
+        content.value_bool = c.value_bool,
+        content.ref_count = c.ref_count
+    ON MATCH SET content.ref_count = c.ref_count
+    RETURN c.hash AS key, elementId(content) AS element_id
+"""
 
-    print(f"  Hashed {len(container_paths):,} container nodes")
-    return hashes
+_Q_WRITE_STRUCTURE = """
+    UNWIND $batch AS s
+    MERGE (structure:Structure {merkle: s.merkle})
+    ON CREATE SET structure.kind = s.kind,
+        structure.key = s.key,
+        structure.child_keys = s.child_keys,
+        structure.child_count = s.child_count,
+        structure.ref_count = s.ref_count
+    ON MATCH SET structure.ref_count = s.ref_count
+    RETURN s.merkle AS key, elementId(structure) AS element_id
+"""
 
+# Relationship endpoints are looked up by the element ids returned from the
+# node writes (a direct id seek) rather than by merkle/hash index probes
+_Q_WRITE_CONTAINS = """
+    UNWIND $batch AS rel
+    MATCH (parent) WHERE elementId(parent) = rel.parent_eid
+    MATCH (child) WHERE elementId(child) = rel.child_eid
+    MERGE (parent)-[r:CONTAINS {key: rel.key}]->(child)
+    SET r.index = rel.index
+"""
 
-def migrate_content_layer(driver, target_db: str, data: dict, hashes: dict) -> dict:
-    """Create deduplicated Content nodes for all leaf values."""
-    print("\nMigrating Content layer...")
+_Q_WRITE_HAS_VALUE = """
+    UNWIND $batch AS rel
+    MATCH (structure) WHERE elementId(structure) = rel.structure_eid
+    MATCH (content) WHERE elementId(content) = rel.content_eid
+    MERGE (structure)-[r:HAS_VALUE {key: rel.key}]->(content)
+"""
 
-    # Collect unique content
-    content_map = {}  # hash -> {kind, key, value_str, value_num, value_bool, paths}
+# Rows per UNWIND batch, and batches committed per explicit transaction
+WRITE_BATCH_SIZE = 10000
+BATCHES_PER_TX = 5
+
+# Concurrent write sessions for the node MERGEs; rows are sharded by the
+# first hex digit of their MERGE key, so no two shards touch the same node
+WRITE_WORKERS = 8
+
+
+def _run_batches_tx(tx, query: str, batches: List[list]) -> list:
+    returned = []
+    for batch in batches:
+        returned.extend(tx.run(query, batch=batch).values())
+    return returned
+
+
+def write_batches(session, query: str, rows: list, label: Optional[str] = None) -> list:
+    """
+    UNWIND rows through query as $batch, WRITE_BATCH_SIZE rows at a time.
+
+    BATCHES_PER_TX batches share one explicit transaction, so each commit
+    covers up to WRITE_BATCH_SIZE * BATCHES_PER_TX rows. Progress is
+    printed per commit when a label is given.
+
+    Returns:
+        Every row the query RETURNs, as value lists
+    """
+    returned = []
+    step = WRITE_BATCH_SIZE * BATCHES_PER_TX
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        batches = [chunk[i:i + WRITE_BATCH_SIZE] for i in range(0, len(chunk), WRITE_BATCH_SIZE)]
+        returned.extend(session.execute_write(_run_batches_tx, query, batches))
+        if label:
+            print(f"    Inserted {start + len(chunk):,}/{len(rows):,} {label}")
+    return returned
+
+
+def shard_by_hash(rows: list, field: str) -> List[list]:
+    """
+    Split rows into 16 shards on the first hex digit of row[field].
+
+    Hashes look like "c:<hex>" / "m:<hex>", so the digit is at index 2.
+    """
+    shards = {}
+    for row in rows:
+        shards.setdefault(row[field][2], []).append(row)
+    return list(shards.values())
+
+
+def write_batches_parallel(driver, database: str, query: str, rows: list, field: str, label: str) -> list:
+    """
+    write_batches over shard_by_hash(rows, field), one session per shard,
+    WRITE_WORKERS shards at a time.
+
+    Only for node MERGEs keyed on field: relationship MERGEs lock both end
+    nodes, and shared children appear in every shard, so they deadlock.
+
+    Returns:
+        Every row the query RETURNs, across all shards
+    """
+    def write_shard(shard):
+        with driver.session(database=database) as session:
+            return write_batches(session, query, shard)
+
+    returned = []
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        for shard_rows in pool.map(write_shard, shard_by_hash(rows, field)):
+            returned.extend(shard_rows)
+    print(f"    Inserted {len(rows):,} {label}")
+    return returned
+
+
+def compute_hashes(data: dict) -> list:
+    """
+    Compute content hashes (leaves) and Merkle hashes (containers) bottom-up.
+
+    Returns a list indexed by node id (None for nodes of any other kind).
+    Also stores the unique leaf values, with their reference counts, in
+    data["content"] for migrate_content_layer.
+    """
+    print("\nComputing hashes...")
+    hashes = hash_leaves(data)
+    hash_containers(data, hashes)
+    return hashes
 
-    for full_path, node in data["nodes"].items():
-        if node["kind"] not in ["string", "number", "boolean", "null"]:
-            continue
 
-        h = hashes.get(full_path)
-        if not h:
-            continue
+def hash_leaves(data: dict) -> list:
+    """
+    First half of compute_hashes: hash the leaf nodes and fill data["content"].
+
+    Returns the node id -> hash list with only the leaves set.
+    """
+    nodes = data["nodes"]
+    # node id -> hash. Hashes stay in their persisted "c:"/"m:" hex form;
+    # each distinct hash is a single str object that every node sharing it
+    # references, so lookups and comparisons mostly hit the identity check.
+    hashes = [None] * len(nodes)
+
+    # JSON repeats the same values constantly
+    # (booleans, nulls, enum strings), so leaves are grouped on their
+    # encoded (kind, key, value) and each distinct value is hashed once.
+    # Grouping on the encoded form keeps e.g. 1 and 1.0 apart.
+    encode = encode_value_for_hash
+    groups = {}  # (kind, key, encoded value) -> (first node, [node id])
+    for node_id, node in enumerate(nodes):
+        if node.kind in LEAF_KINDS:
+            item = (node.kind, node.key, encode(node.kind, node.value_str, node.value_num, node.value_bool))
+            group = groups.get(item)
+            if group is None:
+                groups[item] = (node, [node_id])
+            else:
+                group[1].append(node_id)
 
-        if h not in content_map:
-            content_map[h] = {
-                "hash": h,
-                "kind": node["kind"],
-                "key": node["key"],
-                "value_str": node["value_str"],
-                "value_num": node["value_num"],
-                "value_bool": node["value_bool"],
-                "ref_count": 0,
-            }
-        content_map[h]["ref_count"] += 1
-
-    print(f"  Found {len(content_map):,} unique content values")
-
-    # Batch insert Content nodes
-    with driver.session(database=target_db) as session:
-        batch_size = 500
-        content_list = list(content_map.values())
-
-        for i in range(0, len(content_list), batch_size):
-            batch = content_list[i:i+batch_size]
-            session.run("""
-                UNWIND $batch AS c
-                MERGE (content:Content {hash: c.hash})
-                SET content.kind = c.kind,
-                    content.key = c.key,
-                    content.value_str = c.value_str,
-                    content.value_num = c.value_num,
-                    content.value_bool = c.value_bool,
-                    content.ref_count = c.ref_count
-            """, batch=batch)
-
-            if (i + batch_size) % 1000 == 0 or i + batch_size >= len(content_list):
-                print(f"    Inserted {min(i + batch_size, len(content_list)):,}/{len(content_list):,} Content nodes")
-
-    return content_map
-
-
-def migrate_structure_layer(driver, target_db: str, data: dict, hashes: dict) -> dict:
-    """Create deduplicated Structure nodes for all containers."""
-    print("\nMigrating Structure layer...")
+    # hash -> Content row, with one reference per occurrence
+    content = {}
+    leaf_count = 0
+    for (node, node_ids), h in zip(groups.values(), compute_content_hashes(groups)):
+        for node_id in node_ids:
+            hashes[node_id] = h
+        content[h] = {
+            "hash": h,
+            "kind": node.kind,
+            "key": node.key,
+            "value_str": node.value_str,
+            "value_num": node.value_num,
+            "value_bool": node.value_bool,
+            "ref_count": len(node_ids),
+        }
+        leaf_count += len(node_ids)
+    data["content"] = content
+
+    print(f"  Hashed {leaf_count:,} leaf nodes ({len(content):,} distinct)")
+    return hashes
 
-    # Collect unique structures
-    structure_map = {}  # merkle -> {kind, key, child_keys, ref_count}
 
-    for full_path, node in data["nodes"].items():
-        if node["kind"] not in ["object", "array"]:
+def hash_containers(data: dict, hashes: list) -> None:
+    """Second half of compute_hashes: fill in the container Merkle hashes in place."""
+    nodes = data["nodes"]
+
+    # Compute Merkle hashes bottom-up. Containers are bucketed
+    # by depth in one pass (depth is computed once per node, no comparison
+    # sort) and the buckets are processed deepest first
+    buckets = []  # depth -> [node id]
+    for node_id, node in enumerate(nodes):
+        if node.kind in CONTAINER_KINDS:
+            depth = node.path.count("/")
+            while len(buckets) <= depth:
+                buckets.append([])
+            buckets[depth].append(node_id)
+
+    indptr = data["indptr"]
+    child_idx = data["child_idx"]
+    empty_hashes = {}  # (kind, key) -> hash of a childless container, shared across levels
+    container_count = 0
+    for bucket in reversed(buckets):
+        # Every child of this depth is already hashed, so the whole level
+        # goes to the hasher as one batch. Repeated subtrees are the norm,
+        # so the level is grouped on (kind, key, child hashes) first and
+        # each distinct container is hashed once. Empty containers hash
+        # over an empty child list, so they are looked up by (kind, key).
+        level = {}  # (kind, key, child hashes) -> [node id]
+        for node_id in bucket:
+            node = nodes[node_id]
+            start, end = indptr[node_id], indptr[node_id + 1]
+            if start == end:
+                empty_key = (node.kind, node.key)
+                h = empty_hashes.get(empty_key)
+                if h is None:
+                    h = empty_hashes[empty_key] = compute_merkle_hash(node.kind, node.key, [])
+                hashes[node_id] = h
+                continue
+            child_ids = child_idx[start:end]
+            item = (node.kind, node.key, tuple(hashes[c] for c in child_ids if hashes[c] is not None))
+            group = level.get(item)
+            if group is None:
+                level[item] = [node_id]
+            else:
+                group.append(node_id)
+        for node_ids, h in zip(level.values(), compute_merkle_hashes(level)):
+            for node_id in node_ids:
+                hashes[node_id] = h
+        container_count += len(bucket)
+
+    print(f"  Hashed {container_count:,} container nodes")
+
+
+def build_batches(data: dict, hashes: list) -> tuple:
+    """
+    Build every row the migration writes in a single pass over the containers.
+
+    Returns:
+        (content_rows, structure_rows, contains_rows, has_value_rows).
+        Content and Structure rows are deduplicated with reference counts;
+        relationship rows are (parent, child, key[, index]) tuples keyed by
+        hash.
+    """
+    # compute_hashes already grouped the leaves into unique content
+    content_rows = list(data["content"].values())
+
+    structure_map = {}  # merkle -> {merkle, kind, key, child_keys, child_count, ref_count}
+    # Edges are only collected for the first occurrence of each merkle, and
+    # a container's children differ in key (objects) or index (arrays), so
+    # these cannot repeat and need no set
+    contains_rels = []  # (parent_merkle, child_merkle, key, index)
+    has_value_rels = []  # (structure_merkle, content_hash, key)
+
+    nodes = data["nodes"]
+    indptr = data["indptr"]
+    child_idx = data["child_idx"]
+    for node_id, node in enumerate(nodes):
+        if node.kind not in CONTAINER_KINDS:
             continue
 
-        h = hashes.get(full_path)
-        if not h:
+        parent_hash = hashes[node_id]
+        if not parent_hash:
             continue
 
-        # Get child keys for objects
-        child_keys = []
-        if node["kind"] == "object":
-            child_paths = data["children"].get(full_path, [])
-            child_keys = sorted([data["nodes"][cp]["key"] for cp in child_paths if cp in data["nodes"]])
-
-        if h not in structure_map:
-            structure_map[h] = {
-                "merkle": h,
-                "kind": node["kind"],
-                "key": node["key"],
-                "child_keys": child_keys,
-                "child_count": len(data["children"].get(full_path, [])),
-                "ref_count": 0,
-            }
-        structure_map[h]["ref_count"] += 1
-
-    print(f"  Found {len(structure_map):,} unique structures")
-
-    # Batch insert Structure nodes
-    with driver.session(database=target_db) as session:
-        batch_size = 500
-        structure_list = list(structure_map.values())
+        child_ids = child_idx[indptr[node_id]:indptr[node_id + 1]]
+        structure = structure_map.get(parent_hash)
+        if structure is not None:
+            # Identical subtree: its structure and edges are already collected
+            structure["ref_count"] += 1
+            continue
 
-        for i in range(0, len(structure_list), batch_size):
-            batch = structure_list[i:i+batch_size]
-            session.run("""
-                UNWIND $batch AS s
-                MERGE (structure:Structure {merkle: s.merkle})
-                SET structure.kind = s.kind,
-                    structure.key = s.key,
-                    structure.child_keys = s.child_keys,
-                    structure.child_count = s.child_count,
-                    structure.ref_count = s.ref_count
-            """, batch=batch)
+        structure_map[parent_hash] = {
+            "merkle": parent_hash,
+            "kind": node.kind,
+            "key": node.key,
+            # Sorted child keys for objects
+            "child_keys": sorted(nodes[c].key for c in child_ids) if node.kind == "object" else [],
+            "child_count": len(child_ids),
+            "ref_count": 1,
+        }
+
+        is_array = node.kind == "array"
+        for idx, child_id in enumerate(child_ids):
+            child_hash = hashes[child_id]
+            if not child_hash:
+                continue
+            child_node = nodes[child_id]
+            if child_node.kind in CONTAINER_KINDS:
+                # Structure -> Structure
+                contains_rels.append((parent_hash, child_hash, child_node.key, idx if is_array else None))
+            else:
+                # Structure -> Content
+                has_value_rels.append((parent_hash, child_hash, child_node.key))
 
-            if (i + batch_size) % 1000 == 0 or i + batch_size >= len(structure_list):
-                print(f"    Inserted {min(i + batch_size, len(structure_list)):,}/{len(structure_list):,} Structure nodes")
+    return content_rows, list(structure_map.values()), contains_rels, has_value_rels
 
-    return structure_map
 
+def migrate_content_layer(driver, target_db: str, content_rows: list) -> dict:
+    """
+    Create deduplicated Content nodes for all leaf values.
 
-def create_structure_relationships(driver, target_db: str, data: dict, hashes: dict):
-    """Create CONTAINS relationships between Structure nodes and HAS_VALUE to Content nodes."""
-    print("\nCreating Structure relationships...")
+    Returns:
+        Content hash -> element id, for the relationship writes
+    """
+    print("\nMigrating Content layer...")
+    print(f"  Found {len(content_rows):,} unique content values")
 
-    # Collect unique relationships
-    contains_rels = set()  # (parent_merkle, child_merkle, key, index)
-    has_value_rels = set()  # (structure_merkle, content_hash, key)
+    written = write_batches_parallel(driver, target_db, _Q_WRITE_CONTENT, content_rows, "hash", "Content nodes")
+    return dict(written)
 
-    for full_path, node in data["nodes"].items():
-        if node["kind"] not in ["object", "array"]:
-            continue
 
-        parent_hash = hashes.get(full_path)
-        if not parent_hash:
-            continue
+def migrate_structure_layer(driver, target_db: str, structure_rows: list) -> dict:
+    """
+    Create deduplicated Structure nodes for all containers.
 
-        child_paths = data["children"].get(full_path, [])
-        for idx, child_path in enumerate(child_paths):
-            child_node = data["nodes"].get(child_path)
-            if not child_node:
-                continue
+    Returns:
+        Merkle hash -> element id, for the relationship writes
+    """
+    print("\nMigrating Structure layer...")
+    print(f"  Found {len(structure_rows):,} unique structures")
 
-            child_hash = hashes.get(child_path)
-            if not child_hash:
-                continue
+    written = write_batches_parallel(driver, target_db, _Q_WRITE_STRUCTURE, structure_rows, "merkle", "Structure nodes")
+    return dict(written)
 
-            if child_node["kind"] in ["object", "array"]:
-                # Structure -> Structure
-                key = child_node["key"]
-                index = idx if node["kind"] == "array" else None
-                contains_rels.add((parent_hash, child_hash, key, index))
-            else:
-                # Structure -> Content
-                key = child_node["key"]
-                has_value_rels.add((parent_hash, child_hash, key))
 
-    print(f"  Found {len(contains_rels):,} CONTAINS relationships")
-    print(f"  Found {len(has_value_rels):,} HAS_VALUE relationships")
+def create_structure_relationships(driver, target_db: str, contains_rows: list, has_value_rows: list,
+                                   element_ids: dict):
+    """Create CONTAINS relationships between Structure nodes and HAS_VALUE to Content nodes."""
+    print("\nCreating Structure relationships...")
+    print(f"  Found {len(contains_rows):,} CONTAINS relationships")
+    print(f"  Found {len(has_value_rows):,} HAS_VALUE relationships")
 
-    # Batch create CONTAINS relationships
+    # A single writer: each MERGE locks both end nodes, and shared children
+    # (null, true, common values) would make parallel writers deadlock.
+    # element_ids maps hash/merkle -> elementId, from the node writes.
     with driver.session(database=target_db) as session:
-        batch_size = 500
-        contains_list = [{"parent": p, "child": c, "key": k, "index": i} for p, c, k, i in contains_rels]
-
-        for i in range(0, len(contains_list), batch_size):
-            batch = contains_list[i:i+batch_size]
-            session.run("""
-                UNWIND $batch AS rel
-                MATCH (parent:Structure {merkle: rel.parent})
-                MATCH (child:Structure {merkle: rel.child})
-                MERGE (parent)-[r:CONTAINS {key: rel.key}]->(child)
-                SET r.index = rel.index
-            """, batch=batch)
-
-        print(f"    Created CONTAINS relationships")
+        # Batch create CONTAINS relationships
+        contains_list = [
+            {"parent_eid": element_ids[p], "child_eid": element_ids[c], "key": k, "index": i}
+            for p, c, k, i in contains_rows
+        ]
+        write_batches(session, _Q_WRITE_CONTAINS, contains_list, "CONTAINS relationships")
 
         # Batch create HAS_VALUE relationships
-        has_value_list = [{"structure": s, "content": c, "key": k} for s, c, k in has_value_rels]
-
-        for i in range(0, len(has_value_list), batch_size):
-            batch = has_value_list[i:i+batch_size]
-            session.run("""
-                UNWIND $batch AS rel
-                MATCH (structure:Structure {merkle: rel.structure})
-                MATCH (content:Content {hash: rel.content})
-                MERGE (structure)-[r:HAS_VALUE {key: rel.key}]->(content)
-            """, batch=batch)
-
-        print(f"    Created HAS_VALUE relationships")
+        has_value_list = [
+            {"structure_eid": element_ids[s], "content_eid": element_ids[c], "key": k}
+            for s, c, k in has_value_rows
+        ]
+        write_batches(session, _Q_WRITE_HAS_VALUE, has_value_list, "HAS_VALUE relationships")
 
 
-def create_source_nodes(driver, target_db: str, data: dict, hashes: dict):
+def create_source_nodes(driver, target_db: str, data: dict, hashes: list):
     """Create Source nodes and link to root Structure nodes."""
     print("\nCreating Source nodes...")
 
     sources = []
     now = datetime.now(timezone.utc).isoformat()
 
+    roots = data["roots"]
     for doc_id in data["by_doc"].keys():
-        # Find root path for this document
-        root_path = f"{doc_id}:/root"
-        root_merkle = hashes.get(root_path)
+        # Find root node for this document
+        root_id = roots.get(doc_id)
+        root_merkle = hashes[root_id] if root_id is not None else None
 
         if not root_merkle:
             print(f"  Warning: No root found for {doc_id}")
@@ -411,10 +609,11 @@ def create_source_nodes(driver, target_db: str, data: dict, hashes: dict):
         session.run("""
             UNWIND $sources AS s
             MERGE (source:Source {source_id: s.source_id})
-            SET source.source_type = s.source_type,
+            ON CREATE SET source.source_type = s.source_type,
                 source.name = s.name,
                 source.ingested_at = s.ingested_at,
                 source.node_count = s.node_count
+            ON MATCH SET source.node_count = s.node_count
             WITH source, s
             MATCH (root:Structure {merkle: s.root_merkle})
             MERGE (source)-[:HAS_ROOT]->(root)
@@ -423,35 +622,35 @@ def create_source_nodes(driver, target_db: str, data: dict, hashes: dict):
     print(f"  Created {len(sources)} Source nodes with HAS_ROOT relationships")
 
 
+# Counts for the migration summary, one round trip per database. Each
+# label/type count is a plain MATCH ... count() in its own subquery, which
+# the planner answers from the counts store instead of scanning.
+_Q_VERIFY_SOURCE = """
+    MATCH (d:Data)
+    RETURN count(d) AS nodes, count(DISTINCT d.doc_id) AS docs
+"""
+
+_Q_VERIFY_TARGET = """
+    CALL { MATCH (n:Source) RETURN count(n) AS sources }
+    CALL { MATCH (n:Structure) RETURN count(n) AS structures }
+    CALL { MATCH (n:Content) RETURN count(n) AS contents }
+    CALL { MATCH ()-[r:CONTAINS]->() RETURN count(r) AS contains }
+    CALL { MATCH ()-[r:HAS_VALUE]->() RETURN count(r) AS has_value }
+    CALL { MATCH ()-[r:HAS_ROOT]->() RETURN count(r) AS has_root }
+    RETURN sources, structures, contents, contains, has_value, has_root
+"""
+
+
 def verify_migration(driver, source_db: str, target_db: str):
     """Verify the migration was successful."""
     print("\nVerifying migration...")
 
     with driver.session(database=source_db) as session:
-        result = session.run("MATCH (d:Data) RETURN count(d) AS count")
-        source_count = result.single()["count"]
-
-        result = session.run("MATCH (d:Data) RETURN count(DISTINCT d.doc_id) AS count")
-        source_docs = result.single()["count"]
+        source_count, source_docs = session.run(_Q_VERIFY_SOURCE).single()
 
     with driver.session(database=target_db) as session:
-        result = session.run("MATCH (s:Source) RETURN count(s) AS count")
-        target_sources = result.single()["count"]
-
-        result = session.run("MATCH (s:Structure) RETURN count(s) AS count")
-        target_structures = result.single()["count"]
-
-        result = session.run("MATCH (c:Content) RETURN count(c) AS count")
-        target_contents = result.single()["count"]
-
-        result = session.run("MATCH ()-[r:CONTAINS]->() RETURN count(r) AS count")
-        contains_count = result.single()["count"]
-
-        result = session.run("MATCH ()-[r:HAS_VALUE]->() RETURN count(r) AS count")
-        has_value_count = result.single()["count"]
-
-        result = session.run("MATCH ()-[r:HAS_ROOT]->() RETURN count(r) AS count")
-        has_root_count = result.single()["count"]
+        (target_sources, target_structures, target_contents,
+         contains_count, has_value_count, has_root_count) = session.run(_Q_VERIFY_TARGET).single()
 
     total_target = target_sources + target_structures + target_contents
     reduction = (1 - total_target / source_count) * 100 if source_count > 0 else 0
@@ -508,28 +707,42 @@ def main():
         # Step 1: Create target database
         create_database(driver, config["target_db"])
 
-        # Step 2: Setup schema
-        setup_schema(driver, config["target_db"])
+        # Step 2: Uniqueness constraints (secondary indexes wait until
+        # after the bulk load)
+        setup_constraints(driver, config["target_db"])
 
         # Step 3: Load source data
         data = load_source_data(driver, config["source_db"])
 
-        # Step 4: Compute hashes
-        hashes = compute_hashes(data)
+        # Step 4: Hash leaves. Content rows only need leaf hashes, so
+        # their writes run in the background while containers are hashed
+        # and the Structure layer is written.
+        print("\nComputing hashes...")
+        hashes = hash_leaves(data)
+        with ThreadPoolExecutor(max_workers=1) as background:
+            content_ids = background.submit(
+                migrate_content_layer, driver, config["target_db"], list(data["content"].values())
+            )
 
-        # Step 5: Migrate Content layer
-        migrate_content_layer(driver, config["target_db"], data, hashes)
+            # Step 5: Hash containers and build the remaining rows in one pass
+            hash_containers(data, hashes)
+            _, structure_rows, contains_rows, has_value_rows = build_batches(data, hashes)
 
-        # Step 6: Migrate Structure layer
-        migrate_structure_layer(driver, config["target_db"], data, hashes)
+            # Step 6: Migrate the Structure layer alongside the Content writes
+            structure_ids = migrate_structure_layer(driver, config["target_db"], structure_rows)
+            element_ids = content_ids.result()
+            element_ids.update(structure_ids)
 
         # Step 7: Create relationships
-        create_structure_relationships(driver, config["target_db"], data, hashes)
+        create_structure_relationships(driver, config["target_db"], contains_rows, has_value_rows, element_ids)
 
         # Step 8: Create Source nodes
         create_source_nodes(driver, config["target_db"], data, hashes)
 
-        # Step 9: Verify
+        # Step 9: Build secondary indexes over the loaded graph
+        setup_indexes(driver, config["target_db"])
+
+        # Step 10: Verify
         results = verify_migration(driver, config["source_db"], config["target_db"])
 
         print("\nMigration complete!")
@@ -21,35 +21,388 @@ Usage:
 
 import os
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 try:
-    from neo4j import GraphDatabase
+    # Availability check only; connections come from get_shared_driver
+    import neo4j  # noqa: F401
 except ImportError:
     print("Error: neo4j driver not installed. Run: pip install neo4j")
     sys.exit(1)
 
+try:
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph._tree_builder import build_tree
+    from runner.hybridgraph.schema import ensure_schema
+    from runner.utils.fastjson import dumps
+    from runner.utils.neo4j import close_shared_drivers, get_shared_driver
+except ImportError:
+    # Fallback for direct execution
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph._tree_builder import build_tree
+    from runner.hybridgraph.schema import ensure_schema
+    from runner.utils.fastjson import dumps
+    from runner.utils.neo4j import close_shared_drivers, get_shared_driver
+
+
+# All Cypher lives here as constant text. Variable inputs go through $parameters,
+# never string formatting, so every call hits Neo4j's cached plan for the query.
+
+# Whole-document fetch: every Structure, Content value and CONTAINS edge under
+# the root in one round trip
+_Q_GET_DOCUMENT = """
+    MATCH (source:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+
+    // Get all structures in the tree, root included, each visited once
+    CALL apoc.path.subgraphNodes(root, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        bfs: true,
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS s
+    WITH root, collect(s) AS structures
+
+    // Get all content values, one row per HAS_VALUE, with the typed value
+    // already picked out of value_str / value_num / value_bool
+    UNWIND structures AS struct
+    OPTIONAL MATCH (struct)-[hv:HAS_VALUE]->(c:Content)
+    WITH root, structures,
+         [row IN collect([struct.merkle, hv.key, c.hash,
+                          CASE c.kind
+                              WHEN 'null' THEN null
+                              WHEN 'boolean' THEN c.value_bool
+                              WHEN 'number' THEN c.value_num
+                              ELSE c.value_str
+                          END])
+          WHERE row[2] IS NOT NULL] AS contents
+
+    // Get all contains relationships
+    UNWIND structures AS struct
+    OPTIONAL MATCH (struct)-[rel:CONTAINS]->(child:Structure)
+    WITH root, structures, contents,
+         [row IN collect([struct.merkle, child.merkle, rel.key])
+          WHERE row[1] IS NOT NULL] AS contains_rels
+
+    // Return parallel column lists rather than a map per row
+    RETURN root.merkle AS root_merkle,
+           [s IN structures | s.merkle] AS struct_merkle,
+           [s IN structures | s.kind] AS struct_kind,
+           [r IN contents | r[0]] AS content_parent,
+           [r IN contents | r[1]] AS content_key,
+           [r IN contents | r[3]] AS content_value,
+           [r IN contains_rels | r[0]] AS rel_parent,
+           [r IN contains_rels | r[1]] AS rel_child,
+           [r IN contains_rels | r[2]] AS rel_key
+"""
+
+_Q_LIST_SOURCES = """
+    MATCH (s:Source)
+    OPTIONAL MATCH (s)-[:HAS_ROOT]->(r:Structure)
+    RETURN s.source_id AS source_id,
+           s.source_type AS source_type,
+           s.name AS name,
+           s.node_count AS node_count,
+           s.ingested_at AS ingested_at,
+           s.last_synced AS last_synced,
+           r.merkle AS root_merkle
+    ORDER BY s.source_id
+    LIMIT $limit
+"""
+
+# Next page of list_sources after the cursor: a range seek on the unique
+# source_id index, so every page costs the same however deep it is
+_Q_LIST_SOURCES_AFTER = """
+    MATCH (s:Source)
+    WHERE s.source_id > $after
+    OPTIONAL MATCH (s)-[:HAS_ROOT]->(r:Structure)
+    RETURN s.source_id AS source_id,
+           s.source_type AS source_type,
+           s.name AS name,
+           s.node_count AS node_count,
+           s.ingested_at AS ingested_at,
+           s.last_synced AS last_synced,
+           r.merkle AS root_merkle
+    ORDER BY s.source_id
+    LIMIT $limit
+"""
+
+# Starts from the Content lookup, the most selective point, and walks up to
+# the owning sources. No index hint: the equality predicates let the planner
+# seek content_key_value where it exists, and databases without it still run.
+_Q_SEARCH_CONTENT = """
+    MATCH (c:Content {key: $key, value_str: $value})
+    MATCH (s:Structure)-[:HAS_VALUE]->(c)
+    CALL apoc.path.subgraphNodes(s, {
+        relationshipFilter: '<CONTAINS',
+        labelFilter: '+Structure',
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS ancestor
+    MATCH (src:Source)-[:HAS_ROOT]->(ancestor)
+    RETURN DISTINCT src.source_id AS source_id
+    LIMIT $limit
+"""
+
+# search_content_exact: the source is known, so walk down from its root
+# instead of back up from every matching Content
+_Q_SEARCH_CONTENT_EXACT = """
+    MATCH (:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+    CALL apoc.path.subgraphNodes(root, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS s
+    MATCH (s)-[:HAS_VALUE]->(:Content {key: $key, value_str: $value})
+    RETURN s.merkle AS merkle
+    LIMIT 1
+"""
+
+_Q_SEARCH_BY_KEY = """
+    MATCH (c:Content {key: $key})
+    RETURN c.value_str AS value_str,
+           c.value_num AS value_num,
+           c.value_bool AS value_bool,
+           c.kind AS kind,
+           c.ref_count AS ref_count
+    ORDER BY c.ref_count DESC
+    LIMIT $limit
+"""
+
+# The range predicate lets the planner seek the ref_count indexes
+# (schema.SCHEMA_STATEMENTS) where they exist; no hint, so databases created
+# before those indexes still run the query
+_Q_SHARED_STRUCTURES = """
+    MATCH (s:Structure)
+    WHERE s.ref_count >= $min_refs
+    RETURN s.merkle AS merkle,
+           s.kind AS kind,
+           s.key AS key,
+           s.child_keys AS child_keys,
+           s.child_count AS child_count,
+           s.ref_count AS ref_count
+    ORDER BY s.ref_count DESC
+    LIMIT $limit
+"""
+
+_Q_SHARED_CONTENT = """
+    MATCH (c:Content)
+    WHERE c.ref_count >= $min_refs
+    RETURN c.hash AS hash,
+           c.kind AS kind,
+           c.key AS key,
+           c.value_str AS value_str,
+           c.value_num AS value_num,
+           c.ref_count AS ref_count
+    ORDER BY c.ref_count DESC
+    LIMIT $limit
+"""
+
+# diff_sources with a cap: the set arithmetic runs server-side and only the
+# counts plus at most $cap "only in" merkles per side cross the wire
+_Q_DIFF_SUMMARY = """
+    MATCH (s1:Source {source_id: $id1})-[:HAS_ROOT]->(r1:Structure)
+    CALL apoc.path.subgraphNodes(r1, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        bfs: true,
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS struct1
+    WITH collect(struct1.merkle) AS merkles1
+    // collect() over no rows still yields [], so a missing source must stop here
+    WHERE size(merkles1) > 0
+
+    MATCH (s2:Source {source_id: $id2})-[:HAS_ROOT]->(r2:Structure)
+    CALL apoc.path.subgraphNodes(r2, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        bfs: true,
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS struct2
+    WITH merkles1, collect(struct2.merkle) AS merkles2
+    WHERE size(merkles2) > 0
+
+    WITH merkles1, merkles2,
+         apoc.coll.intersection(merkles1, merkles2) AS shared,
+         apoc.coll.subtract(merkles1, merkles2) AS only1,
+         apoc.coll.subtract(merkles2, merkles1) AS only2
+    RETURN size(shared) AS shared_count,
+           size(merkles1) AS n1,
+           size(merkles2) AS n2,
+           only1[..$cap] AS only_in_first,
+           only2[..$cap] AS only_in_second
+"""
+
+# Version check for the document cache: a document is a pure function of
+# its root merkle
+_Q_SOURCE_ROOT = """
+    MATCH (:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+    RETURN root.merkle AS root_merkle
+"""
+
+# One side of diff_sources; both sides run concurrently in their own sessions
+_Q_SOURCE_MERKLES = """
+    MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+    CALL apoc.path.subgraphNodes(root, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        bfs: true,
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS s
+    RETURN root.merkle AS root_merkle, collect(s.merkle) AS merkles
+"""
+
+# Structures are walked to $max_depth, like get_document and the health
+# audit, then each takes its HAS_VALUE hop. Both are counted as rows stream
+# past; DISTINCT keeps only ids, never the node lists themselves.
+_Q_SOURCE_STATS = """
+    MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
+    CALL apoc.path.subgraphNodes(root, {
+        relationshipFilter: 'CONTAINS>',
+        labelFilter: '+Structure',
+        bfs: true,
+        uniqueness: 'NODE_GLOBAL',
+        maxLevel: $max_depth
+    }) YIELD node AS s
+    OPTIONAL MATCH (s)-[:HAS_VALUE]->(c:Content)
+    WITH src,
+         count(DISTINCT s) AS structure_count,
+         count(DISTINCT c) AS content_count
+
+    RETURN src.source_id AS source_id,
+           src.source_type AS source_type,
+           src.node_count AS original_node_count,
+           structure_count,
+           content_count,
+           src.ingested_at AS ingested_at,
+           src.last_synced AS last_synced
+"""
+
+# get_stats counts, run concurrently on separate sessions; each is a plain
+# label/type count that Neo4j answers from its counts store
+_Q_STATS = {
+    "source_count": "MATCH (n:Source) RETURN count(n)",
+    "structure_count": "MATCH (n:Structure) RETURN count(n)",
+    "content_count": "MATCH (n:Content) RETURN count(n)",
+    "has_root_count": "MATCH ()-[r:HAS_ROOT]->() RETURN count(r)",
+    "contains_count": "MATCH ()-[r:CONTAINS]->() RETURN count(r)",
+    "has_value_count": "MATCH ()-[r:HAS_VALUE]->() RETURN count(r)",
+}
+
+_Q_TOP_CONTENT = """
+    MATCH (c:Content)
+    WHERE c.ref_count > 1
+    RETURN c.key AS key, c.value_str AS value, c.ref_count AS ref_count
+    ORDER BY c.ref_count DESC
+    LIMIT 10
+"""
+
+_Q_TOP_STRUCTURES = """
+    MATCH (s:Structure)
+    WHERE s.ref_count > 1
+    RETURN s.kind AS kind, s.key AS key, s.child_count AS child_count, s.ref_count AS ref_count
+    ORDER BY s.ref_count DESC
+    LIMIT 10
+"""
+
+_Q_CONTENT_DEDUP = """
+    MATCH (c:Content)
+    WITH sum(c.ref_count) AS total_refs, count(c) AS unique_count
+    RETURN total_refs, unique_count,
+           CASE WHEN total_refs > 0 THEN (toFloat(total_refs - unique_count) / total_refs) * 100 ELSE 0 END AS dedup_percent
+"""
+
+_Q_STRUCTURE_DEDUP = """
+    MATCH (s:Structure)
+    WITH sum(s.ref_count) AS total_refs, count(s) AS unique_count
+    RETURN total_refs, unique_count,
+           CASE WHEN total_refs > 0 THEN (toFloat(total_refs - unique_count) / total_refs) * 100 ELSE 0 END AS dedup_percent
+"""
+
+
+# Returned by get_document when the stored root merkle equals if_none_match
+NOT_MODIFIED = object()
+
+
+def _fetch_document(tx, source_id: str):
+    return tx.run(_Q_GET_DOCUMENT, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH).single()
+
+
+def _fetch_root_merkle(tx, source_id: str) -> Optional[str]:
+    record = tx.run(_Q_SOURCE_ROOT, source_id=source_id).single()
+    return record["root_merkle"] if record else None
+
+
+def _fetch_source_merkles(tx, source_id: str) -> Optional[List[str]]:
+    # Grouped by root, so an unknown (or rootless) source returns no row
+    record = tx.run(_Q_SOURCE_MERKLES, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH).single()
+    return record["merkles"] if record else None
+
+
+def _fetch_diff_summary(tx, source_id1: str, source_id2: str, cap: int):
+    # No row unless both sources exist
+    return tx.run(
+        _Q_DIFF_SUMMARY, id1=source_id1, id2=source_id2, cap=cap, max_depth=MAX_TRAVERSAL_DEPTH
+    ).single()
+
+
+# Reconstructed documents kept per HybridGraphQuery instance. Off by default:
+# cached documents are shared between calls, and each cached lookup costs an
+# extra root-merkle query; pass doc_cache_size to opt in
+DOC_CACHE_SIZE = 0
+
 
 class HybridGraphQuery:
     """Query interface for hybridgraph database."""
 
-    def __init__(self, uri: str = None, user: str = None, password: str = None, database: str = None):
+    def __init__(self, uri: str = None, user: str = None, password: str = None, database: str = None,
+                 doc_cache_size: int = DOC_CACHE_SIZE):
         self.uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
         self.user = user or os.environ.get("NEO4J_USER", "neo4j")
         self.password = password or os.environ.get("NEO4J_PASSWORD", "password")
         self.database = database or os.environ.get("TARGET_DB", "hybridgraph")
         self._driver = None
+        self._doc_cache_size = doc_cache_size
+        self._doc_cache = OrderedDict()  # source_id -> (root merkle, doc)
 
     @property
     def driver(self):
+        # Process-wide driver per (uri, user, password): instances share its
+        # connection pool instead of each paying the Bolt handshake
         if self._driver is None:
-            self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            self._driver = get_shared_driver(self.uri, self.user, self.password)
         return self._driver
 
     def close(self):
-        if self._driver:
-            self._driver.close()
-            self._driver = None
+        # The shared driver outlives this instance; it is closed at exit
+        # (or by shutdown_driver_cache)
+        self._driver = None
+
+    @classmethod
+    def shutdown_driver_cache(cls):
+        """Close every shared driver, e.g. before forking worker processes."""
+        close_shared_drivers()
+
+    def ensure_indexes(self) -> bool:
+        """
+        Create the constraints and indexes the queries rely on, if missing.
+
+        Call once at application startup: without them the Source,
+        Structure and Content lookups every query starts from are label
+        scans. Issued at most once per driver and database per process.
+
+        Returns:
+            True if the statements were issued, False if already ensured
+        """
+        return ensure_schema(self.driver, self.database)
 
     def __enter__(self):
         return self
@@ -61,257 +414,128 @@ class HybridGraphQuery:
     # Document Operations
     # =========================================================================
 
-    def get_document(self, source_id: str, use_batch: bool = True) -> Optional[Dict[str, Any]]:
+    def get_document(self, source_id: str, use_batch: bool = True,
+                     if_none_match: Optional[str] = None) -> Any:
         """
         Reconstruct a JSON document from the hybridgraph.
 
         Args:
             source_id: The source identifier
-            use_batch: If True, use optimized batch query (default).
-                       If False, use recursive queries.
+            use_batch: Kept for compatibility; documents are always fetched
+                       with the single batch query
+            if_none_match: Root merkle of a copy the caller already holds
+                           (see get_root_merkle)
 
         Returns:
-            The reconstructed JSON document, or None if not found
+            The reconstructed JSON document, None if not found, or
+            NOT_MODIFIED if the root merkle equals if_none_match
+        """
+        return self.get_document_batch(source_id, if_none_match=if_none_match)
+
+    def get_root_merkle(self, source_id: str) -> Optional[str]:
         """
-        if use_batch:
-            return self.get_document_batch(source_id)
+        Get a source's root merkle, usable as an ETag for its document.
 
-        # Original recursive implementation
+        Returns:
+            The root merkle, or None if the source is not found
+        """
         with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (source:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-                RETURN root.merkle AS root_merkle, root.kind AS root_kind
-            """, source_id=source_id)
+            return session.execute_read(_fetch_root_merkle, source_id)
 
-            record = result.single()
-            if not record:
-                return None
+    def get_document_json(self, source_id: str) -> Optional[str]:
+        """
+        Reconstruct a document and serialize it to JSON.
 
-            return self._reconstruct_node(session, record["root_merkle"])
+        Uses orjson when installed (runner.utils.fastjson).
 
-    def get_document_batch(self, source_id: str) -> Optional[Dict[str, Any]]:
+        Returns:
+            The document as a JSON string, or None if not found
+        """
+        doc = self.get_document_batch(source_id)
+        return None if doc is None else dumps(doc)
+
+    def get_document_batch(self, source_id: str, if_none_match: Optional[str] = None) -> Any:
         """
         Reconstruct a JSON document using batch query (optimized).
 
         Uses a single query to fetch the entire subgraph, then reconstructs
         in memory. Much faster than recursive queries for large documents.
+
+        With doc_cache_size > 0, documents are cached (LRU) per source and
+        reused while the source's root merkle is unchanged; cached documents
+        are shared between calls, so callers that opt in must not modify
+        them. Without the cache every call returns a fresh document.
+
+        If if_none_match equals the stored root merkle the subgraph query is
+        skipped and NOT_MODIFIED is returned: equal merkles mean equal
+        content.
         """
         with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (source:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-
-                // Get all structures in the tree
-                OPTIONAL MATCH path = (root)-[:CONTAINS*0..100]->(s:Structure)
-                WITH root, collect(DISTINCT s) + [root] AS structures
-
-                // Get all content values
-                UNWIND structures AS struct
-                OPTIONAL MATCH (struct)-[hv:HAS_VALUE]->(c:Content)
-                WITH root, structures,
-                     collect({
-                         parent_merkle: struct.merkle,
-                         key: hv.key,
-                         hash: c.hash,
-                         kind: c.kind,
-                         value_str: c.value_str,
-                         value_num: c.value_num,
-                         value_bool: c.value_bool
-                     }) AS contents
-
-                // Get all contains relationships
-                UNWIND structures AS struct
-                OPTIONAL MATCH (struct)-[rel:CONTAINS]->(child:Structure)
-                WITH root, structures, contents,
-                     collect({
-                         parent_merkle: struct.merkle,
-                         child_merkle: child.merkle,
-                         key: rel.key
-                     }) AS contains_rels
-
-                // Return structure info
-                RETURN root.merkle AS root_merkle,
-                       [s IN structures | {
-                           merkle: s.merkle,
-                           kind: s.kind,
-                           key: s.key,
-                           child_keys: s.child_keys
-                       }] AS structures,
-                       contents,
-                       contains_rels
-            """, source_id=source_id)
-
-            record = result.single()
+            if self._doc_cache_size or if_none_match is not None:
+                root_merkle = session.execute_read(_fetch_root_merkle, source_id)
+                if root_merkle is None:
+                    return None
+                if root_merkle == if_none_match:
+                    return NOT_MODIFIED
+                cached = self._doc_cache.get(source_id)
+                if cached is not None and cached[0] == root_merkle:
+                    self._doc_cache.move_to_end(source_id)
+                    return cached[1]
+
+            record = session.execute_read(_fetch_document, source_id)
             if not record:
                 return None
 
-            return self._build_tree_from_batch(
-                record["root_merkle"],
-                record["structures"],
-                record["contents"],
-                record["contains_rels"]
-            )
-
-    def _build_tree_from_batch(self, root_merkle: str, structures: list,
-                                contents: list, contains_rels: list) -> Any:
-        """Build document tree from batch query results."""
-        # Index structures by merkle
-        struct_map = {s["merkle"]: s for s in structures if s["merkle"]}
-
-        # Index contents by parent merkle
-        content_map = {}  # merkle -> list of content items
-        for c in contents:
-            if c["parent_merkle"] and c["hash"]:
-                if c["parent_merkle"] not in content_map:
-                    content_map[c["parent_merkle"]] = []
-                content_map[c["parent_merkle"]].append(c)
-
-        # Index contains relationships
-        children_map = {}  # parent_merkle -> list of (key, child_merkle)
-        for rel in contains_rels:
-            if rel["parent_merkle"] and rel["child_merkle"]:
-                if rel["parent_merkle"] not in children_map:
-                    children_map[rel["parent_merkle"]] = []
-                children_map[rel["parent_merkle"]].append((rel["key"], rel["child_merkle"]))
-
-        def build_node(merkle: str) -> Any:
-            struct = struct_map.get(merkle)
-            if not struct:
-                return None
+            doc = self._build_tree_from_batch(record)
 
-            kind = struct["kind"]
-
-            if kind == "object":
-                obj = {}
-                # Add child structures
-                for key, child_merkle in children_map.get(merkle, []):
-                    obj[key] = build_node(child_merkle)
-                # Add content values
-                for c in content_map.get(merkle, []):
-                    obj[c["key"]] = self._extract_value(c["kind"], c["value_str"], c["value_num"], c["value_bool"])
-                return obj
-
-            elif kind == "array":
-                items = []
-                # Collect all children with their indices
-                all_items = []
-                for key, child_merkle in children_map.get(merkle, []):
-                    all_items.append((int(key), build_node(child_merkle)))
-                for c in content_map.get(merkle, []):
-                    all_items.append((int(c["key"]), self._extract_value(c["kind"], c["value_str"], c["value_num"], c["value_bool"])))
-                # Sort by index and extract values
-                all_items.sort(key=lambda x: x[0])
-                return [item[1] for item in all_items]
-
-            return None
-
-        return build_node(root_merkle)
-
-    def _reconstruct_node(self, session, merkle: str) -> Any:
-        """Recursively reconstruct a node from its merkle hash."""
-        result = session.run("""
-            MATCH (s:Structure {merkle: $merkle})
-            RETURN s.kind AS kind, s.key AS key, s.child_keys AS child_keys
-        """, merkle=merkle)
-
-        record = result.single()
-        if not record:
-            return None
-
-        kind = record["kind"]
-
-        if kind == "object":
-            obj = {}
-
-            # Get child structures
-            result = session.run("""
-                MATCH (s:Structure {merkle: $merkle})-[r:CONTAINS]->(child:Structure)
-                RETURN r.key AS key, child.merkle AS child_merkle
-            """, merkle=merkle)
-
-            for r in result:
-                obj[r["key"]] = self._reconstruct_node(session, r["child_merkle"])
-
-            # Get child content
-            result = session.run("""
-                MATCH (s:Structure {merkle: $merkle})-[r:HAS_VALUE]->(c:Content)
-                RETURN r.key AS key, c.kind AS kind,
-                       c.value_str AS value_str, c.value_num AS value_num,
-                       c.value_bool AS value_bool
-            """, merkle=merkle)
-
-            for r in result:
-                obj[r["key"]] = self._extract_value(r["kind"], r["value_str"], r["value_num"], r["value_bool"])
-
-            return obj
-
-        elif kind == "array":
-            items = []
-
-            # Get child structures
-            result = session.run("""
-                MATCH (s:Structure {merkle: $merkle})-[r:CONTAINS]->(child:Structure)
-                RETURN r.key AS key, child.merkle AS child_merkle
-                ORDER BY CASE WHEN r.index IS NOT NULL THEN r.index ELSE toInteger(r.key) END
-            """, merkle=merkle)
-
-            struct_children = [(int(r["key"]), "struct", r["child_merkle"]) for r in result]
-
-            # Get child content
-            result = session.run("""
-                MATCH (s:Structure {merkle: $merkle})-[r:HAS_VALUE]->(c:Content)
-                RETURN r.key AS key, c.kind AS kind,
-                       c.value_str AS value_str, c.value_num AS value_num,
-                       c.value_bool AS value_bool
-                ORDER BY toInteger(r.key)
-            """, merkle=merkle)
-
-            content_children = [(int(r["key"]), "content", (r["kind"], r["value_str"], r["value_num"], r["value_bool"])) for r in result]
-
-            # Combine and sort
-            all_children = struct_children + content_children
-            all_children.sort(key=lambda x: x[0])
-
-            for _, child_type, data in all_children:
-                if child_type == "struct":
-                    items.append(self._reconstruct_node(session, data))
-                else:
-                    kind, vs, vn, vb = data
-                    items.append(self._extract_value(kind, vs, vn, vb))
-
-            return items
-
-        return None
-
-    def _extract_value(self, kind: str, value_str, value_num, value_bool) -> Any:
-        """Extract the actual value from Content node fields."""
-        if kind == "null":
-            return None
-        elif kind == "boolean":
-            return value_bool
-        elif kind == "number":
-            return value_num
-        elif kind == "string":
-            return value_str
-        return value_str
-
-    def list_sources(self, limit: int = 100) -> List[Dict]:
-        """List all source documents."""
+        if self._doc_cache_size:
+            # Keyed on the merkle the document was actually built from
+            self._doc_cache[source_id] = (record["root_merkle"], doc)
+            self._doc_cache.move_to_end(source_id)
+            while len(self._doc_cache) > self._doc_cache_size:
+                self._doc_cache.popitem(last=False)
+        return doc
+
+    def clear_cache(self):
+        """Drop every cached document."""
+        self._doc_cache.clear()
+
+    def _build_tree_from_batch(self, columns) -> Any:
+        """Build document tree from the column lists of _Q_GET_DOCUMENT."""
+        return build_tree(columns)
+
+    def _iter_records(self, query: str, **params) -> Iterator:
+        """
+        Stream the records of a read query.
+
+        Records arrive in fetch_size pages as the caller iterates; the
+        session stays open until the generator is exhausted or closed.
+        """
         with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (s:Source)
-                OPTIONAL MATCH (s)-[:HAS_ROOT]->(r:Structure)
-                RETURN s.source_id AS source_id,
-                       s.source_type AS source_type,
-                       s.name AS name,
-                       s.node_count AS node_count,
-                       s.ingested_at AS ingested_at,
-                       s.last_synced AS last_synced,
-                       r.merkle AS root_merkle
-                ORDER BY s.source_id
-                LIMIT $limit
-            """, limit=limit)
-
-            return [dict(r) for r in result]
+            yield from session.run(query, **params)
+
+    def iter_sources(self, limit: int = 100, after: Optional[str] = None) -> Iterator[Dict]:
+        """Stream source documents, as list_sources."""
+        if after is None:
+            records = self._iter_records(_Q_LIST_SOURCES, limit=limit)
+        else:
+            records = self._iter_records(_Q_LIST_SOURCES_AFTER, limit=limit, after=after)
+        for record in records:
+            yield record.data()
+
+    def list_sources(self, limit: int = 100, after: Optional[str] = None) -> List[Dict]:
+        """
+        List source documents ordered by source_id.
+
+        Args:
+            limit: Maximum results to return
+            after: Cursor; only sources whose source_id sorts after it are
+                   returned. Pass the last source_id of the previous page.
+
+        Returns:
+            List of source dicts
+        """
+        return list(self.iter_sources(limit, after))
 
     # =========================================================================
     # Search Operations
@@ -329,33 +553,47 @@ class HybridGraphQuery:
         Returns:
             List of source_ids containing the key-value pair
         """
-        with self.driver.session(database=self.database) as session:
-            # Depth limit (100) prevents runaway queries on deeply nested structures
-            result = session.run("""
-                MATCH (c:Content {key: $key, value_str: $value})
-                MATCH (s:Structure)-[:HAS_VALUE]->(c)
-                MATCH (src:Source)-[:HAS_ROOT]->(:Structure)-[:CONTAINS*0..100]->(s)
-                RETURN DISTINCT src.source_id AS source_id
-                LIMIT $limit
-            """, key=key, value=value, limit=limit)
+        return list(self.iter_search_content(key, value, limit))
+
+    def iter_search_content(self, key: str, value: str, limit: int = 100) -> Iterator[str]:
+        """Stream source IDs containing a key-value pair, as search_content."""
+        records = self._iter_records(
+            _Q_SEARCH_CONTENT, key=key, value=value, limit=limit, max_depth=MAX_TRAVERSAL_DEPTH
+        )
+        for record in records:
+            yield record[0]
+
+    def search_content_exact(self, source_id: str, key: str, value: str) -> bool:
+        """
+        Check whether one source contains a specific key-value pair.
 
-            return [r["source_id"] for r in result]
+        Cheaper than search_content when the source is already known: only
+        that source's tree is walked.
+
+        Args:
+            source_id: The source to look in
+            key: The key to search for
+            value: The string value to match
+
+        Returns:
+            True if the source contains the key-value pair
+        """
+        records = self._iter_records(
+            _Q_SEARCH_CONTENT_EXACT, source_id=source_id, key=key, value=value,
+            max_depth=MAX_TRAVERSAL_DEPTH,
+        )
+        for _ in records:
+            return True
+        return False
+
+    def iter_search_by_key(self, key: str, limit: int = 100) -> Iterator[Dict]:
+        """Stream the unique values for a key, as search_by_key."""
+        for record in self._iter_records(_Q_SEARCH_BY_KEY, key=key, limit=limit):
+            yield record.data()
 
     def search_by_key(self, key: str, limit: int = 100) -> List[Dict]:
         """Find all unique values for a specific key."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (c:Content {key: $key})
-                RETURN c.value_str AS value_str,
-                       c.value_num AS value_num,
-                       c.value_bool AS value_bool,
-                       c.kind AS kind,
-                       c.ref_count AS ref_count
-                ORDER BY c.ref_count DESC
-                LIMIT $limit
-            """, key=key, limit=limit)
-
-            return [dict(r) for r in result]
+        return list(self.iter_search_by_key(key, limit))
 
     def find_shared_structures(self, min_refs: int = 10, limit: int = 50) -> List[Dict]:
         """
@@ -368,21 +606,12 @@ class HybridGraphQuery:
         Returns:
             List of shared structures with their ref_counts
         """
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE s.ref_count >= $min_refs
-                RETURN s.merkle AS merkle,
-                       s.kind AS kind,
-                       s.key AS key,
-                       s.child_keys AS child_keys,
-                       s.child_count AS child_count,
-                       s.ref_count AS ref_count
-                ORDER BY s.ref_count DESC
-                LIMIT $limit
-            """, min_refs=min_refs, limit=limit)
-
-            return [dict(r) for r in result]
+        return list(self.iter_shared_structures(min_refs, limit))
+
+    def iter_shared_structures(self, min_refs: int = 10, limit: int = 50) -> Iterator[Dict]:
+        """Stream shared structures, as find_shared_structures."""
+        for record in self._iter_records(_Q_SHARED_STRUCTURES, min_refs=min_refs, limit=limit):
+            yield record.data()
 
     def find_shared_content(self, min_refs: int = 10, limit: int = 50) -> List[Dict]:
         """
@@ -395,30 +624,32 @@ class HybridGraphQuery:
         Returns:
             List of shared content with their ref_counts
         """
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE c.ref_count >= $min_refs
-                RETURN c.hash AS hash,
-                       c.kind AS kind,
-                       c.key AS key,
-                       c.value_str AS value_str,
-                       c.value_num AS value_num,
-                       c.ref_count AS ref_count
-                ORDER BY c.ref_count DESC
-                LIMIT $limit
-            """, min_refs=min_refs, limit=limit)
-
-            return [dict(r) for r in result]
+        return list(self.iter_shared_content(min_refs, limit))
+
+    def iter_shared_content(self, min_refs: int = 10, limit: int = 50) -> Iterator[Dict]:
+        """Stream shared content values, as find_shared_content."""
+        for record in self._iter_records(_Q_SHARED_CONTENT, min_refs=min_refs, limit=limit):
+            yield record.data()
 
     # =========================================================================
     # Comparison Operations
     # =========================================================================
 
-    def diff_sources(self, source_id1: str, source_id2: str) -> Dict:
+    def _source_merkles(self, source_id: str) -> Optional[List[str]]:
+        """Merkle hashes of every structure in a source, or None if it has no root."""
+        with self.driver.session(database=self.database) as session:
+            return session.execute_read(_fetch_source_merkles, source_id)
+
+    def diff_sources(self, source_id1: str, source_id2: str, cap: Optional[int] = None) -> Dict:
         """
         Compare two documents by their Merkle hashes.
 
+        Args:
+            source_id1: First source identifier
+            source_id2: Second source identifier
+            cap: If given, compute the diff server-side (APOC) and return at
+                 most this many merkles in each "only in" list
+
         Returns:
             Dictionary with:
             - only_in_first: merkles only in source_id1
@@ -426,40 +657,51 @@ class HybridGraphQuery:
             - shared_count: count of shared structures
             - similarity: Jaccard similarity (0-1)
         """
+        if cap is not None:
+            return self._diff_summary(source_id1, source_id2, cap)
+
+        # The two traversals are independent, so they run in parallel on
+        # separate sessions (and connections). MAX_TRAVERSAL_DEPTH prevents
+        # runaway queries on deeply nested structures.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.map(self._source_merkles, (source_id1, source_id2))
+        if first is None or second is None:
+            return {"error": "One or both sources not found"}
+
+        merkles1 = set(first)
+        merkles2 = set(second)
+
+        only_in_first = merkles1 - merkles2
+        only_in_second = merkles2 - merkles1
+        shared = merkles1 & merkles2
+        union = merkles1 | merkles2
+
+        return {
+            "source_id1": source_id1,
+            "source_id2": source_id2,
+            "only_in_first": list(only_in_first),
+            "only_in_second": list(only_in_second),
+            "shared_count": len(shared),
+            "similarity": len(shared) / len(union) if union else 1.0,
+        }
+
+    def _diff_summary(self, source_id1: str, source_id2: str, cap: int) -> Dict:
+        """diff_sources with the set arithmetic done in Cypher."""
         with self.driver.session(database=self.database) as session:
-            # Depth limit (100) prevents runaway queries on deeply nested structures
-            result = session.run("""
-                MATCH (s1:Source {source_id: $id1})-[:HAS_ROOT]->(r1:Structure)
-                OPTIONAL MATCH (r1)-[:CONTAINS*0..100]->(struct1:Structure)
-                WITH collect(DISTINCT COALESCE(struct1.merkle, r1.merkle)) AS merkles1
-
-                MATCH (s2:Source {source_id: $id2})-[:HAS_ROOT]->(r2:Structure)
-                OPTIONAL MATCH (r2)-[:CONTAINS*0..100]->(struct2:Structure)
-                WITH merkles1, collect(DISTINCT COALESCE(struct2.merkle, r2.merkle)) AS merkles2
-
-                RETURN merkles1, merkles2
-            """, id1=source_id1, id2=source_id2)
-
-            record = result.single()
-            if not record:
-                return {"error": "One or both sources not found"}
-
-            merkles1 = set(record["merkles1"])
-            merkles2 = set(record["merkles2"])
-
-            only_in_first = merkles1 - merkles2
-            only_in_second = merkles2 - merkles1
-            shared = merkles1 & merkles2
-            union = merkles1 | merkles2
-
-            return {
-                "source_id1": source_id1,
-                "source_id2": source_id2,
-                "only_in_first": list(only_in_first),
-                "only_in_second": list(only_in_second),
-                "shared_count": len(shared),
-                "similarity": len(shared) / len(union) if union else 1.0,
-            }
+            record = session.execute_read(_fetch_diff_summary, source_id1, source_id2, cap)
+        if not record:
+            return {"error": "One or both sources not found"}
+
+        shared = record["shared_count"]
+        union = record["n1"] + record["n2"] - shared
+        return {
+            "source_id1": source_id1,
+            "source_id2": source_id2,
+            "only_in_first": record["only_in_first"],
+            "only_in_second": record["only_in_second"],
+            "shared_count": shared,
+            "similarity": shared / union if union else 1.0,
+        }
 
     # =========================================================================
     # Statistics
@@ -468,24 +710,8 @@ class HybridGraphQuery:
     def get_source_stats(self, source_id: str) -> Dict:
         """Get statistics for a specific source document."""
         with self.driver.session(database=self.database) as session:
-            # Depth limit (100) prevents runaway queries on deeply nested structures
-            result = session.run("""
-                MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-                OPTIONAL MATCH (root)-[:CONTAINS*0..100]->(s:Structure)
-                WITH src, root, collect(DISTINCT s) + [root] AS structures
-
-                UNWIND structures AS struct
-                OPTIONAL MATCH (struct)-[:HAS_VALUE]->(c:Content)
-                WITH src, structures, collect(DISTINCT c) AS contents
-
-                RETURN src.source_id AS source_id,
-                       src.source_type AS source_type,
-                       src.node_count AS original_node_count,
-                       size(structures) AS structure_count,
-                       size(contents) AS content_count,
-                       src.ingested_at AS ingested_at,
-                       src.last_synced AS last_synced
-            """, source_id=source_id)
+            # MAX_TRAVERSAL_DEPTH prevents runaway queries on deeply nested structures
+            result = session.run(_Q_SOURCE_STATS, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH)
 
             record = result.single()
             if not record:
@@ -493,82 +719,44 @@ class HybridGraphQuery:
 
             return dict(record)
 
-    def get_stats(self) -> Dict:
-        """Get overall database statistics."""
+    def _count(self, query: str) -> int:
+        # Sessions are not thread-safe: each worker opens its own
         with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (src:Source)
-                WITH count(src) AS source_count
-
-                MATCH (s:Structure)
-                WITH source_count, count(s) AS structure_count
-
-                MATCH (c:Content)
-                WITH source_count, structure_count, count(c) AS content_count
-
-                MATCH ()-[r:HAS_ROOT]->()
-                WITH source_count, structure_count, content_count, count(r) AS has_root_count
-
-                MATCH ()-[r:CONTAINS]->()
-                WITH source_count, structure_count, content_count, has_root_count, count(r) AS contains_count
-
-                MATCH ()-[r:HAS_VALUE]->()
-                RETURN source_count, structure_count, content_count,
-                       has_root_count, contains_count, count(r) AS has_value_count
-            """)
+            return session.run(query).single().value()
 
-            record = result.single()
-            return {
-                "sources": record["source_count"],
-                "structures": record["structure_count"],
-                "contents": record["content_count"],
-                "relationships": {
-                    "HAS_ROOT": record["has_root_count"],
-                    "CONTAINS": record["contains_count"],
-                    "HAS_VALUE": record["has_value_count"],
-                },
-                "total_nodes": record["source_count"] + record["structure_count"] + record["content_count"],
-                "total_relationships": record["has_root_count"] + record["contains_count"] + record["has_value_count"],
-            }
+    def get_stats(self) -> Dict:
+        """Get overall database statistics."""
+        with ThreadPoolExecutor(max_workers=len(_Q_STATS)) as pool:
+            record = dict(zip(_Q_STATS, pool.map(self._count, _Q_STATS.values())))
+        return {
+            "sources": record["source_count"],
+            "structures": record["structure_count"],
+            "contents": record["content_count"],
+            "relationships": {
+                "HAS_ROOT": record["has_root_count"],
+                "CONTAINS": record["contains_count"],
+                "HAS_VALUE": record["has_value_count"],
+            },
+            "total_nodes": record["source_count"] + record["structure_count"] + record["content_count"],
+            "total_relationships": record["has_root_count"] + record["contains_count"] + record["has_value_count"],
+        }
 
     def get_deduplication_stats(self) -> Dict:
         """Get statistics about deduplication effectiveness."""
         with self.driver.session(database=self.database) as session:
             # Most reused content
-            result = session.run("""
-                MATCH (c:Content)
-                WHERE c.ref_count > 1
-                RETURN c.key AS key, c.value_str AS value, c.ref_count AS ref_count
-                ORDER BY c.ref_count DESC
-                LIMIT 10
-            """)
+            result = session.run(_Q_TOP_CONTENT)
             top_content = [dict(r) for r in result]
 
             # Most reused structures
-            result = session.run("""
-                MATCH (s:Structure)
-                WHERE s.ref_count > 1
-                RETURN s.kind AS kind, s.key AS key, s.child_count AS child_count, s.ref_count AS ref_count
-                ORDER BY s.ref_count DESC
-                LIMIT 10
-            """)
+            result = session.run(_Q_TOP_STRUCTURES)
             top_structures = [dict(r) for r in result]
 
             # Calculate deduplication ratio
-            result = session.run("""
-                MATCH (c:Content)
-                WITH sum(c.ref_count) AS total_refs, count(c) AS unique_count
-                RETURN total_refs, unique_count,
-                       CASE WHEN total_refs > 0 THEN (toFloat(total_refs - unique_count) / total_refs) * 100 ELSE 0 END AS dedup_percent
-            """)
+            result = session.run(_Q_CONTENT_DEDUP)
             content_stats = result.single()
 
-            result = session.run("""
-                MATCH (s:Structure)
-                WITH sum(s.ref_count) AS total_refs, count(s) AS unique_count
-                RETURN total_refs, unique_count,
-                       CASE WHEN total_refs > 0 THEN (toFloat(total_refs - unique_count) / total_refs) * 100 ELSE 0 END AS dedup_percent
-            """)
+            result = session.run(_Q_STRUCTURE_DEDUP)
             structure_stats = result.single()
 
             return {
@@ -588,45 +776,48 @@ class HybridGraphQuery:
 
 
 # Convenience functions for module-level access
-def get_document(source_id: str, use_batch: bool = True) -> Optional[Dict]:
-    """Get a document by source_id."""
-    with HybridGraphQuery() as query:
-        return query.get_document(source_id, use_batch=use_batch)
+def get_document(source_id: str, use_batch: bool = True,
+                 if_none_match: Optional[str] = None) -> Any:
+    """Get a document by source_id (NOT_MODIFIED if its root merkle is if_none_match)."""
+    return HybridGraphQuery().get_document(source_id, use_batch=use_batch, if_none_match=if_none_match)
+
+
+def get_document_json(source_id: str) -> Optional[str]:
+    """Get a document by source_id as a JSON string."""
+    return HybridGraphQuery().get_document_json(source_id)
 
 
 def search_content(key: str, value: str, limit: int = 100) -> List[str]:
     """Search for sources containing a key-value pair."""
-    with HybridGraphQuery() as query:
-        return query.search_content(key, value, limit)
+    return HybridGraphQuery().search_content(key, value, limit)
+
+
+def search_content_exact(source_id: str, key: str, value: str) -> bool:
+    """Check whether a source contains a key-value pair."""
+    return HybridGraphQuery().search_content_exact(source_id, key, value)
 
 
 def find_shared_structures(min_refs: int = 10) -> List[Dict]:
     """Find structures shared across multiple sources."""
-    with HybridGraphQuery() as query:
-        return query.find_shared_structures(min_refs)
+    return HybridGraphQuery().find_shared_structures(min_refs)
 
 
-def diff_sources(id1: str, id2: str) -> Dict:
+def diff_sources(id1: str, id2: str, cap: Optional[int] = None) -> Dict:
     """Compare two sources."""
-    with HybridGraphQuery() as query:
-        return query.diff_sources(id1, id2)
+    return HybridGraphQuery().diff_sources(id1, id2, cap)
 
 
 def get_source_stats(source_id: str) -> Dict:
     """Get stats for a source."""
-    with HybridGraphQuery() as query:
-        return query.get_source_stats(source_id)
+    return HybridGraphQuery().get_source_stats(source_id)
 
 
 def get_stats() -> Dict:
     """Get overall database stats."""
-    with HybridGraphQuery() as query:
-        return query.get_stats()
+    return HybridGraphQuery().get_stats()
 
 
 if __name__ == "__main__":
-    import json
-
     print("HybridGraph Query API")
     print("=" * 60)
 
@@ -18,16 +18,41 @@ import argparse
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 try:
-    from neo4j import GraphDatabase
+    from neo4j import READ_ACCESS
 except ImportError:
     print("Error: neo4j driver not installed. Run: pip install neo4j")
     sys.exit(1)
 
+try:
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph._tree_builder import build_tree
+    from runner.utils.neo4j import get_shared_driver
+except ImportError:
+    # Fallback for direct execution
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from runner.hybridgraph import MAX_TRAVERSAL_DEPTH
+    from runner.hybridgraph._tree_builder import build_tree
+    from runner.utils.neo4j import get_shared_driver
+
+
+# Records pulled per round trip; reader results are always read to the end
+READ_FETCH_SIZE = 10000
+
 
 def get_config():
+    """
+    Load connection settings from environment variables.
+
+    Pool and timeout settings for the shared driver (NEO4J_POOL_SIZE,
+    NEO4J_CONN_ACQ_TIMEOUT, NEO4J_MAX_CONN_LIFETIME, NEO4J_CONN_TIMEOUT,
+    NEO4J_MAX_TX_RETRY_TIME, NEO4J_KEEP_ALIVE) are read by
+    runner.utils.neo4j.get_pool_config.
+    """
     return {
         "uri": os.environ.get("NEO4J_URI", "bolt://localhost:7687"),
         "user": os.environ.get("NEO4J_USER", "neo4j"),
@@ -37,13 +62,32 @@ def get_config():
 
 
 def get_driver():
+    """
+    Return the process-wide driver for the configured server.
+
+    Shared through get_shared_driver, so repeated calls reuse one
+    connection pool; it is closed at exit and must not be closed here.
+    """
     config = get_config()
-    return GraphDatabase.driver(config["uri"], auth=(config["user"], config["password"]))
+    return get_shared_driver(config["uri"], config["user"], config["password"])
+
+
+def _session(driver, database: str):
+    """
+    Open a read session on a named database.
+
+    Every reader session goes through here: naming the database skips the
+    home-database lookup the driver otherwise makes per session, and the
+    large fetch size pulls the reader's fully consumed results in fewer
+    round trips.
+    """
+    return driver.session(database=database, default_access_mode=READ_ACCESS,
+                          fetch_size=READ_FETCH_SIZE)
 
 
 def list_sources(driver, database: str, limit: int = 100) -> List[Dict]:
     """List all sources in the hybridgraph."""
-    with driver.session(database=database) as session:
+    with _session(driver, database) as session:
         result = session.run("""
             MATCH (s:Source)
             OPTIONAL MATCH (s)-[:HAS_ROOT]->(r:Structure)
@@ -65,120 +109,56 @@ def get_document(driver, database: str, source_id: str) -> Optional[Dict[str, An
     """
     Reconstruct a JSON document from the hybridgraph.
 
-    Traverses from Source -> Structure -> Content nodes and rebuilds
-    the original JSON structure.
+    Fetches every Structure reachable from the source root, with its
+    CONTAINS and HAS_VALUE edges, in a single query and rebuilds the
+    original JSON structure in memory.
     """
-    with driver.session(database=database) as session:
-        # First, check if source exists and get root
+    with _session(driver, database) as session:
         result = session.run("""
             MATCH (source:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
-            RETURN root.merkle AS root_merkle, root.kind AS root_kind
-        """, source_id=source_id)
+            CALL apoc.path.subgraphNodes(root, {
+                relationshipFilter: 'CONTAINS>',
+                labelFilter: '+Structure',
+                bfs: true,
+                uniqueness: 'NODE_GLOBAL',
+                maxLevel: $max_depth
+            }) YIELD node AS s
+            WITH root, collect(s) AS structures
+
+            UNWIND structures AS struct
+            OPTIONAL MATCH (struct)-[hv:HAS_VALUE]->(c:Content)
+            WITH root, structures,
+                 [row IN collect([struct.merkle, hv.key, c.hash,
+                                  CASE c.kind
+                                      WHEN 'null' THEN null
+                                      WHEN 'boolean' THEN c.value_bool
+                                      WHEN 'number' THEN c.value_num
+                                      ELSE c.value_str
+                                  END])
+                  WHERE row[2] IS NOT NULL] AS contents
+
+            UNWIND structures AS struct
+            OPTIONAL MATCH (struct)-[rel:CONTAINS]->(child:Structure)
+            WITH root, structures, contents,
+                 [row IN collect([struct.merkle, child.merkle, rel.key])
+                  WHERE row[1] IS NOT NULL] AS contains_rels
+
+            RETURN root.merkle AS root_merkle,
+                   [s IN structures | s.merkle] AS struct_merkle,
+                   [s IN structures | s.kind] AS struct_kind,
+                   [r IN contents | r[0]] AS content_parent,
+                   [r IN contents | r[1]] AS content_key,
+                   [r IN contents | r[3]] AS content_value,
+                   [r IN contains_rels | r[0]] AS rel_parent,
+                   [r IN contains_rels | r[1]] AS rel_child,
+                   [r IN contains_rels | r[2]] AS rel_key
+        """, source_id=source_id, max_depth=MAX_TRAVERSAL_DEPTH)
 
         record = result.single()
         if not record:
             return None
 
-        root_merkle = record["root_merkle"]
-
-        # Recursively reconstruct the document
-        return _reconstruct_node(session, root_merkle)
-
-
-def _reconstruct_node(session, merkle: str) -> Any:
-    """Recursively reconstruct a node from its merkle hash."""
-    # Get the structure node
-    result = session.run("""
-        MATCH (s:Structure {merkle: $merkle})
-        RETURN s.kind AS kind, s.key AS key, s.child_keys AS child_keys
-    """, merkle=merkle)
-
-    record = result.single()
-    if not record:
-        return None
-
-    kind = record["kind"]
-
-    if kind == "object":
-        obj = {}
-
-        # Get all child structures
-        result = session.run("""
-            MATCH (s:Structure {merkle: $merkle})-[r:CONTAINS]->(child:Structure)
-            RETURN r.key AS key, child.merkle AS child_merkle
-        """, merkle=merkle)
-
-        for r in result:
-            obj[r["key"]] = _reconstruct_node(session, r["child_merkle"])
-
-        # Get all child content (leaf values)
-        result = session.run("""
-            MATCH (s:Structure {merkle: $merkle})-[r:HAS_VALUE]->(c:Content)
-            RETURN r.key AS key, c.kind AS kind,
-                   c.value_str AS value_str, c.value_num AS value_num,
-                   c.value_bool AS value_bool
-        """, merkle=merkle)
-
-        for r in result:
-            obj[r["key"]] = _extract_value(r["kind"], r["value_str"], r["value_num"], r["value_bool"])
-
-        return obj
-
-    elif kind == "array":
-        items = []
-
-        # Get child structures with index
-        result = session.run("""
-            MATCH (s:Structure {merkle: $merkle})-[r:CONTAINS]->(child:Structure)
-            RETURN r.key AS key, r.index AS index, child.merkle AS child_merkle
-            ORDER BY CASE WHEN r.index IS NOT NULL THEN r.index ELSE toInteger(r.key) END
-        """, merkle=merkle)
-
-        struct_children = [(r["key"], r["child_merkle"]) for r in result]
-
-        # Get child content with index
-        result = session.run("""
-            MATCH (s:Structure {merkle: $merkle})-[r:HAS_VALUE]->(c:Content)
-            RETURN r.key AS key, c.kind AS kind,
-                   c.value_str AS value_str, c.value_num AS value_num,
-                   c.value_bool AS value_bool
-            ORDER BY toInteger(r.key)
-        """, merkle=merkle)
-
-        content_children = [(r["key"], r["kind"], r["value_str"], r["value_num"], r["value_bool"]) for r in result]
-
-        # Combine and sort by index
-        all_children = []
-        for key, child_merkle in struct_children:
-            all_children.append((int(key), "struct", child_merkle))
-        for key, kind, vs, vn, vb in content_children:
-            all_children.append((int(key), "content", (kind, vs, vn, vb)))
-
-        all_children.sort(key=lambda x: x[0])
-
-        for _, child_type, data in all_children:
-            if child_type == "struct":
-                items.append(_reconstruct_node(session, data))
-            else:
-                kind, vs, vn, vb = data
-                items.append(_extract_value(kind, vs, vn, vb))
-
-        return items
-
-    return None
-
-
-def _extract_value(kind: str, value_str: Optional[str], value_num: Optional[float], value_bool: Optional[bool]) -> Any:
-    """Extract the actual value from Content node fields."""
-    if kind == "null":
-        return None
-    elif kind == "boolean":
-        return value_bool
-    elif kind == "number":
-        return value_num
-    elif kind == "string":
-        return value_str
-    return value_str
+        return build_tree(record)
 
 
 def search_by_value(driver, database: str, key: str, value: str, limit: int = 100) -> List[str]:
@@ -187,7 +167,7 @@ def search_by_value(driver, database: str, key: str, value: str, limit: int = 10
 
     Returns a list of source_ids that have the given key with the given value.
     """
-    with driver.session(database=database) as session:
+    with _session(driver, database) as session:
         # Depth limit (100) prevents runaway queries on deeply nested structures
         result = session.run("""
             MATCH (c:Content {key: $key, value_str: $value})
@@ -204,7 +184,7 @@ def search_by_key(driver, database: str, key: str, limit: int = 100) -> List[Dic
     """
     Find all unique values for a specific key across all sources.
     """
-    with driver.session(database=database) as session:
+    with _session(driver, database) as session:
         result = session.run("""
             MATCH (c:Content {key: $key})
             RETURN c.value_str AS value_str,
@@ -228,39 +208,55 @@ def diff_documents(driver, database: str, source_id1: str, source_id2: str) -> D
     - only_in_second: present in source_id2 but not source_id1
     - shared: present in both
     """
-    with driver.session(database=database) as session:
-        # Get all structure merkles for each document
-        # Depth limit (100) prevents runaway queries on deeply nested structures
+    with _session(driver, database) as session:
+        # Each side is collected in its own subquery (no cross product of
+        # the two traversals) and the set arithmetic is done server-side
         result = session.run("""
-            MATCH (s1:Source {source_id: $id1})-[:HAS_ROOT]->(r1:Structure)
-            OPTIONAL MATCH (r1)-[:CONTAINS*0..100]->(struct1:Structure)
-            WITH collect(DISTINCT COALESCE(struct1.merkle, r1.merkle)) AS merkles1
-
-            MATCH (s2:Source {source_id: $id2})-[:HAS_ROOT]->(r2:Structure)
-            OPTIONAL MATCH (r2)-[:CONTAINS*0..100]->(struct2:Structure)
-            WITH merkles1, collect(DISTINCT COALESCE(struct2.merkle, r2.merkle)) AS merkles2
-
-            RETURN merkles1, merkles2
-        """, id1=source_id1, id2=source_id2)
+            CALL {
+                MATCH (s1:Source {source_id: $id1})
+                MATCH (s1)-[:HAS_ROOT]->(r1:Structure)
+                CALL apoc.path.subgraphNodes(r1, {
+                    relationshipFilter: 'CONTAINS>',
+                    labelFilter: '+Structure',
+                    uniqueness: 'NODE_GLOBAL',
+                    maxLevel: $max_depth
+                }) YIELD node
+                RETURN collect(node.merkle) AS merkles1
+            }
+            CALL {
+                MATCH (s2:Source {source_id: $id2})
+                MATCH (s2)-[:HAS_ROOT]->(r2:Structure)
+                CALL apoc.path.subgraphNodes(r2, {
+                    relationshipFilter: 'CONTAINS>',
+                    labelFilter: '+Structure',
+                    uniqueness: 'NODE_GLOBAL',
+                    maxLevel: $max_depth
+                }) YIELD node
+                RETURN collect(node.merkle) AS merkles2
+            }
+            WITH merkles1, merkles2
+            WHERE size(merkles1) > 0 AND size(merkles2) > 0
+            RETURN apoc.coll.subtract(merkles1, merkles2) AS only_in_first,
+                   apoc.coll.subtract(merkles2, merkles1) AS only_in_second,
+                   size(apoc.coll.intersection(merkles1, merkles2)) AS shared_count
+        """, id1=source_id1, id2=source_id2, max_depth=MAX_TRAVERSAL_DEPTH)
 
         record = result.single()
         if not record:
             return {"error": "One or both sources not found"}
 
-        merkles1 = set(record["merkles1"])
-        merkles2 = set(record["merkles2"])
-
-        only_in_first = merkles1 - merkles2
-        only_in_second = merkles2 - merkles1
-        shared = merkles1 & merkles2
+        only_in_first = record["only_in_first"]
+        only_in_second = record["only_in_second"]
+        shared_count = record["shared_count"]
+        total = len(only_in_first) + len(only_in_second) + shared_count
 
         return {
             "source_id1": source_id1,
             "source_id2": source_id2,
-            "only_in_first": list(only_in_first),
-            "only_in_second": list(only_in_second),
-            "shared_count": len(shared),
-            "similarity": len(shared) / len(merkles1 | merkles2) if merkles1 | merkles2 else 1.0,
+            "only_in_first": only_in_first,
+            "only_in_second": only_in_second,
+            "shared_count": shared_count,
+            "similarity": shared_count / total if total else 1.0,
         }
 
 
@@ -271,13 +267,16 @@ def verify_document(driver, source_db: str, target_db: str, source_id: str) -> D
     Reconstructs the document from hybridgraph and compares it to the
     original structure in jsongraph. Reports any discrepancies.
     """
-    # Reconstruct from hybridgraph
-    hybrid_doc = get_document(driver, target_db, source_id)
+    # The two reconstructions are independent and each opens its own
+    # session, so they run in parallel on separate connections
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        hybrid_future = pool.submit(get_document, driver, target_db, source_id)
+        jsongraph_future = pool.submit(_reconstruct_from_jsongraph, driver, source_db, source_id)
+        hybrid_doc = hybrid_future.result()
+        jsongraph_doc = jsongraph_future.result()
+
     if hybrid_doc is None:
         return {"valid": False, "error": f"Source '{source_id}' not found in hybridgraph"}
-
-    # Reconstruct from jsongraph
-    jsongraph_doc = _reconstruct_from_jsongraph(driver, source_db, source_id)
     if jsongraph_doc is None:
         return {"valid": False, "error": f"Document '{source_id}' not found in jsongraph"}
 
@@ -294,119 +293,153 @@ def verify_document(driver, source_db: str, target_db: str, source_id: str) -> D
 
 
 def _reconstruct_from_jsongraph(driver, source_db: str, doc_id: str) -> Optional[Any]:
-    """Reconstruct a document from jsongraph (flat Data nodes)."""
-    with driver.session(database=source_db) as session:
+    """
+    Reconstruct a document from jsongraph (flat Data nodes).
+
+    Walks the document level by level: each round trip fetches the
+    children of the whole frontier, so the query count is the document
+    depth rather than its node count.
+    """
+    with _session(driver, source_db) as session:
         # Get root node
         result = session.run("""
             MATCH (d:Data {doc_id: $doc_id, path: '/root'})
-            RETURN d.kind AS kind
+            RETURN d.kind AS kind,
+                   CASE d.kind
+                       WHEN 'boolean' THEN d.value_bool
+                       WHEN 'number' THEN d.value_num
+                       WHEN 'string' THEN d.value_str
+                   END AS value
         """, doc_id=doc_id)
 
         record = result.single()
         if not record:
             return None
 
-        return _reconstruct_jsongraph_node(session, doc_id, "/root")
-
-
-def _reconstruct_jsongraph_node(session, doc_id: str, path: str) -> Any:
-    """Recursively reconstruct a node from jsongraph."""
-    result = session.run("""
-        MATCH (d:Data {doc_id: $doc_id, path: $path})
-        RETURN d.kind AS kind, d.key AS key,
-               d.value_str AS value_str, d.value_num AS value_num,
-               d.value_bool AS value_bool
-    """, doc_id=doc_id, path=path)
-
-    record = result.single()
-    if not record:
-        return None
-
-    kind = record["kind"]
-
+        root_kind = record["kind"]
+        if root_kind != "object" and root_kind != "array":
+            return record["value"]
+
+        # parent path -> [(key, kind, path, value)]
+        children: Dict[str, List[Tuple[str, str, str, Any]]] = {}
+        frontier = ["/root"]
+        while frontier:
+            result = session.run("""
+                UNWIND $paths AS parent_path
+                MATCH (:Data {doc_id: $doc_id, path: parent_path})-[:CONTAINS]->(child:Data)
+                RETURN parent_path, child.key AS key, child.kind AS kind, child.path AS path,
+                       CASE child.kind
+                           WHEN 'boolean' THEN child.value_bool
+                           WHEN 'number' THEN child.value_num
+                           WHEN 'string' THEN child.value_str
+                       END AS value
+            """, doc_id=doc_id, paths=frontier)
+
+            frontier = []
+            for r in result:
+                kind = r["kind"]
+                children.setdefault(r["parent_path"], []).append((r["key"], kind, r["path"], r["value"]))
+                if kind == "object" or kind == "array":
+                    frontier.append(r["path"])
+
+    return _build_jsongraph_node(children, "/root", root_kind)
+
+
+def _build_jsongraph_node(children: Dict[str, List[Tuple[str, str, str, Any]]],
+                          path: str, kind: str) -> Any:
+    """Assemble a container from the rows fetched by _reconstruct_from_jsongraph."""
+    rows = children.get(path, [])
+    if kind == "array":
+        rows = sorted(rows, key=lambda row: int(row[0]))
+    values = [
+        _build_jsongraph_node(children, child_path, child_kind)
+        if child_kind == "object" or child_kind == "array" else value
+        for _, child_kind, child_path, value in rows
+    ]
     if kind == "object":
-        obj = {}
-        result = session.run("""
-            MATCH (parent:Data {doc_id: $doc_id, path: $path})-[:CONTAINS]->(child:Data)
-            RETURN child.path AS child_path, child.key AS key
-        """, doc_id=doc_id, path=path)
-
-        for r in result:
-            obj[r["key"]] = _reconstruct_jsongraph_node(session, doc_id, r["child_path"])
-        return obj
+        return {row[0]: value for row, value in zip(rows, values)}
+    return values
 
-    elif kind == "array":
-        items = []
-        result = session.run("""
-            MATCH (parent:Data {doc_id: $doc_id, path: $path})-[:CONTAINS]->(child:Data)
-            RETURN child.path AS child_path, child.key AS key
-            ORDER BY toInteger(child.key)
-        """, doc_id=doc_id, path=path)
 
-        for r in result:
-            items.append(_reconstruct_jsongraph_node(session, doc_id, r["child_path"]))
-        return items
+# JSON value kinds compared by _deep_compare
+_KIND_NULL, _KIND_BOOL, _KIND_NUMBER, _KIND_STRING, _KIND_ARRAY, _KIND_OBJECT, _KIND_OTHER = range(7)
 
-    elif kind == "null":
-        return None
-    elif kind == "boolean":
-        return record["value_bool"]
-    elif kind == "number":
-        return record["value_num"]
-    elif kind == "string":
-        return record["value_str"]
 
-    return None
+def _json_kind(value: Any) -> int:
+    """Classify a value by JSON type (bool before number: bool is an int)."""
+    if value is None:
+        return _KIND_NULL
+    if isinstance(value, bool):
+        return _KIND_BOOL
+    if isinstance(value, (int, float)):
+        return _KIND_NUMBER
+    if isinstance(value, str):
+        return _KIND_STRING
+    if isinstance(value, list):
+        return _KIND_ARRAY
+    if isinstance(value, dict):
+        return _KIND_OBJECT
+    return _KIND_OTHER
 
 
 def _deep_compare(obj1: Any, obj2: Any, path: str = "") -> List[Dict]:
-    """Deep compare two objects and return list of differences."""
-    differences = []
-
-    if type(obj1) != type(obj2):
-        differences.append({
-            "path": path,
-            "type": "type_mismatch",
-            "expected": type(obj1).__name__,
-            "actual": type(obj2).__name__,
-        })
-        return differences
-
-    if isinstance(obj1, dict):
-        keys1 = set(obj1.keys())
-        keys2 = set(obj2.keys())
-
-        for key in keys1 - keys2:
-            differences.append({
-                "path": f"{path}/{key}",
-                "type": "missing_in_hybrid",
-                "value": obj1[key],
-            })
+    """
+    Deep compare two objects and return list of differences.
 
-        for key in keys2 - keys1:
-            differences.append({
-                "path": f"{path}/{key}",
-                "type": "extra_in_hybrid",
-                "value": obj2[key],
-            })
+    Walks an explicit stack of (path, expected, actual) entries rather than
+    recursing, so deeply nested documents cannot hit the recursion limit.
+    Differences come out in depth-first order. Values are matched by JSON
+    type, so an int and a float holding the same number are equal.
+    """
+    differences = []
+    stack = [(path, obj1, obj2)]
 
-        for key in keys1 & keys2:
-            differences.extend(_deep_compare(obj1[key], obj2[key], f"{path}/{key}"))
+    while stack:
+        path, obj1, obj2 = stack.pop()
+        kind = _json_kind(obj1)
 
-    elif isinstance(obj1, list):
-        if len(obj1) != len(obj2):
+        if kind != _json_kind(obj2):
             differences.append({
                 "path": path,
-                "type": "length_mismatch",
-                "expected": len(obj1),
-                "actual": len(obj2),
+                "type": "type_mismatch",
+                "expected": type(obj1).__name__,
+                "actual": type(obj2).__name__,
             })
-        else:
-            for i, (item1, item2) in enumerate(zip(obj1, obj2)):
-                differences.extend(_deep_compare(item1, item2, f"{path}/{i}"))
 
-    else:
-        if obj1 != obj2:
+        elif kind == _KIND_OBJECT:
+            keys1 = obj1.keys()
+            keys2 = obj2.keys()
+
+            for key in keys1 - keys2:
+                differences.append({
+                    "path": f"{path}/{key}",
+                    "type": "missing_in_hybrid",
+                    "value": obj1[key],
+                })
+
+            for key in keys2 - keys1:
+                differences.append({
+                    "path": f"{path}/{key}",
+                    "type": "extra_in_hybrid",
+                    "value": obj2[key],
+                })
+
+            stack.extend((f"{path}/{key}", obj1[key], obj2[key]) for key in keys1 & keys2)
+
+        elif kind == _KIND_ARRAY:
+            if len(obj1) != len(obj2):
+                differences.append({
+                    "path": path,
+                    "type": "length_mismatch",
+                    "expected": len(obj1),
+                    "actual": len(obj2),
+                })
+            else:
+                # Reversed so items are popped, and reported, in index order
+                for i in range(len(obj1) - 1, -1, -1):
+                    stack.append((f"{path}/{i}", obj1[i], obj2[i]))
+
+        elif obj1 != obj2:
             differences.append({
                 "path": path,
                 "type": "value_mismatch",
@@ -419,16 +452,22 @@ def _deep_compare(obj1: Any, obj2: Any, path: str = "") -> List[Dict]:
 
 def _count_keys(obj: Any) -> int:
     """Count total keys/elements in a nested structure."""
-    if isinstance(obj, dict):
-        return len(obj) + sum(_count_keys(v) for v in obj.values())
-    elif isinstance(obj, list):
-        return len(obj) + sum(_count_keys(v) for v in obj)
-    return 0
+    count = 0
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            count += len(node)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            count += len(node)
+            stack.extend(node)
+    return count
 
 
 def get_source_stats(driver, database: str, source_id: str) -> Dict:
     """Get statistics for a specific source document."""
-    with driver.session(database=database) as session:
+    with _session(driver, database) as session:
         # Depth limit (100) prevents runaway queries on deeply nested structures
         result = session.run("""
             MATCH (src:Source {source_id: $source_id})-[:HAS_ROOT]->(root:Structure)
@@ -497,77 +536,73 @@ def main():
     config = get_config()
     driver = get_driver()
 
-    try:
-        if args.command == "list":
-            sources = list_sources(driver, config["database"], args.limit)
-            print(f"Found {len(sources)} sources:\n")
-            for src in sources:
-                print(f"  {src['source_id']}")
-                print(f"    Type: {src['source_type']}, Nodes: {src['node_count']}")
-                if src.get('last_synced'):
-                    print(f"    Last synced: {src['last_synced']}")
-                print()
-
-        elif args.command == "get":
-            doc = get_document(driver, config["database"], args.source_id)
-            if doc is None:
-                print(f"Error: Source '{args.source_id}' not found")
-                sys.exit(1)
-            if args.pretty:
-                print(json.dumps(doc, indent=2))
-            else:
-                print(json.dumps(doc))
-
-        elif args.command == "search":
-            source_ids = search_by_value(driver, config["database"], args.key, args.value, args.limit)
-            print(f"Found {len(source_ids)} sources with {args.key}={args.value}:")
-            for sid in source_ids:
-                print(f"  {sid}")
-
-        elif args.command == "diff":
-            diff_result = diff_documents(driver, config["database"], args.source_id1, args.source_id2)
-            print(f"Comparing {args.source_id1} vs {args.source_id2}:")
-            print(f"  Similarity: {diff_result['similarity']:.1%}")
-            print(f"  Shared structures: {diff_result['shared_count']}")
-            print(f"  Only in {args.source_id1}: {len(diff_result['only_in_first'])}")
-            print(f"  Only in {args.source_id2}: {len(diff_result['only_in_second'])}")
-
-        elif args.command == "stats":
-            stats = get_source_stats(driver, config["database"], args.source_id)
-            if "error" in stats:
-                print(stats["error"])
-                sys.exit(1)
-            print(f"Statistics for {args.source_id}:")
-            print(f"  Type: {stats['source_type']}")
-            print(f"  Original nodes: {stats['original_node_count']}")
-            print(f"  Structures: {stats['structure_count']}")
-            print(f"  Content nodes: {stats['content_count']}")
-            if stats.get('ingested_at'):
-                print(f"  Ingested: {stats['ingested_at']}")
-            if stats.get('last_synced'):
-                print(f"  Last synced: {stats['last_synced']}")
-
-        elif args.command == "verify":
-            result = verify_document(driver, args.source_db, config["database"], args.source_id)
-            if result["valid"]:
-                print(f"Document '{args.source_id}' is valid")
-                print(f"  Keys in jsongraph: {result['jsongraph_keys']}")
-                print(f"  Keys in hybridgraph: {result['hybrid_keys']}")
+    if args.command == "list":
+        sources = list_sources(driver, config["database"], args.limit)
+        print(f"Found {len(sources)} sources:\n")
+        for src in sources:
+            print(f"  {src['source_id']}")
+            print(f"    Type: {src['source_type']}, Nodes: {src['node_count']}")
+            if src.get('last_synced'):
+                print(f"    Last synced: {src['last_synced']}")
+            print()
+
+    elif args.command == "get":
+        doc = get_document(driver, config["database"], args.source_id)
+        if doc is None:
+            print(f"Error: Source '{args.source_id}' not found")
+            sys.exit(1)
+        if args.pretty:
+            print(json.dumps(doc, indent=2))
+        else:
+            print(json.dumps(doc))
+
+    elif args.command == "search":
+        source_ids = search_by_value(driver, config["database"], args.key, args.value, args.limit)
+        print(f"Found {len(source_ids)} sources with {args.key}={args.value}:")
+        for sid in source_ids:
+            print(f"  {sid}")
+
+    elif args.command == "diff":
+        diff_result = diff_documents(driver, config["database"], args.source_id1, args.source_id2)
+        print(f"Comparing {args.source_id1} vs {args.source_id2}:")
+        print(f"  Similarity: {diff_result['similarity']:.1%}")
+        print(f"  Shared structures: {diff_result['shared_count']}")
+        print(f"  Only in {args.source_id1}: {len(diff_result['only_in_first'])}")
+        print(f"  Only in {args.source_id2}: {len(diff_result['only_in_second'])}")
+
+    elif args.command == "stats":
+        stats = get_source_stats(driver, config["database"], args.source_id)
+        if "error" in stats:
+            print(stats["error"])
+            sys.exit(1)
+        print(f"Statistics for {args.source_id}:")
+        print(f"  Type: {stats['source_type']}")
+        print(f"  Original nodes: {stats['original_node_count']}")
+        print(f"  Structures: {stats['structure_count']}")
+        print(f"  Content nodes: {stats['content_count']}")
+        if stats.get('ingested_at'):
+            print(f"  Ingested: {stats['ingested_at']}")
+        if stats.get('last_synced'):
+            print(f"  Last synced: {stats['last_synced']}")
+
+    elif args.command == "verify":
+        result = verify_document(driver, args.source_db, config["database"], args.source_id)
+        if result["valid"]:
+            print(f"Document '{args.source_id}' is valid")
+            print(f"  Keys in jsongraph: {result['jsongraph_keys']}")
+            print(f"  Keys in hybridgraph: {result['hybrid_keys']}")
+        else:
+            print(f"Document '{args.source_id}' has issues:")
+            if "error" in result:
+                print(f"  Error: {result['error']}")
             else:
-                print(f"Document '{args.source_id}' has issues:")
-                if "error" in result:
-                    print(f"  Error: {result['error']}")
-                else:
-                    print(f"  Found {len(result['differences'])} differences:")
-                    for diff in result["differences"][:10]:
-                        print(f"    {diff['path']}: {diff['type']}")
-                        if diff['type'] == 'value_mismatch':
-                            print(f"      expected: {diff['expected']}")
-                            print(f"      actual: {diff['actual']}")
-                sys.exit(1 if not result["valid"] else 0)
-
-    finally:
-        driver.close()
+                print(f"  Found {len(result['differences'])} differences:")
+                for diff in result["differences"][:10]:
+                    print(f"    {diff['path']}: {diff['type']}")
+                    if diff['type'] == 'value_mismatch':
+                        print(f"      expected: {diff['expected']}")
+                        print(f"      actual: {diff['actual']}")
+            sys.exit(1 if not result["valid"] else 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""
+Schema (constraints and indexes) relied on by the hybridgraph queries.
+
+Every hybridgraph query looks nodes up by Source.source_id, Structure.merkle
+or Content.hash, search_by_key and search_content seek Content by key and
+(key, value_str), and the shared-node and GC paths filter on ref_count or the
+:Garbage label. Without these the lookups degrade to label scans.
+
+Schema creation is opt-in for the maintenance tasks: set
+HYBRIDGRAPH_ENSURE_SCHEMA=1 to have them create anything missing on first use.
+Query API users call HybridGraphQuery.ensure_indexes() at startup instead.
+Constraint names match the ones created by migrate.setup_constraints.
+
+explain_full_scans() is a development aid: it EXPLAINs a query and reports
+any plan operator that reads every node in the store.
+"""
+
+import os
+from typing import Any, Dict, List, Set, Tuple
+
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT source_id_unique IF NOT EXISTS FOR (s:Source) REQUIRE s.source_id IS UNIQUE",
+    "CREATE CONSTRAINT structure_merkle_unique IF NOT EXISTS FOR (s:Structure) REQUIRE s.merkle IS UNIQUE",
+    "CREATE CONSTRAINT content_hash_unique IF NOT EXISTS FOR (c:Content) REQUIRE c.hash IS UNIQUE",
+    "CREATE INDEX content_key IF NOT EXISTS FOR (c:Content) ON (c.key)",
+    "CREATE INDEX content_key_value IF NOT EXISTS FOR (c:Content) ON (c.key, c.value_str)",
+    "CREATE INDEX structure_ref_count IF NOT EXISTS FOR (s:Structure) ON (s.ref_count)",
+    "CREATE INDEX content_ref_count IF NOT EXISTS FOR (c:Content) ON (c.ref_count)",
+    "CREATE INDEX garbage_merkle IF NOT EXISTS FOR (g:Garbage) ON (g.merkle)",
+]
+
+# Plan operators that read every node regardless of label
+FULL_SCAN_OPERATORS = frozenset({"AllNodesScan"})
+
+# (driver id, database) pairs already ensured in this process
+_ENSURED: Set[Tuple[int, str]] = set()
+
+
+def schema_enabled() -> bool:
+    """Whether HYBRIDGRAPH_ENSURE_SCHEMA asks tasks to create missing schema."""
+    return os.environ.get("HYBRIDGRAPH_ENSURE_SCHEMA", "").lower() in ("1", "true", "yes")
+
+
+def ensure_schema(driver, database: str) -> bool:
+    """
+    Create the hybridgraph constraints and indexes if they do not exist.
+
+    Runs at most once per (driver, database) per process.
+
+    Returns:
+        True if the statements were issued, False if already ensured
+    """
+    key = (id(driver), database)
+    if key in _ENSURED:
+        return False
+
+    with driver.session(database=database) as session:
+        for statement in SCHEMA_STATEMENTS:
+            session.run(statement).consume()
+
+    _ENSURED.add(key)
+    return True
+
+
+def plan_operators(plan: Dict[str, Any]) -> List[str]:
+    """
+    List the operator types in an EXPLAIN/PROFILE plan, depth first.
+
+    Neo4j 5 suffixes operator types with the runtime ("AllNodesScan@neo4j");
+    the suffix is stripped.
+    """
+    operators = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        operators.append(node["operatorType"].split("@", 1)[0])
+        stack.extend(reversed(node.get("children", [])))
+    return operators
+
+
+def explain_full_scans(session, query: str, parameters: Dict[str, Any] = None) -> List[str]:
+    """
+    EXPLAIN a query without running it and return its full-scan operators.
+
+    Returns:
+        Operator types from FULL_SCAN_OPERATORS found in the plan (empty if
+        the query only touches labelled or indexed nodes)
+    """
+    summary = session.run(f"EXPLAIN {query}", parameters or {}).consume()
+    return [op for op in plan_operators(summary.plan) if op in FULL_SCAN_OPERATORS]
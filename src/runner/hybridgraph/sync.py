@@ -202,6 +202,7 @@ def decrement_ref_counts(session, structures: list, contents: list):
                 WHEN s.ref_count <= 1 THEN 0
                 ELSE s.ref_count - 1
             END
+            FOREACH (_ IN CASE WHEN s.ref_count = 0 THEN [1] ELSE [] END | SET s:Garbage)
         """, merkles=structures)
 
     if contents:
@@ -213,6 +214,7 @@ def decrement_ref_counts(session, structures: list, contents: list):
                 WHEN c.ref_count <= 1 THEN 0
                 ELSE c.ref_count - 1
             END
+            FOREACH (_ IN CASE WHEN c.ref_count = 0 THEN [1] ELSE [] END | SET c:Garbage)
         """, hashes=contents)
 
 
@@ -293,6 +295,7 @@ def sync_document(driver, source_db: str, target_db: str, doc_id: str) -> dict:
                               c.value_str = n.value_str, c.value_num = n.value_num,
                               c.value_bool = n.value_bool, c.ref_count = 1
                 ON MATCH SET c.ref_count = c.ref_count + 1
+                REMOVE c:Garbage
                 RETURN count(*) AS total,
                        sum(CASE WHEN c.ref_count = 1 THEN 1 ELSE 0 END) AS created
             """, nodes=content_nodes_to_increment)
@@ -345,6 +348,7 @@ def sync_document(driver, source_db: str, target_db: str, doc_id: str) -> dict:
                               s.child_keys = n.child_keys, s.child_count = n.child_count,
                               s.ref_count = 1
                 ON MATCH SET s.ref_count = s.ref_count + 1
+                REMOVE s:Garbage
                 RETURN count(*) AS total,
                        sum(CASE WHEN s.ref_count = 1 THEN 1 ELSE 0 END) AS created
             """, nodes=structure_nodes_to_increment)
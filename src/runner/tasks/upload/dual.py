@@ -298,6 +298,7 @@ def upload_to_hybridgraph(driver, database, doc_id, nodes):
                               c.value_str = $value_str, c.value_num = $value_num,
                               c.value_bool = $value_bool, c.ref_count = 1
                 ON MATCH SET c.ref_count = c.ref_count + 1
+                REMOVE c:Garbage
                 RETURN c.ref_count = 1 AS is_new
             """, {
                 "hash": node['hash'],
@@ -318,6 +319,7 @@ def upload_to_hybridgraph(driver, database, doc_id, nodes):
                 ON CREATE SET s.kind = $kind, s.key = $key,
                               s.child_keys = $child_keys, s.ref_count = 1
                 ON MATCH SET s.ref_count = s.ref_count + 1
+                REMOVE s:Garbage
                 RETURN s.ref_count = 1 AS is_new
             """, {
                 "merkle": node['hash'],
@@ -4,15 +4,33 @@ Shared utilities for the Runner package.
 This module provides common functionality used across the package:
 - hashing: Content-addressable and Merkle hash computation
 - neo4j: Database connection and session management
+- fastjson: JSON encode/decode, using orjson when installed
 """
 
-from runner.utils.hashing import compute_content_hash, compute_merkle_hash
-from runner.utils.neo4j import get_config, get_driver, get_session
+from runner.utils.hashing import (
+    compute_content_hash,
+    compute_content_hashes,
+    compute_merkle_hash,
+    compute_merkle_hashes,
+)
+from runner.utils.neo4j import (
+    close_shared_drivers,
+    get_config,
+    get_driver,
+    get_pool_config,
+    get_session,
+    get_shared_driver,
+)
 
 __all__ = [
     "compute_content_hash",
+    "compute_content_hashes",
     "compute_merkle_hash",
+    "compute_merkle_hashes",
     "get_config",
     "get_driver",
+    "get_pool_config",
+    "get_shared_driver",
+    "close_shared_drivers",
     "get_session",
 ]
@@ -0,0 +1,63 @@
+"""
+JSON encode/decode with optional orjson acceleration.
+
+Uses orjson when it is installed (pip install runner[fast]) and falls back
+to the standard library otherwise. Both paths return/accept str.
+"""
+
+import json
+from typing import Any, TextIO
+
+__all__ = ["HAS_ORJSON", "dump", "dumps", "loads"]
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+if HAS_ORJSON:
+    def loads(data) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a JSON string."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def dump(obj: Any, fp: TextIO, indent: bool = False) -> None:
+        """
+        Write obj as JSON to the text stream fp, followed by a newline.
+
+        Values JSON cannot represent are written as str(). Encoded bytes go
+        straight to the stream's binary buffer when it has one.
+        """
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(obj, default=str, option=option)
+        buffer = getattr(fp, "buffer", None)
+        if buffer is not None:
+            fp.flush()
+            buffer.write(data)
+        else:
+            fp.write(data.decode())
+else:
+    def loads(data) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a JSON string."""
+        return json.dumps(obj)
+
+    def dump(obj: Any, fp: TextIO, indent: bool = False) -> None:
+        """
+        Write obj as JSON to the text stream fp, followed by a newline.
+
+        Values JSON cannot represent are written as str(). The encoder
+        writes chunks as it goes rather than building one string.
+        """
+        json.dump(obj, fp, indent=2 if indent else None, default=str)
+        fp.write("\n")
@@ -6,9 +6,10 @@ hashes for leaf values. Uses SHA-256 truncated to 128 bits (32 hex chars).
 """
 
 import hashlib
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 
-__all__ = ["compute_content_hash", "compute_merkle_hash", "encode_value_for_hash"]
+__all__ = ["compute_content_hash", "compute_content_hashes", "compute_merkle_hash",
+           "compute_merkle_hashes", "encode_value_for_hash"]
 
 
 def compute_content_hash(kind: str, key: str, value: str) -> str:
@@ -54,12 +55,35 @@ def encode_value_for_hash(kind: str, value_str, value_num, value_bool) -> str:
     elif kind == "number":
         return str(value_num) if value_num is not None else "0"
     elif kind == "boolean":
-        return str(value_bool).lower() if value_bool is not None else "false"
+        # Interned constants; str(value_bool).lower() allocates twice per leaf
+        if value_bool is True:
+            return "true"
+        if value_bool is False or value_bool is None:
+            return "false"
+        return str(value_bool).lower()
     elif kind == "null":
         return "null"
     return str(value_str or "")
 
 
+def compute_content_hashes(items: Iterable[Tuple[str, Optional[str], str]]) -> List[str]:
+    """
+    Batch form of compute_content_hash.
+
+    Args:
+        items: (kind, key, value) per leaf, with value already encoded by
+            encode_value_for_hash
+
+    Returns:
+        Content hashes in item order, identical to compute_content_hash
+    """
+    sha256 = hashlib.sha256
+    return [
+        "c:" + sha256(f"{kind}|{key}|{kind}:{value}".encode()).hexdigest()[:32]
+        for kind, key, value in items
+    ]
+
+
 def compute_merkle_hash(kind: str, key: str, child_hashes: List[str]) -> str:
     """
     Compute Merkle hash for structure nodes (objects/arrays).
@@ -75,3 +99,22 @@ def compute_merkle_hash(kind: str, key: str, child_hashes: List[str]) -> str:
     sorted_children = "|".join(sorted(child_hashes))
     content = f"{kind}|{key}|{sorted_children}"
     return "m:" + hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+def compute_merkle_hashes(items: Iterable[Tuple[str, Optional[str], List[str]]]) -> List[str]:
+    """
+    Batch form of compute_merkle_hash.
+
+    Args:
+        items: (kind, key, child_hashes) per structure node; children must
+            already be hashed, so callers batch one tree depth at a time
+
+    Returns:
+        Merkle hashes in item order, identical to compute_merkle_hash
+    """
+    sha256 = hashlib.sha256
+    join = "|".join
+    return [
+        "m:" + sha256(f"{kind}|{key}|{join(sorted(child_hashes))}".encode()).hexdigest()[:32]
+        for kind, key, child_hashes in items
+    ]
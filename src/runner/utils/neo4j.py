@@ -5,10 +5,24 @@ Provides standardized configuration loading and driver management
 for connecting to Neo4j databases.
 """
 
+import atexit
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
-__all__ = ["get_config", "get_driver", "get_session"]
+__all__ = ["get_config", "get_pool_config", "get_driver", "get_shared_driver",
+           "close_shared_drivers", "get_session"]
+
+# Connection pool defaults for process-wide shared drivers (overridable
+# through the NEO4J_* variables read by get_pool_config)
+SHARED_POOL_SIZE = 200
+SHARED_ACQUISITION_TIMEOUT = 60  # seconds to wait for a pooled connection
+SHARED_MAX_LIFETIME = 3600  # seconds before a pooled connection is retired
+SHARED_CONNECTION_TIMEOUT = 30  # seconds to establish a new connection
+SHARED_MAX_RETRY_TIME = 30  # seconds transaction functions keep retrying
+SHARED_FETCH_SIZE = 1000  # records pulled per round trip
+
+# (uri, user, password) -> driver, reused for the lifetime of the process
+_SHARED_DRIVERS: Dict[Tuple[str, str, str], Any] = {}
 
 
 def get_config() -> Dict[str, str]:
@@ -27,6 +41,27 @@ def get_config() -> Dict[str, str]:
     }
 
 
+def get_pool_config() -> Dict[str, Any]:
+    """
+    Load connection pool settings for shared drivers from environment variables.
+
+    Returns:
+        Keyword arguments for GraphDatabase.driver: max_connection_pool_size,
+        connection_acquisition_timeout, max_connection_lifetime,
+        connection_timeout, max_transaction_retry_time, keep_alive and
+        fetch_size
+    """
+    return {
+        "max_connection_pool_size": int(os.environ.get("NEO4J_POOL_SIZE", SHARED_POOL_SIZE)),
+        "connection_acquisition_timeout": float(os.environ.get("NEO4J_CONN_ACQ_TIMEOUT", SHARED_ACQUISITION_TIMEOUT)),
+        "max_connection_lifetime": float(os.environ.get("NEO4J_MAX_CONN_LIFETIME", SHARED_MAX_LIFETIME)),
+        "connection_timeout": float(os.environ.get("NEO4J_CONN_TIMEOUT", SHARED_CONNECTION_TIMEOUT)),
+        "max_transaction_retry_time": float(os.environ.get("NEO4J_MAX_TX_RETRY_TIME", SHARED_MAX_RETRY_TIME)),
+        "keep_alive": os.environ.get("NEO4J_KEEP_ALIVE", "true").lower() in ("1", "true", "yes"),
+        "fetch_size": SHARED_FETCH_SIZE,
+    }
+
+
 def get_driver(uri: Optional[str] = None, user: Optional[str] = None,
                password: Optional[str] = None):
     """
@@ -57,6 +92,52 @@ def get_driver(uri: Optional[str] = None, user: Optional[str] = None,
     )
 
 
+def get_shared_driver(uri: Optional[str] = None, user: Optional[str] = None,
+                      password: Optional[str] = None):
+    """
+    Return a process-wide Neo4j driver, creating it on first use.
+
+    Drivers are thread-safe and pool their connections, so tasks that run
+    repeatedly in one process share a driver per (uri, user, password)
+    instead of paying the connection handshake on every call. Pool settings
+    come from get_pool_config. Callers must not close the returned driver;
+    shared drivers are closed at exit.
+
+    Args:
+        uri: Neo4j bolt URI (uses NEO4J_URI env var if not provided)
+        user: Username (uses NEO4J_USER env var if not provided)
+        password: Password (uses NEO4J_PASSWORD env var if not provided)
+
+    Returns:
+        Shared Neo4j driver instance
+
+    Raises:
+        ImportError: If neo4j package is not installed
+    """
+    try:
+        from neo4j import GraphDatabase
+    except ImportError:
+        raise ImportError(
+            "neo4j package not installed. Run: pip install neo4j"
+        )
+
+    config = get_config()
+    key = (uri or config["uri"], user or config["user"], password or config["password"])
+    driver = _SHARED_DRIVERS.get(key)
+    if driver is None:
+        driver = GraphDatabase.driver(key[0], auth=(key[1], key[2]), **get_pool_config())
+        _SHARED_DRIVERS[key] = driver
+    return driver
+
+
+@atexit.register
+def close_shared_drivers() -> None:
+    """Close every driver handed out by get_shared_driver."""
+    while _SHARED_DRIVERS:
+        _, driver = _SHARED_DRIVERS.popitem()
+        driver.close()
+
+
 def get_session(driver, database: Optional[str] = None):
     """
     Create a Neo4j session from a driver.
@@ -0,0 +1,197 @@
+"""Tests for hybridgraph source deletion."""
+
+import logging
+import pytest
+import sys
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+pytest.importorskip("neo4j")
+
+from runner.hybridgraph import MAX_TRAVERSAL_DEPTH, delete
+from runner.hybridgraph.delete import (
+    _count_source_nodes_tx,
+    _decrement_ref_counts_tx,
+    _delete_source_full_tx,
+    _depth_truncated,
+    delete_source_full,
+)
+
+
+class _FakeResult(list):
+    def __init__(self, rows=(), properties_set=0):
+        super().__init__(rows)
+        self.properties_set = properties_set
+
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        return SimpleNamespace(counters=SimpleNamespace(properties_set=self.properties_set))
+
+
+class _FakeTx:
+    """Answers each run() with the next canned response, logging the call."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.log = []
+
+    def run(self, query, **params):
+        self.log.append((query, params))
+        response = self.responses.pop(0)
+        return response if isinstance(response, _FakeResult) else _FakeResult(response)
+
+
+class _FakeSession:
+    def __init__(self, tx, log):
+        self.tx = tx
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute_read(self, fn, *args):
+        self.log.append("read")
+        return fn(self.tx, *args)
+
+    def execute_write(self, fn, *args):
+        self.log.append("write")
+        return fn(self.tx, *args)
+
+
+class _FakeDriver:
+    def __init__(self, tx):
+        self.tx = tx
+        self.log = []
+
+    def session(self, **config):
+        return _FakeSession(self.tx, self.log)
+
+
+class TestDepthTruncated:
+    """Tests for the dry-run depth probe."""
+
+    def test_probes_one_level_past_the_limit(self):
+        """The probe should expand to exactly MAX_TRAVERSAL_DEPTH + 1."""
+        tx = _FakeTx([{"truncated": True}])
+        assert _depth_truncated(tx, "src") is True
+        query, params = tx.log[0]
+        # subgraphNodes rejects a minLevel above 1
+        assert "subgraphNodes" not in query
+        assert "expandConfig" in query
+        assert params == {"source_id": "src", "depth": MAX_TRAVERSAL_DEPTH + 1}
+
+    def test_missing_root(self):
+        """A source without a root is never truncated."""
+        assert _depth_truncated(_FakeTx([]), "src") is False
+
+    def test_count_reports_truncation(self):
+        """Dry-run counts should carry the probe result."""
+        tx = _FakeTx([{"structures": 3, "contents": 5}], [{"truncated": False}])
+        assert _count_source_nodes_tx(tx, "src") == {
+            "source_id": "src",
+            "structures": 3,
+            "contents": 5,
+            "depth_truncated": False,
+        }
+
+
+class TestDeleteSourceFull:
+    """Tests for the probe -> release -> GC transaction."""
+
+    def test_release_then_collect(self):
+        """A rooted source should be released, deleted and swept in order."""
+        tx = _FakeTx(
+            [{"has_root": True}],
+            [{"structures_updated": 4, "contents_updated": 6}],
+            [{"deleted": 2}],
+            [{"deleted": 3}],
+        )
+        assert _delete_source_full_tx(tx, "src", True) == {
+            "structures_updated": 4,
+            "contents_updated": 6,
+            "source_deleted": True,
+            "structures_deleted": 2,
+            "contents_deleted": 3,
+        }
+        probe, release, gc_structs, gc_contents = (query for query, _ in tx.log)
+        assert "SET s:Garbage" in release and "SET c:Garbage" in release
+        assert "DETACH DELETE src" in release
+        assert "Structure:Garbage" in gc_structs
+        assert "Content:Garbage" in gc_contents
+
+    def test_missing_source(self):
+        """A missing source should stop after the probe."""
+        tx = _FakeTx([])
+        assert _delete_source_full_tx(tx, "missing", True) is None
+        assert len(tx.log) == 1
+
+    def test_source_without_root(self):
+        """A source with no root should be deleted without a traversal."""
+        tx = _FakeTx([{"has_root": False}], [{"deleted": 1}])
+        assert _delete_source_full_tx(tx, "src", False) == {
+            "structures_updated": 0,
+            "contents_updated": 0,
+            "source_deleted": True,
+        }
+        assert "subgraphNodes" not in tx.log[1][0]
+
+    def test_full_delete_reports_counts(self, monkeypatch):
+        """delete_source_full should report the transaction's counts."""
+        tx = _FakeTx(
+            [{"has_root": True}],
+            [{"structures_updated": 4, "contents_updated": 6}],
+            [{"deleted": 2}],
+            [{"deleted": 3}],
+        )
+        driver = _FakeDriver(tx)
+        monkeypatch.setattr(delete, "get_shared_driver", lambda *args: driver)
+        monkeypatch.setattr(delete, "schema_enabled", lambda: False)
+        results = delete_source_full("src", verbose=False)
+        assert (results["structures_affected"], results["contents_affected"]) == (4, 6)
+        assert (results["gc_structures"], results["gc_contents"]) == (2, 3)
+        assert results["source_deleted"] is True
+        assert driver.log == ["write"]
+
+
+class TestDryRun:
+    """Tests for delete_source_full(dry_run=True)."""
+
+    def test_counts_without_writing(self, monkeypatch):
+        """A dry run should only read, and flag a truncated traversal."""
+        driver = _FakeDriver(_FakeTx([{"structures": 3, "contents": 5}], [{"truncated": True}]))
+        # The module logger buffers onto the real stdout; route the
+        # truncation warning through pytest's capture instead
+        monkeypatch.setattr(delete, "log", logging.getLogger(__name__))
+        monkeypatch.setattr(delete, "get_shared_driver", lambda *args: driver)
+        monkeypatch.setattr(delete, "schema_enabled", lambda: False)
+        results = delete_source_full("src", dry_run=True, verbose=False)
+        assert (results["structures_affected"], results["contents_affected"]) == (3, 5)
+        assert results["depth_truncated"] is True
+        assert results["source_deleted"] is False
+        assert driver.log == ["read"]
+
+
+class TestDecrementRefCounts:
+    """Tests for the chunked ref_count decrements."""
+
+    def test_counts_from_summary(self, monkeypatch):
+        """Updated counts should be summed from each chunk's summary."""
+        monkeypatch.setattr(delete, "DECREMENT_CHUNK_SIZE", 2)
+        tx = _FakeTx(
+            _FakeResult(properties_set=2),
+            _FakeResult(properties_set=1),
+            _FakeResult(properties_set=2),
+        )
+        stats = _decrement_ref_counts_tx(tx, ("m:1", "m:2", "m:3"), ("c:1", "c:2"))
+        assert stats == {"structures_updated": 3, "contents_updated": 2}
+        assert [params for _, params in tx.log] == [
+            {"merkles": ("m:1", "m:2")},
+            {"merkles": ("m:3",)},
+            {"hashes": ("c:1", "c:2")},
+        ]
+        assert all(":Garbage" in query for query, _ in tx.log)
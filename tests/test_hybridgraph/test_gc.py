@@ -0,0 +1,115 @@
+"""Tests for hybridgraph garbage collection."""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+pytest.importorskip("neo4j")
+
+from runner.hybridgraph.gc import _backfill_ref_counts_tx, _fix_ref_counts_tx, garbage_collect
+
+
+class _FakeResult(list):
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        pass
+
+
+class _FakeTx:
+    """Answers each run() with the next rows for the first marker in the query."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.log = []
+
+    def run(self, query, **params):
+        self.log.append(query)
+        for marker, responses in self.answers.items():
+            if marker in query:
+                return _FakeResult(responses.pop(0))
+        return _FakeResult()
+
+
+class _FakeSession:
+    def __init__(self, tx, log):
+        self.tx = tx
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute_read(self, fn, *args):
+        self.log.append("read")
+        return fn(self.tx, *args)
+
+    def execute_write(self, fn, *args):
+        self.log.append("write")
+        return fn(self.tx, *args)
+
+
+class _FakeDriver:
+    def __init__(self, tx):
+        self.tx = tx
+        self.log = []
+
+    def session(self, **config):
+        return _FakeSession(self.tx, self.log)
+
+
+class TestGarbageCollect:
+    """Tests for the :Garbage sweeps."""
+
+    def test_sweeps_garbage_only(self):
+        """Both sweeps should be limited to :Garbage nodes."""
+        tx = _FakeTx({
+            "Structure:Garbage": [[{"deleted": 2}]],
+            "Content:Garbage": [[{"deleted": 3}], [{"deleted": 1}]],
+        })
+        stats = garbage_collect(_FakeDriver(tx), "hybridgraph")
+        # Content freed by the structure sweep is picked up by a second pass
+        assert stats == {"structures_deleted": 2, "contents_deleted": 4, "dry_run": False}
+        assert len(tx.log) == 3
+
+    def test_no_second_pass_without_structures(self):
+        """The extra content pass should only run after structures were deleted."""
+        tx = _FakeTx({
+            "Structure:Garbage": [[{"deleted": 0}]],
+            "Content:Garbage": [[{"deleted": 3}]],
+        })
+        assert garbage_collect(_FakeDriver(tx), "hybridgraph")["contents_deleted"] == 3
+        assert len(tx.log) == 2
+
+    def test_dry_run_only_counts(self):
+        """A dry run should count in read transactions and delete nothing."""
+        tx = _FakeTx({
+            "Structure:Garbage": [[{"count": 2}]],
+            "Content:Garbage": [[{"count": 3}]],
+        })
+        driver = _FakeDriver(tx)
+        stats = garbage_collect(driver, "hybridgraph", dry_run=True)
+        assert stats == {"structures_deleted": 2, "contents_deleted": 3, "dry_run": True}
+        assert driver.log == ["read", "read"]
+        assert not any("DELETE" in query for query in tx.log)
+
+
+class TestFixRefCounts:
+    """Tests for the ref_count repair transactions."""
+
+    def test_backfill_tags_garbage(self):
+        """Backfilled nodes should get ref_count 0 and the :Garbage label."""
+        tx = _FakeTx({"backfilled": [[{"backfilled": 7}]]})
+        assert _backfill_ref_counts_tx(tx) == 7
+        assert "SET n.ref_count = 0, n:Garbage" in tx.log[0]
+
+    def test_fix_keeps_garbage_in_step(self):
+        """Fixed counts should be summed and the :Garbage label resynced."""
+        tx = _FakeTx({"fixed": [[{"fixed": 2}], [{"fixed": 1}], [{"fixed": 4}]]})
+        assert _fix_ref_counts_tx(tx) == {"structures_fixed": 3, "contents_fixed": 4}
+        tag, untag = tx.log[3:]
+        assert "SET n:Garbage" in tag
+        assert "REMOVE n:Garbage" in untag
@@ -0,0 +1,96 @@
+"""Tests for the health report cache."""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+pytest.importorskip("neo4j")
+
+from runner.hybridgraph.health import (
+    _cache_ttl_from_env,
+    _load_cached_report,
+    _report_cache_path,
+    _store_cached_report,
+)
+
+
+FINGERPRINT = [1, 10, 20, 1, 9, 20]
+REPORT = {"status": "healthy", "issues": [], "warnings": [], "stats": {}}
+
+
+class TestReportCache:
+    """Tests for _load_cached_report/_store_cached_report."""
+
+    def test_round_trip(self, tmp_path):
+        """A fresh report at the same fingerprint should be returned."""
+        path = str(tmp_path / "health.json")
+        _store_cached_report(path, FINGERPRINT, False, REPORT, now=1000.0)
+        assert _load_cached_report(path, FINGERPRINT, False, ttl=60, now=1030.0) == REPORT
+
+    def test_expired(self, tmp_path):
+        """Reports older than the TTL should be ignored."""
+        path = str(tmp_path / "health.json")
+        _store_cached_report(path, FINGERPRINT, False, REPORT, now=1000.0)
+        assert _load_cached_report(path, FINGERPRINT, False, ttl=60, now=1060.0) is None
+
+    def test_fingerprint_changed(self, tmp_path):
+        """Any change in counts should invalidate the report."""
+        path = str(tmp_path / "health.json")
+        _store_cached_report(path, FINGERPRINT, False, REPORT, now=1000.0)
+        changed = FINGERPRINT[:2] + [21] + FINGERPRINT[3:]
+        assert _load_cached_report(path, changed, False, ttl=60, now=1001.0) is None
+
+    def test_sampled_report_does_not_satisfy_full_audit(self, tmp_path):
+        """A sampled audit should not be reused for a full-audit request."""
+        path = str(tmp_path / "health.json")
+        _store_cached_report(path, FINGERPRINT, False, REPORT, now=1000.0)
+        assert _load_cached_report(path, FINGERPRINT, True, ttl=60, now=1001.0) is None
+
+    def test_full_report_satisfies_sampled_request(self, tmp_path):
+        """A full-audit report should be reused for a sampled request."""
+        path = str(tmp_path / "health.json")
+        _store_cached_report(path, FINGERPRINT, True, REPORT, now=1000.0)
+        assert _load_cached_report(path, FINGERPRINT, False, ttl=60, now=1001.0) == REPORT
+
+    def test_missing_or_corrupt_file(self, tmp_path):
+        """Unreadable cache files should be treated as a miss."""
+        path = tmp_path / "health.json"
+        assert _load_cached_report(str(path), FINGERPRINT, False, ttl=60) is None
+        path.write_text("{not json")
+        assert _load_cached_report(str(path), FINGERPRINT, False, ttl=60) is None
+
+    def test_store_creates_cache_dir(self, tmp_path):
+        """The cache directory should be created on first write."""
+        path = tmp_path / "cache" / "health.json"
+        _store_cached_report(str(path), FINGERPRINT, False, REPORT, now=1000.0)
+        assert _load_cached_report(str(path), FINGERPRINT, False, ttl=60, now=1001.0) == REPORT
+
+
+class TestReportCachePath:
+    """Tests for where the report cache lives."""
+
+    def test_per_user_directory(self, monkeypatch, tmp_path):
+        """The cache should live under the user's cache directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert _report_cache_path("bolt://a:7687", "hybridgraph").startswith(str(tmp_path / "runner"))
+
+    def test_keyed_on_uri_and_database(self):
+        """Servers sharing a database name should not share a report."""
+        first = _report_cache_path("bolt://a:7687", "hybridgraph")
+        assert first != _report_cache_path("bolt://b:7687", "hybridgraph")
+        assert first != _report_cache_path("bolt://a:7687", "other")
+
+
+class TestCacheTtlFromEnv:
+    """Tests for reading HYBRIDGRAPH_HEALTH_CACHE_TTL."""
+
+    def test_valid_value(self, monkeypatch):
+        """A non-negative integer should be used as given."""
+        monkeypatch.setenv("HYBRIDGRAPH_HEALTH_CACHE_TTL", "300")
+        assert _cache_ttl_from_env() == 300
+
+    @pytest.mark.parametrize("value", ["5m", "", "-1"])
+    def test_invalid_value_disables(self, monkeypatch, value):
+        """Unusable values should disable the cache instead of raising."""
+        monkeypatch.setenv("HYBRIDGRAPH_HEALTH_CACHE_TTL", value)
+        assert _cache_ttl_from_env() == 0
@@ -0,0 +1,207 @@
+"""Tests for the in-memory stages of the jsongraph -> hybridgraph migration."""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+pytest.importorskip("neo4j")
+
+from runner.hybridgraph.migrate import build_batches, compute_hashes, index_source_data, shard_by_hash
+from runner.utils.hashing import compute_content_hash, compute_merkle_hash
+
+
+# (doc_id, path, kind, key, value_str, value_num, value_bool, child_paths)
+SOURCE_ROWS = [
+    ("doc1", "/root", "object", None, None, None, None, ["/root/name", "/root/tags", "/root/meta"]),
+    ("doc1", "/root/name", "string", "name", "a", None, None, []),
+    ("doc1", "/root/tags", "array", "tags", None, None, None, ["/root/tags/0", "/root/tags/1"]),
+    ("doc1", "/root/tags/0", "boolean", "0", None, None, True, []),
+    ("doc1", "/root/tags/1", "null", "1", None, None, None, []),
+    ("doc1", "/root/meta", "object", "meta", None, None, None, []),
+    ("doc2", "/root", "object", None, None, None, None, ["/root/name"]),
+    ("doc2", "/root/name", "string", "name", "a", None, None, []),
+]
+
+
+def ids_by_path(data):
+    """Map "doc_id:path" to node id for readable assertions."""
+    return {f"{node.doc_id}:{node.path}": node_id for node_id, node in enumerate(data["nodes"])}
+
+
+def children_of(data):
+    """Expand the CSR children arrays to {parent id: [child ids]}."""
+    indptr, child_idx = data["indptr"], data["child_idx"]
+    return {
+        node_id: list(child_idx[indptr[node_id]:indptr[node_id + 1]])
+        for node_id in range(len(data["nodes"]))
+        if indptr[node_id] != indptr[node_id + 1]
+    }
+
+
+def hashes_by_path(data):
+    """compute_hashes keyed by "doc_id:path" for readable assertions."""
+    hashes = compute_hashes(data)
+    return {path: hashes[node_id] for path, node_id in ids_by_path(data).items()}
+
+
+class TestIndexSourceData:
+    """Tests for index_source_data."""
+
+    def test_nodes_get_dense_ids(self):
+        """Nodes should be numbered in load order."""
+        data = index_source_data(SOURCE_ROWS)
+        assert len(data["nodes"]) == len(SOURCE_ROWS)
+        node = data["nodes"][3]
+        assert (node.path, node.kind, node.key, node.value_bool) == ("/root/tags/0", "boolean", "0", True)
+
+    def test_ids_grouped_by_document(self):
+        """Ids should be grouped per document in load order, with each root recorded."""
+        data = index_source_data(SOURCE_ROWS)
+        assert sorted(data["by_doc"]) == ["doc1", "doc2"]
+        assert data["by_doc"]["doc1"] == [0, 1, 2, 3, 4, 5]
+        assert data["by_doc"]["doc2"] == [6, 7]
+        assert data["roots"] == {"doc1": 0, "doc2": 6}
+
+    def test_children_resolved_within_document(self):
+        """Child paths should resolve to ids in the parent's document; leaves and empty containers have none."""
+        data = index_source_data(SOURCE_ROWS)
+        assert children_of(data) == {0: [1, 2, 5], 2: [3, 4], 6: [7]}
+
+    def test_children_may_precede_their_rows(self):
+        """Children listed before their own rows arrive should still resolve."""
+        rows = [SOURCE_ROWS[1], SOURCE_ROWS[0]]
+        data = index_source_data(rows)
+        assert children_of(data) == {1: [0]}
+
+    def test_unknown_child_paths_skipped(self):
+        """Children without a loaded node should be dropped."""
+        rows = [
+            ("doc1", "/root", "object", None, None, None, None, ["/root/name", "/root/gone"]),
+            SOURCE_ROWS[1],
+        ]
+        data = index_source_data(rows)
+        assert children_of(data) == {0: [1]}
+
+    def test_csr_offsets(self):
+        """indptr should hold one offset per node plus the end of child_idx."""
+        data = index_source_data(SOURCE_ROWS)
+        assert list(data["indptr"]) == [0, 3, 3, 5, 5, 5, 5, 6, 6]
+        assert list(data["child_idx"]) == [1, 2, 5, 3, 4, 7]
+
+
+class TestComputeHashes:
+    """compute_hashes should match hashing each node directly."""
+
+    def test_leaf_hashes(self):
+        """Leaves should hash as their encoded value."""
+        hashes = hashes_by_path(index_source_data(SOURCE_ROWS))
+        assert hashes["doc1:/root/name"] == compute_content_hash("string", "name", "a")
+        assert hashes["doc1:/root/tags/0"] == compute_content_hash("boolean", "0", "true")
+        assert hashes["doc1:/root/tags/1"] == compute_content_hash("null", "1", "null")
+
+    def test_container_hashes_bottom_up(self):
+        """Containers should hash over their children's hashes, including empty ones."""
+        hashes = hashes_by_path(index_source_data(SOURCE_ROWS))
+        tags = compute_merkle_hash("array", "tags", [
+            compute_content_hash("boolean", "0", "true"),
+            compute_content_hash("null", "1", "null"),
+        ])
+        meta = compute_merkle_hash("object", "meta", [])
+        root = compute_merkle_hash("object", None, [
+            compute_content_hash("string", "name", "a"), tags, meta,
+        ])
+        assert hashes["doc1:/root/tags"] == tags
+        assert hashes["doc1:/root/meta"] == meta
+        assert hashes["doc1:/root"] == root
+
+    def test_empty_containers_at_different_depths(self):
+        """Childless containers with the same kind and key should hash alike at any depth."""
+        data = index_source_data([
+            ("d", "/root", "object", None, None, None, None, ["/root/x", "/root/a"]),
+            ("d", "/root/x", "array", "x", None, None, None, []),
+            ("d", "/root/a", "object", "a", None, None, None, ["/root/a/x"]),
+            ("d", "/root/a/x", "array", "x", None, None, None, []),
+        ])
+        hashes = hashes_by_path(data)
+        assert hashes["d:/root/x"] == hashes["d:/root/a/x"] == compute_merkle_hash("array", "x", [])
+
+    def test_identical_values_share_hashes(self):
+        """Identical values in different documents should hash identically."""
+        hashes = hashes_by_path(index_source_data(SOURCE_ROWS))
+        assert hashes["doc1:/root/name"] == hashes["doc2:/root/name"]
+        assert hashes["doc2:/root"] == compute_merkle_hash(
+            "object", None, [compute_content_hash("string", "name", "a")]
+        )
+
+    def test_unique_content_counted(self):
+        """Repeated leaf values should become one Content row with a reference per occurrence."""
+        data = index_source_data(SOURCE_ROWS)
+        hashes = hashes_by_path(data)
+        content = data["content"]
+        assert len(content) == 3
+        name = content[hashes["doc1:/root/name"]]
+        assert (name["kind"], name["value_str"], name["ref_count"]) == ("string", "a", 2)
+
+    def test_equal_numbers_with_different_encodings_stay_distinct(self):
+        """1 and 1.0 encode differently, so grouping must not merge them."""
+        data = index_source_data([
+            ("d", "/root/a", "number", "n", None, 1, None, []),
+            ("d", "/root/b", "number", "n", None, 1.0, None, []),
+        ])
+        hashes = hashes_by_path(data)
+        assert hashes["d:/root/a"] == compute_content_hash("number", "n", "1")
+        assert hashes["d:/root/b"] == compute_content_hash("number", "n", "1.0")
+
+
+class TestBuildBatches:
+    """Tests for build_batches."""
+
+    def test_structure_rows(self):
+        """Each distinct container should become one Structure row with its reference count."""
+        data = index_source_data(SOURCE_ROWS)
+        hashes = hashes_by_path(data)
+        _, structure_rows, _, _ = build_batches(data, compute_hashes(data))
+        by_merkle = {row["merkle"]: row for row in structure_rows}
+        assert len(by_merkle) == 4
+        root = by_merkle[hashes["doc1:/root"]]
+        assert (root["child_keys"], root["child_count"], root["ref_count"]) == (["meta", "name", "tags"], 3, 1)
+        assert by_merkle[hashes["doc1:/root/tags"]]["child_keys"] == []
+
+    def test_relationship_rows(self):
+        """Array children should carry their index; values become HAS_VALUE rows."""
+        data = index_source_data(SOURCE_ROWS)
+        hashes = hashes_by_path(data)
+        _, _, contains_rows, has_value_rows = build_batches(data, compute_hashes(data))
+        assert sorted(contains_rows, key=str) == sorted([
+            (hashes["doc1:/root"], hashes["doc1:/root/tags"], "tags", None),
+            (hashes["doc1:/root"], hashes["doc1:/root/meta"], "meta", None),
+        ], key=str)
+        assert (hashes["doc1:/root/tags"], hashes["doc1:/root/tags/0"], "0") in has_value_rows
+        assert len(has_value_rows) == 4
+
+    def test_repeated_subtrees_collapse(self):
+        """Identical documents should share rows, counting each occurrence."""
+        rows = [("doc3",) + row[1:] for row in SOURCE_ROWS[6:]]
+        data = index_source_data(SOURCE_ROWS[6:] + rows)
+        content_rows, structure_rows, contains_rows, has_value_rows = build_batches(data, compute_hashes(data))
+        assert [row["ref_count"] for row in content_rows] == [2]
+        assert [row["ref_count"] for row in structure_rows] == [2]
+        assert contains_rows == []
+        assert len(has_value_rows) == 1
+
+
+class TestShardByHash:
+    """Tests for shard_by_hash."""
+
+    def test_rows_grouped_on_first_hex_digit(self):
+        """Rows should be grouped by the first digit after the hash prefix."""
+        rows = [{"hash": "c:a1"}, {"hash": "c:b2"}, {"hash": "c:a3"}, {"hash": "m:b4"}]
+        shards = shard_by_hash(rows, "hash")
+        assert len(shards) == 2
+        assert sorted(row["hash"] for shard in shards for row in shard) == ["c:a1", "c:a3", "c:b2", "m:b4"]
+        for shard in shards:
+            assert len({row["hash"][2] for row in shard}) == 1
+
+    def test_empty(self):
+        """No rows should give no shards."""
+        assert shard_by_hash([], "hash") == []
@@ -0,0 +1,48 @@
+"""Tests for the hybridgraph package exports."""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+import runner.hybridgraph as hybridgraph
+
+
+class TestPackageExports:
+    """Tests for lazily resolved package exports."""
+
+    def test_all_names_resolve(self):
+        """Every name in __all__ should be importable from the package."""
+        for name in hybridgraph.__all__:
+            assert getattr(hybridgraph, name) is not None, f"Missing export: {name}"
+
+    def test_star_import(self):
+        """from runner.hybridgraph import * should not raise."""
+        namespace = {}
+        exec("from runner.hybridgraph import *", namespace)
+        assert "HybridGraphQuery" in namespace
+        assert "MAX_TRAVERSAL_DEPTH" in namespace
+
+    def test_unknown_attribute_raises(self):
+        """Unknown attributes should raise AttributeError."""
+        with pytest.raises(AttributeError):
+            hybridgraph.does_not_exist
+
+
+class TestMaxDepthFromEnv:
+    """Tests for reading HYBRIDGRAPH_MAX_DEPTH."""
+
+    def test_valid_value(self, monkeypatch):
+        """A positive integer should be used as given."""
+        monkeypatch.setenv("HYBRIDGRAPH_MAX_DEPTH", "250")
+        assert hybridgraph._max_depth_from_env() == 250
+
+    @pytest.mark.parametrize("value", ["deep", "", "0", "-5"])
+    def test_invalid_value_falls_back(self, monkeypatch, value):
+        """Non-integers and values below 1 should give the default."""
+        monkeypatch.setenv("HYBRIDGRAPH_MAX_DEPTH", value)
+        assert hybridgraph._max_depth_from_env() == hybridgraph.DEFAULT_MAX_TRAVERSAL_DEPTH
+
+    def test_unset(self, monkeypatch):
+        """Without the variable the default applies."""
+        monkeypatch.delenv("HYBRIDGRAPH_MAX_DEPTH", raising=False)
+        assert hybridgraph._max_depth_from_env() == hybridgraph.DEFAULT_MAX_TRAVERSAL_DEPTH
@@ -1,10 +1,12 @@
 """Tests for hybridgraph query API."""
 
+import json
 import pytest
 import sys
 sys.path.insert(0, 'src')
 
 from runner.hybridgraph.queries import HybridGraphQuery
+from runner.hybridgraph.schema import SCHEMA_STATEMENTS
 
 
 class TestHybridGraphQuery:
@@ -57,3 +59,342 @@ class TestHybridGraphQuery:
         assert hasattr(query, "close")
         # Should not raise when closing without connection
         query.close()
+
+    def test_instances_share_driver(self):
+        """Instances with the same connection settings should reuse one driver."""
+        first = HybridGraphQuery(uri="bolt://shared:7687", user="u", password="p")
+        second = HybridGraphQuery(uri="bolt://shared:7687", user="u", password="p")
+        assert first.driver is second.driver
+
+    def test_close_keeps_shared_driver(self):
+        """close() should release the instance without closing the shared driver."""
+        query = HybridGraphQuery(uri="bolt://shared:7687", user="u", password="p")
+        driver = query.driver
+        query.close()
+        assert HybridGraphQuery(uri="bolt://shared:7687", user="u", password="p").driver is driver
+
+
+class _FakeRecord(tuple):
+    def data(self):
+        return {"source_id": self[0]}
+
+
+class _FakeSession:
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.log.append("closed")
+
+    def execute_read(self, fn, *args):
+        return fn(None, *args)
+
+    def run(self, query, **params):
+        for row in self.rows:
+            self.log.append(f"fetched {row[0]}")
+            yield _FakeRecord(row)
+
+
+class _FakeDriver:
+    def __init__(self, rows):
+        self.rows = rows
+        self.log = []
+
+    def session(self, **config):
+        return _FakeSession(self.rows, self.log)
+
+
+class TestStreamingQueries:
+    """Tests for the iter_* generator variants."""
+
+    def test_records_stream_lazily(self):
+        """Records should be pulled only as the caller iterates."""
+        query = HybridGraphQuery()
+        query._driver = _FakeDriver([("a",), ("b",)])
+        results = query.iter_search_content("status", "done")
+        assert next(results) == "a"
+        assert query._driver.log == ["fetched a"]
+        assert list(results) == ["b"]
+        assert query._driver.log[-1] == "closed"
+
+    def test_list_wrappers_materialize(self):
+        """List methods should return every streamed row."""
+        query = HybridGraphQuery()
+        query._driver = _FakeDriver([("a",), ("b",)])
+        assert query.list_sources() == [{"source_id": "a"}, {"source_id": "b"}]
+
+    def test_list_sources_cursor(self, monkeypatch):
+        """Passing after should switch to the keyset query."""
+        from runner.hybridgraph.queries import _Q_LIST_SOURCES, _Q_LIST_SOURCES_AFTER
+        calls = []
+
+        def iter_records(q, **params):
+            calls.append((q, params))
+            return iter(())
+
+        query = HybridGraphQuery()
+        monkeypatch.setattr(query, "_iter_records", iter_records)
+        query.list_sources(10)
+        query.list_sources(10, after="b")
+        assert calls == [(_Q_LIST_SOURCES, {"limit": 10}), (_Q_LIST_SOURCES_AFTER, {"limit": 10, "after": "b"})]
+
+    def test_search_content_exact(self):
+        """search_content_exact should report a match and close its session."""
+        query = HybridGraphQuery()
+        query._driver = _FakeDriver([("m:hit",)])
+        assert query.search_content_exact("src", "status", "done") is True
+        assert query._driver.log[-1] == "closed"
+        query._driver = _FakeDriver([])
+        assert query.search_content_exact("src", "status", "done") is False
+
+
+def _document_columns():
+    """Columns for {"name": "a", "tags": [true, {"x": 1}], "meta": {}}."""
+    return {
+        "root_merkle": "m:root",
+        "struct_merkle": ["m:root", "m:tags", "m:meta", "m:item"],
+        "struct_kind": ["object", "array", "object", "object"],
+        "content_parent": ["m:root", "m:tags", "m:item"],
+        "content_key": ["name", "0", "x"],
+        "content_value": ["a", True, 1],
+        "rel_parent": ["m:root", "m:root", "m:tags"],
+        "rel_child": ["m:tags", "m:meta", "m:item"],
+        "rel_key": ["tags", "meta", "1"],
+    }
+
+
+class TestBuildTreeFromBatch:
+    """Tests for rebuilding a document from the batch query columns."""
+
+    def test_rebuilds_document(self):
+        """Objects, arrays and leaf values should be reassembled."""
+        doc = HybridGraphQuery()._build_tree_from_batch(_document_columns())
+        assert doc == {"name": "a", "tags": [True, {"x": 1}], "meta": {}}
+
+    def test_array_items_ordered_by_index(self):
+        """Array items should follow their index key, not row order."""
+        columns = _document_columns()
+        columns["content_key"][1] = "2"
+        columns["rel_key"][2] = "0"
+        doc = HybridGraphQuery()._build_tree_from_batch(columns)
+        assert doc["tags"] == [{"x": 1}, True]
+
+    def test_dense_array_out_of_row_order(self):
+        """Dense array keys should place items by index regardless of row order."""
+        columns = _document_columns()
+        columns["content_key"][1] = "1"
+        columns["rel_key"][2] = "0"
+        doc = HybridGraphQuery()._build_tree_from_batch(columns)
+        assert doc["tags"] == [{"x": 1}, True]
+
+    def test_unknown_root(self):
+        """A root without a structure row should give None."""
+        columns = _document_columns()
+        columns["root_merkle"] = "m:missing"
+        assert HybridGraphQuery()._build_tree_from_batch(columns) is None
+
+    def test_document_json(self, monkeypatch):
+        """get_document_json should serialize the rebuilt document, or give None."""
+        query = HybridGraphQuery()
+        monkeypatch.setattr(query, "get_document_batch", lambda source_id: {"name": "a", "n": [1, None]})
+        assert json.loads(query.get_document_json("doc")) == {"name": "a", "n": [1, None]}
+        monkeypatch.setattr(query, "get_document_batch", lambda source_id: None)
+        assert query.get_document_json("missing") is None
+
+    def test_deep_document_does_not_recurse(self):
+        """Nesting deeper than the recursion limit should still rebuild."""
+        depth = sys.getrecursionlimit() + 100
+        merkles = [f"m:{i}" for i in range(depth)]
+        columns = {
+            "root_merkle": merkles[0],
+            "struct_merkle": merkles,
+            "struct_kind": ["object"] * depth,
+            "content_parent": [merkles[-1]],
+            "content_key": ["leaf"],
+            "content_value": [None],
+            "rel_parent": merkles[:-1],
+            "rel_child": merkles[1:],
+            "rel_key": ["next"] * (depth - 1),
+        }
+        node = HybridGraphQuery()._build_tree_from_batch(columns)
+        for _ in range(depth - 1):
+            node = node["next"]
+        assert node == {"leaf": None}
+
+    def test_shared_subtree_independent(self):
+        """A subtree referenced twice should be built as two separate objects."""
+        columns = {
+            "root_merkle": "m:root",
+            "struct_merkle": ["m:root", "m:item"],
+            "struct_kind": ["array", "object"],
+            "content_parent": ["m:item"],
+            "content_key": ["x"],
+            "content_value": [1],
+            "rel_parent": ["m:root", "m:root"],
+            "rel_child": ["m:item", "m:item"],
+            "rel_key": ["0", "1"],
+        }
+        doc = HybridGraphQuery()._build_tree_from_batch(columns)
+        assert doc == [{"x": 1}, {"x": 1}]
+        assert doc[0] is not doc[1]
+        doc[0]["x"] = 2
+        assert doc[1] == {"x": 1}
+
+
+class TestDocumentCache:
+    """Tests for the per-instance document cache."""
+
+    def setup_method(self):
+        self.roots = {"a": "m:1", "b": "m:2"}
+        self.builds = []
+
+    def make_query(self, monkeypatch, size=2):
+        from runner.hybridgraph import queries
+
+        def fetch_document(tx, source_id):
+            self.builds.append(source_id)
+            return {"root_merkle": self.roots[source_id]}
+
+        monkeypatch.setattr(queries, "_fetch_root_merkle", lambda tx, source_id: self.roots.get(source_id))
+        monkeypatch.setattr(queries, "_fetch_document", fetch_document)
+        # size=None leaves the constructor default
+        query = HybridGraphQuery() if size is None else HybridGraphQuery(doc_cache_size=size)
+        query._driver = _FakeDriver([])
+        monkeypatch.setattr(query, "_build_tree_from_batch", lambda record: {"root": record["root_merkle"]})
+        return query
+
+    def test_reuses_document_while_root_unchanged(self, monkeypatch):
+        """A second call with the same root merkle should skip the rebuild."""
+        query = self.make_query(monkeypatch)
+        first = query.get_document_batch("a")
+        assert query.get_document_batch("a") is first
+        assert self.builds == ["a"]
+
+    def test_rebuilds_when_root_changes(self, monkeypatch):
+        """A changed root merkle should invalidate the cached document."""
+        query = self.make_query(monkeypatch)
+        query.get_document_batch("a")
+        self.roots["a"] = "m:3"
+        assert query.get_document_batch("a") == {"root": "m:3"}
+        assert self.builds == ["a", "a"]
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        """The cache should hold at most doc_cache_size documents."""
+        self.roots["c"] = "m:4"
+        query = self.make_query(monkeypatch, size=2)
+        query.get_document_batch("a")
+        query.get_document_batch("b")
+        query.get_document_batch("a")
+        query.get_document_batch("c")
+        assert list(query._doc_cache) == ["a", "c"]
+
+    def test_missing_source(self, monkeypatch):
+        """An unknown source should give None without fetching the document."""
+        query = self.make_query(monkeypatch)
+        assert query.get_document_batch("missing") is None
+        assert self.builds == []
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Without doc_cache_size every call should rebuild a fresh document."""
+        query = self.make_query(monkeypatch, size=None)
+        first = query.get_document_batch("a")
+        assert query.get_document_batch("a") is not first
+        assert self.builds == ["a", "a"]
+
+    def test_clear_cache(self, monkeypatch):
+        """clear_cache should force the next call to rebuild."""
+        query = self.make_query(monkeypatch)
+        query.get_document_batch("a")
+        query.clear_cache()
+        query.get_document_batch("a")
+        assert self.builds == ["a", "a"]
+
+    def test_if_none_match(self, monkeypatch):
+        """A matching ETag should skip the fetch; a stale one should not."""
+        from runner.hybridgraph.queries import NOT_MODIFIED
+        query = self.make_query(monkeypatch, size=0)
+        assert query.get_document("a", if_none_match="m:1") is NOT_MODIFIED
+        assert self.builds == []
+        assert query.get_document("a", if_none_match="m:0") == {"root": "m:1"}
+        assert self.builds == ["a"]
+
+
+class TestDiffSummary:
+    """Tests for the capped diff_sources path."""
+
+    def test_missing_source(self, monkeypatch):
+        """A source that does not exist should give an error, not a diff."""
+        from runner.hybridgraph import queries
+        monkeypatch.setattr(queries, "_fetch_diff_summary", lambda tx, id1, id2, cap: None)
+        query = HybridGraphQuery()
+        query._driver = _FakeDriver([])
+        assert query.diff_sources("missing", "b", cap=10) == {"error": "One or both sources not found"}
+
+    def test_summary_from_record(self, monkeypatch):
+        """Counts from the query should give the similarity over the union."""
+        from runner.hybridgraph import queries
+        record = {"shared_count": 2, "n1": 3, "n2": 4, "only_in_first": ["m:a"], "only_in_second": ["m:b"]}
+        monkeypatch.setattr(queries, "_fetch_diff_summary", lambda tx, id1, id2, cap: record)
+        query = HybridGraphQuery()
+        query._driver = _FakeDriver([])
+        result = query.diff_sources("a", "b", cap=1)
+        assert result["shared_count"] == 2
+        assert result["similarity"] == 2 / 5
+
+
+class TestGetStats:
+    """Tests for get_stats aggregation."""
+
+    def test_totals_from_parallel_counts(self, monkeypatch):
+        """Each count query should feed its field and the totals."""
+        from runner.hybridgraph.queries import _Q_STATS
+        counts = dict(zip(_Q_STATS.values(), [2, 10, 30, 2, 8, 40]))
+        query = HybridGraphQuery()
+        monkeypatch.setattr(query, "_count", counts.__getitem__)
+        stats = query.get_stats()
+        assert (stats["sources"], stats["structures"], stats["contents"]) == (2, 10, 30)
+        assert stats["relationships"] == {"HAS_ROOT": 2, "CONTAINS": 8, "HAS_VALUE": 40}
+        assert (stats["total_nodes"], stats["total_relationships"]) == (42, 50)
+
+
+class _SchemaSession:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, statement):
+        self.log.append(statement)
+        return self
+
+    def consume(self):
+        pass
+
+
+class _SchemaDriver:
+    def __init__(self):
+        self.log = []
+
+    def session(self, **config):
+        return _SchemaSession(self.log)
+
+
+class TestEnsureIndexes:
+    """Tests for creating the query schema at startup."""
+
+    def test_issues_schema_once(self):
+        """Every schema statement should run once per driver and database."""
+        query = HybridGraphQuery(database="ensure_indexes_test")
+        query._driver = _SchemaDriver()
+        assert query.ensure_indexes() is True
+        assert query._driver.log == SCHEMA_STATEMENTS
+        assert query.ensure_indexes() is False
+        assert query._driver.log == SCHEMA_STATEMENTS
@@ -0,0 +1,125 @@
+"""Tests for hybridgraph reader helpers."""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+pytest.importorskip("neo4j")
+
+from runner.hybridgraph.reader import _count_keys, _deep_compare, _reconstruct_from_jsongraph
+
+
+class _FakeResult(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class _FakeJsongraphSession:
+    """Serves a jsongraph document held as {path: (parent, key, kind, value)}."""
+
+    def __init__(self, nodes, log):
+        self.nodes = nodes
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, query, **params):
+        self.log.append(params.get("paths"))
+        if "paths" not in params:
+            _, _, kind, value = self.nodes["/root"]
+            return _FakeResult([{"kind": kind, "value": value}])
+        return _FakeResult(
+            {"parent_path": parent, "key": key, "kind": kind, "path": path, "value": value}
+            for path, (parent, key, kind, value) in self.nodes.items()
+            if parent in params["paths"]
+        )
+
+
+class _FakeJsongraphDriver:
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.log = []
+
+    def session(self, **config):
+        return _FakeJsongraphSession(self.nodes, self.log)
+
+
+class TestReconstructFromJsongraph:
+    """Tests for the level-by-level jsongraph reconstruction."""
+
+    def test_one_query_per_level(self):
+        """Children of a whole level should come back in a single query."""
+        driver = _FakeJsongraphDriver({
+            "/root": (None, None, "object", None),
+            "/root/name": ("/root", "name", "string", "a"),
+            "/root/tags": ("/root", "tags", "array", None),
+            "/root/tags/1": ("/root/tags", "1", "object", None),
+            "/root/tags/0": ("/root/tags", "0", "boolean", True),
+            "/root/tags/1/x": ("/root/tags/1", "x", "number", 1),
+            "/root/meta": ("/root", "meta", "object", None),
+        })
+        doc = _reconstruct_from_jsongraph(driver, "jsongraph", "doc")
+        assert doc == {"name": "a", "tags": [True, {"x": 1}], "meta": {}}
+        assert driver.log == [None, ["/root"], ["/root/tags", "/root/meta"], ["/root/tags/1"]]
+
+    def test_scalar_root(self):
+        """A scalar document should be read from the root query alone."""
+        driver = _FakeJsongraphDriver({"/root": (None, None, "number", 3)})
+        assert _reconstruct_from_jsongraph(driver, "jsongraph", "doc") == 3
+        assert driver.log == [None]
+
+
+class TestDeepCompare:
+    """Tests for comparing reconstructed documents."""
+
+    def test_equal_documents(self):
+        """Identical documents should have no differences."""
+        doc = {"a": [1, {"b": None}], "c": "x"}
+        assert _deep_compare(doc, {"a": [1, {"b": None}], "c": "x"}, "/root") == []
+
+    def test_reports_each_kind_of_difference(self):
+        """Missing, extra, length, type and value differences should all be found."""
+        expected = {"gone": 1, "list": [1, 2], "num": 1, "str": "a", "nested": {"x": [True, "y"]}}
+        actual = {"new": 1, "list": [1], "num": "1", "str": "b", "nested": {"x": [False, "y"]}}
+        found = {(d["path"], d["type"]) for d in _deep_compare(expected, actual, "/root")}
+        assert found == {
+            ("/root/gone", "missing_in_hybrid"),
+            ("/root/new", "extra_in_hybrid"),
+            ("/root/list", "length_mismatch"),
+            ("/root/num", "type_mismatch"),
+            ("/root/str", "value_mismatch"),
+            ("/root/nested/x/0", "value_mismatch"),
+        }
+
+    def test_numbers_compare_by_value(self):
+        """An int and a float holding the same number should be equal; a bool should not."""
+        assert _deep_compare({"n": 1}, {"n": 1.0}) == []
+        assert _deep_compare({"n": 1}, {"n": True})[0]["type"] == "type_mismatch"
+
+    def test_list_items_in_index_order(self):
+        """Differences inside a list should be reported in index order."""
+        paths = [d["path"] for d in _deep_compare([1, 2, 3], [0, 0, 0], "/root")]
+        assert paths == ["/root/0", "/root/1", "/root/2"]
+
+    def test_deep_nesting(self):
+        """Nesting beyond the recursion limit should not raise."""
+        deep1 = deep2 = None
+        for _ in range(sys.getrecursionlimit() + 100):
+            deep1, deep2 = [deep1], [deep2]
+        assert _deep_compare(deep1, deep2) == []
+
+
+class TestCountKeys:
+    """Tests for counting keys and elements."""
+
+    def test_counts_nested_keys_and_items(self):
+        """Every dict key and list item should count once at any depth."""
+        assert _count_keys({"a": [1, {"b": 2, "c": []}], "d": None}) == 6
+
+    def test_scalar(self):
+        """Scalars hold no keys."""
+        assert _count_keys("x") == 0
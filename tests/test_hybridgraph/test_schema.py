@@ -0,0 +1,47 @@
+"""Tests for hybridgraph schema helpers."""
+
+import sys
+sys.path.insert(0, 'src')
+
+from runner.hybridgraph.schema import FULL_SCAN_OPERATORS, plan_operators
+
+
+class TestPlanOperators:
+    """Tests for walking EXPLAIN plans."""
+
+    def test_single_operator(self):
+        """A plan without children yields its own operator."""
+        assert plan_operators({"operatorType": "ProduceResults@neo4j"}) == ["ProduceResults"]
+
+    def test_depth_first_order(self):
+        """Children are visited depth first, left to right."""
+        plan = {
+            "operatorType": "ProduceResults@neo4j",
+            "children": [
+                {
+                    "operatorType": "Apply@neo4j",
+                    "children": [
+                        {"operatorType": "NodeByLabelScan@neo4j"},
+                        {"operatorType": "NodeIndexSeek@neo4j"},
+                    ],
+                },
+                {"operatorType": "Argument@neo4j"},
+            ],
+        }
+        assert plan_operators(plan) == [
+            "ProduceResults", "Apply", "NodeByLabelScan", "NodeIndexSeek", "Argument",
+        ]
+
+    def test_operator_without_runtime_suffix(self):
+        """Older servers report operator types without a runtime suffix."""
+        assert plan_operators({"operatorType": "AllNodesScan", "children": []}) == ["AllNodesScan"]
+
+    def test_full_scan_detection(self):
+        """Only operators reading every node count as full scans."""
+        plan = {
+            "operatorType": "ProduceResults@neo4j",
+            "children": [{"operatorType": "AllNodesScan@neo4j"}],
+        }
+        scans = [op for op in plan_operators(plan) if op in FULL_SCAN_OPERATORS]
+        assert scans == ["AllNodesScan"]
+        assert "NodeByLabelScan" not in FULL_SCAN_OPERATORS
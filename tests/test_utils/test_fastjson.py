@@ -0,0 +1,45 @@
+"""Tests for JSON helpers."""
+
+import io
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, 'src')
+
+from runner.utils.fastjson import dump, dumps, loads
+
+
+class TestFastJson:
+    """Tests for dump/dumps/loads."""
+
+    def test_round_trip(self):
+        """Should round-trip the types used in task results."""
+        obj = {"a": 1, "b": [1.5, True, None], "c": {"d": "text"}}
+        assert loads(dumps(obj)) == obj
+
+    def test_dumps_returns_str(self):
+        """Should return str, not bytes."""
+        assert isinstance(dumps({"x": 1}), str)
+
+    def test_output_is_standard_json(self):
+        """Output should be readable by the stdlib parser."""
+        obj = {"__task_result__": True, "output": {"count": 3}}
+        assert json.loads(dumps(obj)) == obj
+
+    def test_loads_accepts_bytes(self):
+        """Should parse bytes input."""
+        assert loads(b'{"k": [1, 2]}') == {"k": [1, 2]}
+
+    def test_dump_writes_to_stream(self):
+        """Should write a newline-terminated document to a text stream."""
+        stream = io.StringIO()
+        dump({"status": "healthy", "issues": []}, stream, indent=True)
+        text = stream.getvalue()
+        assert text.endswith("\n")
+        assert json.loads(text) == {"status": "healthy", "issues": []}
+
+    def test_dump_stringifies_unknown_types(self):
+        """Values JSON cannot represent should be written with str()."""
+        stream = io.StringIO()
+        dump({"path": Path("/tmp/x")}, stream)
+        assert json.loads(stream.getvalue()) == {"path": "/tmp/x"}
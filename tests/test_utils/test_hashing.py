@@ -4,7 +4,13 @@ import pytest
 import sys
 sys.path.insert(0, 'src')
 
-from runner.utils.hashing import compute_content_hash, compute_merkle_hash
+from runner.utils.hashing import (
+    compute_content_hash,
+    compute_content_hashes,
+    compute_merkle_hash,
+    compute_merkle_hashes,
+    encode_value_for_hash,
+)
 
 
 class TestComputeContentHash:
@@ -74,3 +80,57 @@ class TestComputeMerkleHash:
         hash1 = compute_merkle_hash("object", "root", [])
         hash2 = compute_merkle_hash("array", "root", [])
         assert hash1 != hash2
+
+
+class TestEncodeValueForHash:
+    """Tests for encode_value_for_hash."""
+
+    def test_booleans(self):
+        """Booleans should encode lowercase, with a missing value as false."""
+        assert encode_value_for_hash("boolean", None, None, True) == "true"
+        assert encode_value_for_hash("boolean", None, None, False) == "false"
+        assert encode_value_for_hash("boolean", None, None, None) == "false"
+
+    def test_numbers_keep_their_repr(self):
+        """Ints and floats should encode distinctly, with a missing value as 0."""
+        assert encode_value_for_hash("number", None, 1, None) == "1"
+        assert encode_value_for_hash("number", None, 1.0, None) == "1.0"
+        assert encode_value_for_hash("number", None, None, None) == "0"
+
+
+class TestComputeContentHashes:
+    """Tests for the batch compute_content_hashes function."""
+
+    def test_matches_per_item_hashing(self):
+        """Batch hashes should equal compute_content_hash per item."""
+        rows = [
+            ("string", "name", "Alice", None, None),
+            ("string", "empty", None, None, None),
+            ("number", "age", None, 42, None),
+            ("number", "ratio", None, 1.5, None),
+            ("boolean", "active", None, None, True),
+            ("boolean", "unset", None, None, None),
+            ("null", "missing", None, None, None),
+        ]
+        items = [(kind, key, encode_value_for_hash(kind, vs, vn, vb)) for kind, key, vs, vn, vb in rows]
+        expected = [compute_content_hash(kind, key, value) for kind, key, value in items]
+        assert compute_content_hashes(items) == expected
+
+    def test_empty(self):
+        """No items should give no hashes."""
+        assert compute_content_hashes([]) == []
+
+
+class TestComputeMerkleHashes:
+    """Tests for the batch compute_merkle_hashes function."""
+
+    def test_matches_per_item_hashing(self):
+        """Batch hashes should equal compute_merkle_hash per item."""
+        items = [
+            ("object", "root", ["c:abc", "m:def"]),
+            ("array", "tags", ["c:2", "c:1"]),
+            ("object", "empty", []),
+            ("object", None, ["c:abc"]),
+        ]
+        expected = [compute_merkle_hash(kind, key, children) for kind, key, children in items]
+        assert compute_merkle_hashes(items) == expected
@@ -5,7 +5,7 @@ import pytest
 import sys
 sys.path.insert(0, 'src')
 
-from runner.utils.neo4j import get_config
+from runner.utils.neo4j import get_config, get_pool_config
 
 
 class TestGetConfig:
@@ -48,3 +48,70 @@ class TestGetConfig:
             assert config["uri"] == "bolt://custom:7687"
         finally:
             del os.environ["NEO4J_URI"]
+
+
+class TestGetPoolConfig:
+    """Tests for get_pool_config function."""
+
+    def test_defaults(self):
+        """Should fall back to the shared pool defaults."""
+        original = {k: os.environ.pop(k, None) for k in
+                    ["NEO4J_POOL_SIZE", "NEO4J_CONN_ACQ_TIMEOUT", "NEO4J_MAX_CONN_LIFETIME",
+                     "NEO4J_CONN_TIMEOUT", "NEO4J_MAX_TX_RETRY_TIME", "NEO4J_KEEP_ALIVE"]}
+        try:
+            config = get_pool_config()
+            assert config["max_connection_pool_size"] == 200
+            assert config["connection_acquisition_timeout"] == 60
+            assert config["max_connection_lifetime"] == 3600
+            assert config["connection_timeout"] == 30
+            assert config["max_transaction_retry_time"] == 30
+            assert config["keep_alive"] is True
+        finally:
+            for k, v in original.items():
+                if v is not None:
+                    os.environ[k] = v
+
+    def test_reads_from_environment(self):
+        """Should read pool settings from environment variables."""
+        os.environ["NEO4J_POOL_SIZE"] = "25"
+        os.environ["NEO4J_KEEP_ALIVE"] = "false"
+        try:
+            config = get_pool_config()
+            assert config["max_connection_pool_size"] == 25
+            assert config["keep_alive"] is False
+        finally:
+            del os.environ["NEO4J_POOL_SIZE"]
+            del os.environ["NEO4J_KEEP_ALIVE"]
+
+
+class TestGetSharedDriver:
+    """Tests for get_shared_driver function."""
+
+    def setup_method(self):
+        pytest.importorskip("neo4j")
+
+    def teardown_method(self):
+        from runner.utils.neo4j import close_shared_drivers
+        close_shared_drivers()
+
+    def test_reuses_driver_for_same_config(self):
+        """Should return the same driver for the same connection settings."""
+        from runner.utils.neo4j import get_shared_driver
+        first = get_shared_driver("bolt://localhost:7687", "neo4j", "password")
+        second = get_shared_driver("bolt://localhost:7687", "neo4j", "password")
+        assert first is second
+
+    def test_separate_driver_per_uri(self):
+        """Should not share a driver between different servers."""
+        from runner.utils.neo4j import get_shared_driver
+        first = get_shared_driver("bolt://localhost:7687", "neo4j", "password")
+        second = get_shared_driver("bolt://other:7687", "neo4j", "password")
+        assert first is not second
+
+    def test_close_resets_cache(self):
+        """Closing shared drivers should make the next call create a new one."""
+        from runner.utils.neo4j import close_shared_drivers, get_shared_driver
+        first = get_shared_driver("bolt://localhost:7687", "neo4j", "password")
+        close_shared_drivers()
+        second = get_shared_driver("bolt://localhost:7687", "neo4j", "password")
+        assert first is not second